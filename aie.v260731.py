@@ -12,8 +12,11 @@
 """
 
 import tkinter as tk
+import collections
 import os
+import queue
 import sys
+import threading
 
 if getattr(sys, 'frozen', False):
     base_path = sys._MEIPASS
@@ -21,8 +24,12 @@ if getattr(sys, 'frozen', False):
     os.environ['TKDND_LIBRARY'] = tkdnd_path
 
 from tkinter import filedialog, messagebox, ttk, colorchooser, Toplevel
-from PIL import Image, ImageOps, ImageTk, ImageDraw
+from PIL import Image, ImageTk
 import webbrowser
+
+import aie_engine
+from aie_engine import (ICO_SIZES, ICO_LARGEST_SIZE, ICO_SUPPORTED_EXTS, MERGE_MODES,
+                        EngineError, MergeOp, FlipOp, RotateOp, ResizeOp, CropOp, IcoOp)
 # tkinterdnd2 라이브러리 임포트 시도
 try:
     from tkinterdnd2 import DND_FILES, TkinterDnD
@@ -37,13 +44,6 @@ try:
 except ImportError:
     SV_TTK_AVAILABLE = False
 
-# ============================================================================
-# "ICO 파일 변환" 기능에서 사용하는 상수 (ico_converter.py 이식)
-# ============================================================================
-ICO_SIZES = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
-ICO_LARGEST_SIZE = ICO_SIZES[-1]
-ICO_SUPPORTED_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff", ".tif", ".webp")
-
 # ICO를 제외한 모든 저장 기능(병합/뒤집기/회전/크기 조정/자르기)이 공통으로 사용하는
 # 저장 대화상자 파일 형식 목록입니다. 한 곳에서만 정의해 모든 기능의 양식을 통일합니다.
 COMMON_SAVE_FILETYPES = [
@@ -70,11 +70,155 @@ APP_ERROR = "#c0392b"
 # 좌측 기능 선택 내비게이션에서 각 모드를 나타내는 아이콘
 NAV_ICONS = {
     "2_horiz": "↔️", "2_vert": "↕️", "3_horiz": "↔️", "3_vert": "↕️",
-    "4_grid": "▦", "flip_image": "🔃", "rotate_image": "🔄",
+    "4_grid": "▦", "n_grid": "🧩", "flip_image": "🔃", "rotate_image": "🔄",
     "resize_image": "📐", "crop_image": "✂️", "ico_convert": "🪟",
 }
 
 
+class TiledImageView:
+    """ImagePyramid를 스크롤 가능한 캔버스에 타일 단위로 보여주는 보기 (미리보기 창에서 사용).
+    보이는 PREVIEW_TILE_SIZE 타일만 PhotoImage로 바꾸고, 바꾼 타일은 (배율, 열, 행) 키의 LRU로 보관해
+    스크롤로 되돌아오면 다시 씁니다. 결과 전체를 Tk 비트맵 하나로 만들지 않으므로 아주 큰 결과도
+    메모리와 변환 시간이 창 크기에 비례합니다. 휠: 세로 스크롤, Shift+휠: 가로, Ctrl+휠: 확대/축소."""
+
+    TILE = aie_engine.PREVIEW_TILE_SIZE
+    CACHE_TILES = 96
+    ZOOM_LEVELS = (1 / 32, 1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2, 4, 8)
+
+    def __init__(self, parent, pyramid, on_scale_change=None, bg="gray"):
+        self.pyramid = pyramid
+        self.on_scale_change = on_scale_change
+        self.scale = None
+        self._tiles = collections.OrderedDict()  # (배율, 열, 행) → PhotoImage
+        self._items = {}                         # 지금 캔버스에 올린 타일 → 항목 id
+        self._update_after = None
+
+        self.frame = ttk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, bg=bg, highlightthickness=0)
+        scrollbar_y = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        scrollbar_x = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        # 스크롤될 때마다 보이는 타일을 갱신합니다. (한 번의 유휴 시점에 몰아서 처리)
+        self.canvas.configure(
+            yscrollcommand=lambda *a: (scrollbar_y.set(*a), self.schedule_update()),
+            xscrollcommand=lambda *a: (scrollbar_x.set(*a), self.schedule_update()))
+        scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
+        scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self._on_wheel(e, horizontal=True))
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self.zoom_step(1 if e.delta > 0 else -1))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-3, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(3, "units"))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.zoom_step(1))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.zoom_step(-1))
+
+    def fit_scale(self):
+        width, height = self.pyramid.source_size
+        view_w, view_h = max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height())
+        return min(view_w / width, view_h / height)
+
+    def set_scale(self, scale):
+        """배율을 바꾸고, 바꾸기 전 화면 가운데에 있던 지점이 계속 가운데에 오도록 스크롤합니다.
+        가장 작은 배율은 ZOOM_LEVELS의 첫 단계와 창 맞춤 배율 중 작은 쪽이라, 아주 큰 결과도 창에 맞출 수 있습니다."""
+        scale = max(min(self.ZOOM_LEVELS[0], self.fit_scale()), min(self.ZOOM_LEVELS[-1], scale))
+        if scale == self.scale:
+            return
+        center = None
+        if self.scale:
+            view_w, view_h = self.canvas.winfo_width(), self.canvas.winfo_height()
+            center = ((self.canvas.canvasx(0) + view_w / 2) / self.scale,
+                      (self.canvas.canvasy(0) + view_h / 2) / self.scale)
+        self.scale = scale
+        self.canvas.delete("tile")
+        self._items.clear()
+        width, height = self.pyramid.display_size(scale)
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+        if center is not None:
+            view_w, view_h = self.canvas.winfo_width(), self.canvas.winfo_height()
+            self.canvas.xview_moveto(max(0.0, (center[0] * scale - view_w / 2) / width))
+            self.canvas.yview_moveto(max(0.0, (center[1] * scale - view_h / 2) / height))
+        if self.on_scale_change:
+            self.on_scale_change(scale)
+        self.schedule_update()
+
+    def zoom_step(self, direction):
+        """ZOOM_LEVELS에서 현재 배율 바로 다음(direction=1) 또는 이전(-1) 단계로 바꿉니다."""
+        if direction > 0:
+            candidates = [z for z in self.ZOOM_LEVELS if z > self.scale * 1.001]
+            target = candidates[0] if candidates else self.ZOOM_LEVELS[-1]
+        else:
+            candidates = [z for z in self.ZOOM_LEVELS if z < self.scale * 0.999]
+            if not candidates:
+                return  # 이미 가장 작은 단계보다 작게(창 맞춤) 보고 있음
+            target = candidates[-1]
+        self.set_scale(target)
+
+    def zoom_fit(self):
+        self.set_scale(self.fit_scale())
+
+    def _on_configure(self, event):
+        if self.scale is None:
+            # 처음 표시될 때: 창보다 크면 창에 맞추고, 작으면 1:1로 보여줍니다.
+            self.set_scale(min(1.0, self.fit_scale()))
+        else:
+            self.schedule_update()
+
+    def _on_wheel(self, event, horizontal=False):
+        step = -1 if event.delta > 0 else 1
+        if horizontal:
+            self.canvas.xview_scroll(step * 3, "units")
+        else:
+            self.canvas.yview_scroll(step * 3, "units")
+
+    def schedule_update(self):
+        if self._update_after is None:
+            self._update_after = self.canvas.after_idle(self._update_tiles)
+
+    def _photo_for(self, key):
+        photo = self._tiles.get(key)
+        if photo is not None:
+            self._tiles.move_to_end(key)
+            return photo
+        scale, column, row = key
+        tile = self.pyramid.render_tile(scale, column, row, self.TILE)
+        # 투명한 결과는 창 배경색(회색) 대신 체크무늬 위에 보여줍니다.
+        photo = ImageTk.PhotoImage(aie_engine.composite_on_checkerboard(tile))
+        self._tiles[key] = photo
+        return photo
+
+    def _update_tiles(self):
+        """화면에 보이는 타일만 캔버스에 올리고, 벗어난 타일의 항목은 지웁니다."""
+        self._update_after = None
+        if self.scale is None:
+            return
+        width, height = self.pyramid.display_size(self.scale)
+        x1 = min(width, max(0, int(self.canvas.canvasx(0))))
+        y1 = min(height, max(0, int(self.canvas.canvasy(0))))
+        x2 = min(width, x1 + self.canvas.winfo_width())
+        y2 = min(height, y1 + self.canvas.winfo_height())
+        visible = {(self.scale, column, row)
+                   for column in range(x1 // self.TILE, (x2 - 1) // self.TILE + 1)
+                   for row in range(y1 // self.TILE, (y2 - 1) // self.TILE + 1)} if x2 > x1 and y2 > y1 else set()
+        for key in list(self._items):
+            if key not in visible:
+                self.canvas.delete(self._items.pop(key))
+        for key in sorted(visible):
+            if key not in self._items:
+                _scale, column, row = key
+                self._items[key] = self.canvas.create_image(column * self.TILE, row * self.TILE, anchor=tk.NW,
+                                                            image=self._photo_for(key), tags="tile")
+            else:
+                self._photo_for(key)  # 최근 사용으로 표시
+        # 캐시 한도를 넘으면 오래 쓰지 않은 타일부터 버립니다. (화면에 올라 있는 타일은 남김)
+        for key in list(self._tiles):
+            if len(self._tiles) <= max(self.CACHE_TILES, len(visible)):
+                break
+            if key not in self._items:
+                del self._tiles[key]
+
+
 class ImageEditorApp:
     def __init__(self, master):
         self.master = master
@@ -100,6 +244,7 @@ class ImageEditorApp:
             ("3개 이미지 병합 (가로)", "3_horiz"),
             ("3개 이미지 병합 (세로)", "3_vert"),
             ("4개 이미지 병합 (2x2)", "4_grid"),
+            ("여러 이미지 병합 (격자)", "n_grid"),
             ("이미지 뒤집기", "flip_image"),
             ("이미지 회전하기", "rotate_image"),
             ("이미지 크기 조정", "resize_image"),
@@ -111,6 +256,12 @@ class ImageEditorApp:
         self.current_border_color = tk.StringVar(value="#000000")
         self.current_fill_color = tk.StringVar(value="#FFFFFF")  # 비율 차이로 남는 빈 공간을 채울 색상
         self.merge_size_mode = tk.StringVar(value="smaller")     # 가로/세로 병합 시 크기 기준(작은/큰/변경없음)
+        self.merge_list_paths = []                               # "여러 이미지 병합"의 이미지 목록 (순서대로)
+        self.merge_grid_auto = tk.BooleanVar(value=True)         # 행/열 수를 장수에 맞춰 자동으로 정할지 여부
+        self.merge_resample = tk.StringVar(value="LANCZOS")      # 크기를 맞출 때 사용할 리샘플링 필터
+        self._merge_estimate_seq = 0
+        self.jpeg_transform_method = tk.StringVar(value="lossless")  # JPEG 회전/뒤집기 저장 방식
+        self.encoder_profile = tk.StringVar(value=aie_engine.DEFAULT_ENCODER_PROFILE)  # 저장 시 압축 설정
 
         # 이미지 경로 엔트리/버튼/레이블 리스트 (동적 생성을 위해 초기화)
         self.image_paths_entries = []
@@ -163,6 +314,17 @@ class ImageEditorApp:
         # tk.Button은 테마 엔진을 거치지 않고 지정한 색을 그대로 그리므로 이 문제가 없습니다.
         btn_font = ('Helvetica', 10, 'bold')
 
+        # 저장 설정 (모든 기능의 저장에 공통으로 적용되는 인코더 프로필)
+        tk.Label(button_sub_frame, text="저장 설정", bg=APP_BG, fg=APP_SUBTEXT,
+                 font=('Helvetica', 9)).pack(side=tk.LEFT, padx=(0, 4))
+        profile_names = list(aie_engine.ENCODER_PROFILES)
+        profile_combo = ttk.Combobox(button_sub_frame, state="readonly", width=14,
+                                     values=[self.ENCODER_PROFILE_LABELS[n] for n in profile_names])
+        profile_combo.current(profile_names.index(self.encoder_profile.get()))
+        profile_combo.bind("<<ComboboxSelected>>",
+                           lambda e: self.encoder_profile.set(profile_names[profile_combo.current()]))
+        profile_combo.pack(side=tk.LEFT, padx=(0, 10))
+
         self.preview_btn = tk.Button(button_sub_frame, text="미리보기", command=self.show_preview,
                                       bg=APP_SUCCESS, fg="white", activebackground="#0b5c30",
                                       activeforeground="white", font=btn_font, relief="flat",
@@ -181,6 +343,27 @@ class ImageEditorApp:
                                    cursor="hand2", padx=14, pady=6, borderwidth=0)
         self.exit_btn.pack(side=tk.LEFT, padx=5)
 
+        # 미리보기/실행 작업 상태 (작업 스레드로 처리)
+        self._job_seq = 0
+        self._active_job = None
+        self._last_result = None  # (지문, 처리 결과) - 설정이 같으면 '실행'에서 다시 계산하지 않음
+        # 저장 대기열 (처리가 끝난 결과를 저장 스레드가 순서대로 인코딩/기록)
+        self._save_lock = threading.Lock()
+        self._save_pending = collections.deque()
+        self._save_running = False
+        self._save_results = queue.Queue()
+        self._save_count = 0       # 대기 중 + 저장 중인 개수 (메인 스레드에서만 변경)
+        self._save_current = None  # 지금 저장 중인 경로
+        # 실시간 미리보기 (옵션 패널 오른쪽, 옵션을 바꿀 때마다 축소 입력으로 다시 그림)
+        self.live_preview_canvas = None
+        self._live_preview_after = None
+        self._live_preview_seq = 0
+        self._live_preview_photo = None
+        for var in (self.current_gap_color, self.current_border_color, self.current_fill_color,
+                    self.merge_size_mode, self.merge_grid_auto, self.merge_resample):
+            var.trace_add("write", self._live_preview_schedule)
+        self._build_job_status_row(bottom_frame, before=button_sub_frame)
+
         self.footer_text = "제작: 알파카100 (https://alpaca100.tistory.com/)"
         self.footer_url = "https://alpaca100.tistory.com/"
         self.footer_label = tk.Label(bottom_frame, text=self.footer_text, bg=APP_BG,
@@ -253,6 +436,7 @@ class ImageEditorApp:
         if mode_value == self.active_mode_value:
             return
         self.active_mode_value = mode_value
+        self._last_result = None  # 다른 기능으로 바꾸면 이전 결과는 재사용될 일이 없으므로 메모리에서 놓아줍니다.
         self._refresh_nav_selection()
         self.update_options_ui()
 
@@ -279,11 +463,20 @@ class ImageEditorApp:
         self.image_paths_entries.clear(); self.browse_buttons.clear(); self.image_labels.clear()
 
         mode = self.active_mode_value
+        self.live_preview_canvas = None
+        self._crop_full_future = None  # 자르기 화면을 벗어나면 진행 중인 원본 피라미드 결과는 버립니다.
+        if mode in MERGE_MODES or mode in self.LIVE_PREVIEW_MODES:
+            # 옵션 위젯보다 먼저 오른쪽에 붙여 두어야 나머지 공간을 옵션 위젯이 채웁니다.
+            self._build_live_preview_pane(self.right_options_frame)
+
+        if mode in MERGE_MODES and MERGE_MODES[mode][1] is None:
+            container = tk.Frame(self.right_options_frame, bg=APP_BG)
+            container.pack(fill="both", expand=True)
+            self._build_merge_list_ui(container)
+            self._create_merge_options_widgets(container, mode)
 
-        if mode in ["2_horiz", "2_vert", "3_horiz", "3_vert", "4_grid"]:
-            num_images = 2 if mode in ["2_horiz", "2_vert"] else \
-                         3 if mode in ["3_horiz", "3_vert"] else \
-                         4 if mode == "4_grid" else 0
+        elif mode in MERGE_MODES:
+            num_images = MERGE_MODES[mode][1]
 
             container = tk.Frame(self.right_options_frame, bg=APP_BG)
             container.pack(fill="both", expand=True)
@@ -326,6 +519,8 @@ class ImageEditorApp:
             self.flip_options_combobox.set("좌우 뒤집기")
             self.flip_options_combobox.pack(anchor="w")
             self.flip_options_combobox.bind("<FocusOut>", self.validate_combobox)
+            self.flip_options_combobox.bind("<<ComboboxSelected>>", self._live_preview_schedule)
+            self._build_jpeg_method_section(container)
 
         elif mode == "rotate_image":
             container = tk.Frame(self.right_options_frame, bg=APP_BG)
@@ -340,6 +535,8 @@ class ImageEditorApp:
             self.rotate_options_combobox.set("시계 방향으로 90°")
             self.rotate_options_combobox.pack(anchor="w")
             self.rotate_options_combobox.bind("<FocusOut>", self.validate_combobox)
+            self.rotate_options_combobox.bind("<<ComboboxSelected>>", self._live_preview_schedule)
+            self._build_jpeg_method_section(container)
 
         elif mode == "resize_image":
             self._build_resize_ui(self.right_options_frame)
@@ -350,6 +547,8 @@ class ImageEditorApp:
         elif mode == "ico_convert":
             self._build_ico_ui(self.right_options_frame)
 
+        self._live_preview_schedule()
+
     # ========================================================================
     # 모든 옵션 패널이 공유하는 카드 스타일 UI 헬퍼
     # ========================================================================
@@ -404,6 +603,45 @@ class ImageEditorApp:
 
         return frame, var
 
+    # 저장 설정 프로필 (aie_engine.ENCODER_PROFILES) → 화면 표시 문구
+    ENCODER_PROFILE_LABELS = {
+        "fastest": "가장 빠르게",
+        "balanced": "균형 (기본)",
+        "smallest": "가장 작게",
+    }
+    MERGE_JPEG_QUALITY = 95  # 병합 결과를 JPEG으로 저장할 때의 품질
+
+    # JPEG 회전/뒤집기 저장 방식 (aie_engine.JPEG_TRANSFORM_METHODS) → 화면 표시 문구
+    JPEG_METHOD_LABELS = {
+        "lossless": "무손실 변환 (화질 그대로)",
+        "exif": "EXIF 방향 값만 변경 (가장 빠름)",
+        "reencode": "다시 인코딩",
+    }
+
+    # 뒤집기/회전 콤보박스 문구 → FlipOp 방향 / RotateOp 각도
+    FLIP_DIRECTIONS = {"좌우 뒤집기": "horizontal", "상하 뒤집기": "vertical", "상하/좌우 뒤집기": "both"}
+    ROTATE_DEGREES = {"시계 방향으로 90°": 90, "시계 방향으로 180°": 180, "시계 방향으로 270°": 270}
+
+    def _selected_transform_op(self, mode):
+        """뒤집기/회전 콤보박스에서 고른 값의 작업 객체. 값이 올바르지 않으면 None."""
+        if mode == "flip_image":
+            direction = self.FLIP_DIRECTIONS.get(self.flip_options_combobox.get())
+            return FlipOp(direction) if direction else None
+        degrees = self.ROTATE_DEGREES.get(self.rotate_options_combobox.get())
+        return RotateOp(degrees) if degrees else None
+
+    def _build_jpeg_method_section(self, container):
+        self._ui_section(container, "JPEG 저장 방식")
+        card = self._ui_card(container)
+        for value, text in self.JPEG_METHOD_LABELS.items():
+            tk.Radiobutton(card, text=text, variable=self.jpeg_transform_method, value=value,
+                           bg=APP_CARD, fg=APP_TEXT, font=("Helvetica", 10),
+                           activebackground=APP_CARD, anchor="w").pack(anchor="w")
+        tk.Label(card, text="원본과 저장 형식이 모두 JPEG일 때만 적용됩니다. 무손실 변환은 jpegtran이 필요하며,\n"
+                            "없거나 크기가 8/16px 블록의 배수가 아니면 원본 압축 설정 그대로 다시 인코딩합니다.",
+                 bg=APP_CARD, fg=APP_SUBTEXT, font=("Helvetica", 8), justify="left", anchor="w").pack(
+                     anchor="w", pady=(4, 0))
+
     def _build_single_image_section(self, container, title):
         self._ui_section(container, title)
         card = self._ui_card(container)
@@ -436,9 +674,17 @@ class ImageEditorApp:
         self.resize_custom_h_var = tk.StringVar(value="0")
         self.resize_keep_ratio = tk.BooleanVar(value=True)
         self.resize_quality = tk.IntVar(value=85)
+        self.resize_resample_quality = tk.StringVar(value="exact")
+        self.resize_resample = tk.StringVar(value="LANCZOS")
+        self._resize_orig_mode = None
+        self._resize_estimate_seq = 0
+        self._resize_estimate_after = None
         self._resize_orig_w = 0
         self._resize_orig_h = 0
         self._resize_preview_img = None
+        for var in (self.resize_image_path, self.resize_mode, self.resize_percent, self.resize_custom_w,
+                    self.resize_custom_h, self.resize_resample):
+            var.trace_add("write", self._live_preview_schedule)
 
         f_label = ("Helvetica", 10)
         f_small = ("Helvetica", 9)
@@ -562,6 +808,32 @@ class ImageEditorApp:
                         bg=APP_CARD, font=f_small, fg=APP_TEXT,
                         activebackground=APP_CARD).grid(row=0, column=6, padx=(14, 0))
 
+        # ── 리샘플링 필터/품질 ──
+        section("리샘플링")
+        frm_resample = card()
+        frm_filter = tk.Frame(frm_resample, bg=APP_CARD)
+        frm_filter.pack(fill="x", pady=(0, 4))
+        tk.Label(frm_filter, text="필터:", bg=APP_CARD, font=f_label, fg=APP_TEXT,
+                  width=9, anchor="w").pack(side="left")
+        filter_combo = ttk.Combobox(frm_filter, textvariable=self.resize_resample, state="readonly",
+                                    values=[name.upper() for name in aie_engine.RESAMPLE_FILTERS],
+                                    font=f_label, width=10)
+        filter_combo.pack(side="left", padx=(0, 12))
+        filter_combo.bind("<<ComboboxSelected>>", self._resize_schedule_estimate)
+        self.resize_lbl_estimate = tk.Label(frm_filter, text="", bg=APP_CARD, fg=APP_SUBTEXT, font=f_small)
+        self.resize_lbl_estimate.pack(side="left")
+        frm_quality_mode = tk.Frame(frm_resample, bg=APP_CARD)
+        frm_quality_mode.pack(fill="x")
+        tk.Radiobutton(frm_quality_mode, text="정확", variable=self.resize_resample_quality,
+                        value="exact", command=self._resize_schedule_estimate, bg=APP_CARD, font=f_label,
+                        fg=APP_TEXT, activebackground=APP_CARD).pack(side="left", padx=(0, 16))
+        tk.Radiobutton(frm_quality_mode, text="빠름 (정수 배 선축소 후 필터 적용)",
+                        variable=self.resize_resample_quality, value="fast",
+                        command=self._resize_schedule_estimate, bg=APP_CARD, font=f_label,
+                        fg=APP_TEXT, activebackground=APP_CARD).pack(side="left")
+        tk.Label(container, text="큰 비율로 줄일 때 '빠름'은 눈으로 거의 구분되지 않는 결과를 몇 배 빠르게 만듭니다.",
+                 bg=APP_BG, fg=APP_SUBTEXT, font=f_small).pack(anchor="w")
+
         # ── 저장 품질 (비율/직접입력 선택과 무관하게 항상 표시) ──
         section("저장 품질")
         frm_quality = card()
@@ -617,8 +889,10 @@ class ImageEditorApp:
             self._resize_set_status("파일을 찾을 수 없습니다.", APP_ERROR)
             return
         try:
-            img = Image.open(path)
-            self._resize_orig_w, self._resize_orig_h = img.size
+            # 원본 크기/형식 정보와 100×70 썸네일만 필요하므로 JPEG은 축소 디코딩으로 읽습니다.
+            thumb, orig_size, img_format, img_mode = aie_engine.load_preview_image(path, (100, 70))
+            self._resize_orig_w, self._resize_orig_h = orig_size
+            self._resize_orig_mode = img_mode
             size_kb = os.path.getsize(path) / 1024
             size_str = f"{size_kb:.1f} KB" if size_kb < 1024 else f"{size_kb / 1024:.2f} MB"
 
@@ -633,13 +907,11 @@ class ImageEditorApp:
 
             self.resize_lbl_info.config(
                 text=(f"크기: {self._resize_orig_w} × {self._resize_orig_h} px\n"
-                      f"파일 크기: {size_str}    형식: {img.format or '알 수 없음'}    "
-                      f"모드: {img.mode}"),
+                      f"파일 크기: {size_str}    형식: {img_format or '알 수 없음'}    "
+                      f"모드: {img_mode}"),
                 fg=APP_TEXT
             )
 
-            thumb = img.copy()
-            thumb.thumbnail((100, 70))
             self._resize_preview_img = ImageTk.PhotoImage(thumb)
             self.resize_canvas_prev.delete("all")
             self.resize_canvas_prev.create_image(50, 35, image=self._resize_preview_img)
@@ -662,6 +934,7 @@ class ImageEditorApp:
             self.resize_frm_quick.pack(anchor="w", pady=(0, 4))
         else:
             self.resize_frm_custom.pack(anchor="w", pady=(0, 4))
+        self._resize_schedule_estimate()
 
     def _resize_on_percent_slide(self, _=None):
         pct = int(self.resize_percent.get())
@@ -686,6 +959,61 @@ class ImageEditorApp:
             self.resize_lbl_pct_size.config(text=f"→ {nw} × {nh} px")
         else:
             self.resize_lbl_pct_size.config(text="")
+        self._resize_schedule_estimate()
+
+    # 슬라이더를 끄는 동안 매 단계마다 측정하지 않도록, 마지막 변경 후 이 시간(ms)이 지나면 측정합니다.
+    RESIZE_ESTIMATE_DELAY_MS = 150
+
+    def _resize_schedule_estimate(self, _=None):
+        if self._resize_estimate_after is not None:
+            self.master.after_cancel(self._resize_estimate_after)
+        self._resize_estimate_after = self.master.after(self.RESIZE_ESTIMATE_DELAY_MS,
+                                                        self._resize_update_estimate)
+
+    def _resize_update_estimate(self):
+        """현재 이미지 크기/모드와 목표 크기로 필터별 처리 시간을 작은 표본에서 재어 예상 시간을 보여줍니다.
+        측정(약 0.1초)은 공유 스레드 풀에서 하고, 결과는 (모드, 배율, 품질)별로 엔진이 기억합니다."""
+        self._resize_estimate_after = None
+        if not self.resize_lbl_estimate.winfo_exists():
+            return
+        if not (self._resize_orig_w and self._resize_orig_h and self._resize_orig_mode):
+            self.resize_lbl_estimate.config(text="")
+            return
+        size = (self._resize_orig_w, self._resize_orig_h)
+        try:
+            if self.resize_mode.get() == "percent":
+                target = ResizeOp(percent=self.resize_percent.get()).target_size(size)
+            else:
+                target = (max(1, self.resize_custom_w.get()), max(1, self.resize_custom_h.get()))
+        except (tk.TclError, ValueError):
+            return
+        self._resize_estimate_seq += 1
+        future = aie_engine.shared_pool().submit(
+            aie_engine.estimate_resize_seconds, size, target, self._resize_orig_mode,
+            self.resize_resample_quality.get())
+        self._resize_poll_estimate(future, self._resize_estimate_seq)
+
+    def _resize_poll_estimate(self, future, seq):
+        if seq != self._resize_estimate_seq or not self.resize_lbl_estimate.winfo_exists():
+            return  # 더 최근 요청이 있거나 다른 기능 화면으로 바뀜
+        if not future.done():
+            self.master.after(self.JOB_POLL_MS, self._resize_poll_estimate, future, seq)
+            return
+        try:
+            estimates = future.result()
+        except Exception:
+            self.resize_lbl_estimate.config(text="")
+            return
+        self.resize_lbl_estimate.config(text=self._format_estimate(estimates, self.resize_resample.get().lower()))
+
+    @staticmethod
+    def _format_estimate(estimates, name):
+        """필터별 예상 시간(estimate_resize_seconds 결과)에서 고른 필터의 안내 문구를 만듭니다."""
+        seconds, lanczos = estimates[name], estimates["lanczos"]
+        text = f"예상 처리 시간: 약 {seconds:.2f}초" if seconds < 10 else f"예상 처리 시간: 약 {seconds:.0f}초"
+        if name != "lanczos" and seconds > 0:
+            text += f" (LANCZOS의 {lanczos / seconds:.1f}배 속도)"
+        return text
 
     def _resize_set_percent(self, pct):
         self.resize_percent.set(pct)
@@ -739,6 +1067,7 @@ class ImageEditorApp:
                 other_text_var.set(str(other_val))
             except Exception:
                 pass
+        self._resize_schedule_estimate()
 
     def _guess_ext_from_path(self, path, default):
         """주어진 경로의 확장자를 소문자로 반환합니다. 경로가 없거나 확장자가 없으면 default를 반환합니다."""
@@ -750,21 +1079,6 @@ class ImageEditorApp:
         path = self.resize_image_path.get().strip() if hasattr(self, "resize_image_path") else ""
         return self._guess_ext_from_path(path, ".jpg")
 
-    def _resize_save_with_format(self, image, output_path):
-        """저장 경로의 확장자에 맞춰 포맷별 저장 옵션(품질 등)을 적용해 저장합니다."""
-        ext = os.path.splitext(output_path)[1].lower()
-        if ext in (".jpg", ".jpeg"):
-            if image.mode in ("RGBA", "P"):
-                image = image.convert("RGB")
-            image.save(output_path, format="JPEG",
-                       quality=int(self.resize_quality.get()), optimize=True)
-        elif ext == ".webp":
-            image.save(output_path, format="WEBP", quality=int(self.resize_quality.get()))
-        elif ext == ".png":
-            image.save(output_path, format="PNG", optimize=True)
-        else:
-            image.save(output_path)
-
     def _resize_set_status(self, msg, color=APP_SUBTEXT):
         self.resize_lbl_status.config(text=f"  {msg}", fg=color)
 
@@ -775,10 +1089,18 @@ class ImageEditorApp:
     CROP_CANVAS_H = 360
     CROP_HANDLE_SIZE = 9
     CROP_MIN_SIZE = 16  # 캔버스 좌표 기준 최소 크롭 크기(px)
+    CROP_FRAME_MS = 16  # 드래그 중 화면 갱신 간격 (이 사이에 들어온 움직임은 마지막 것만 반영)
+    CROP_MAX_ZOOM = 8.0  # 최대 확대 배율 (원본 1px = 화면 8px)
+    CROP_ZOOM_STEP = 1.25
+    # 8방향 핸들 (모서리 4개 + 변 중앙 4개) → 마우스를 올렸을 때의 커서
+    CROP_HANDLE_CURSORS = {
+        "tl": "size_nw_se", "br": "size_nw_se", "tr": "size_ne_sw", "bl": "size_ne_sw",
+        "t": "size_ns", "b": "size_ns", "l": "size_we", "r": "size_we",
+    }
 
     def _build_crop_ui(self, parent):
         self.crop_image_path = tk.StringVar()
-        self.crop_pil_image = None
+        self.crop_display_image = None  # 캔버스 표시용 축소 이미지 (원본은 처리 시점에 디코딩)
         self.crop_orig_w = 0
         self.crop_orig_h = 0
         self.crop_scale = 1.0
@@ -791,6 +1113,20 @@ class ImageEditorApp:
         self._crop_drag_handle = None
         self._crop_drag_start = None
         self._crop_drag_rect0 = None
+        self._crop_items = None          # 캔버스 항목 id (이미지를 불러올 때 한 번 만들고 이후에는 위치만 갱신)
+        self._crop_pending_motion = None  # 아직 반영하지 않은 마지막 드래그 좌표
+        self._crop_motion_after = None
+        # 확대/이동: crop_scale(원본 1px당 캔버스 px)과 crop_img_x0/y0(원본 (0, 0)의 캔버스 위치)로 표현하며,
+        # 화면에는 캔버스에 보이는 부분만 피라미드에서 그려 올립니다.
+        self.crop_pyramid = None
+        self.crop_fit_scale = 1.0
+        self._crop_view_origin = (0, 0)  # 캔버스에 올린 보이는 부분 이미지의 왼쪽 위 위치
+        self._crop_full_future = None  # 원본 해상도 피라미드를 만드는 백그라운드 작업
+        self._crop_pan_start = None
+        self._crop_pending_pan = None
+        self._crop_pan_after = None
+        self.crop_mcu = None  # JPEG 원본의 MCU 크기 (가로, 세로). JPEG이 아니면 None
+        self.crop_lossless = tk.BooleanVar(value=True)
 
         f_label = ("Helvetica", 10)
         f_small = ("Helvetica", 9)
@@ -832,8 +1168,33 @@ class ImageEditorApp:
         self.crop_canvas.pack()
         self.crop_canvas.bind("<B1-Motion>", self._crop_on_drag)
         self.crop_canvas.bind("<ButtonRelease-1>", self._crop_on_release)
+        # 휠: 마우스 위치를 중심으로 확대/축소, 가운데/오른쪽 버튼 드래그: 화면 이동
+        self.crop_canvas.bind("<MouseWheel>", self._crop_on_wheel)
+        self.crop_canvas.bind("<Button-4>", self._crop_on_wheel)
+        self.crop_canvas.bind("<Button-5>", self._crop_on_wheel)
+        for button in (2, 3):
+            self.crop_canvas.bind(f"<ButtonPress-{button}>", self._crop_on_pan_press)
+            self.crop_canvas.bind(f"<B{button}-Motion>", self._crop_on_pan_drag)
+        # 바인딩은 항목이 아니라 태그에 한 번만 걸어 두므로 항목을 다시 만들어도 새로 걸 필요가 없습니다.
+        self.crop_canvas.tag_bind("crop_rect", "<ButtonPress-1>", self._crop_on_rect_press)
+        self.crop_canvas.tag_bind("crop_handle", "<ButtonPress-1>", self._crop_on_handle_press)
+        self.crop_canvas.tag_bind("crop_handle", "<Enter>", self._crop_on_handle_enter)
+        self.crop_canvas.tag_bind("crop_handle", "<Leave>",
+                                  lambda e: self.crop_canvas.config(cursor="crosshair"))
         self._crop_draw_placeholder()
 
+        zoom_row = tk.Frame(frm_canvas, bg=APP_CARD)
+        zoom_row.pack(fill="x", pady=(6, 0))
+        for text, command in (("－", lambda: self._crop_zoom(1 / self.CROP_ZOOM_STEP)),
+                              ("＋", lambda: self._crop_zoom(self.CROP_ZOOM_STEP)),
+                              ("맞춤", self._crop_zoom_fit), ("1:1", lambda: self._crop_set_zoom(1.0))):
+            tk.Button(zoom_row, text=text, command=command, bg=APP_BORDER, fg=APP_TEXT, font=f_small,
+                      relief="flat", cursor="hand2", padx=8).pack(side="left", padx=(0, 4))
+        self.crop_lbl_zoom = tk.Label(zoom_row, text="", bg=APP_CARD, fg=APP_TEXT, font=f_small)
+        self.crop_lbl_zoom.pack(side="left", padx=(6, 0))
+        tk.Label(zoom_row, text="휠: 확대/축소 · 오른쪽 버튼 드래그: 이동", bg=APP_CARD, fg=APP_SUBTEXT,
+                 font=("Helvetica", 8)).pack(side="right")
+
         info_row = tk.Frame(container, bg=APP_BG)
         info_row.pack(fill="x", pady=(6, 0))
         self.crop_lbl_info = tk.Label(info_row, text="이미지를 선택하면 잘라낼 영역을 지정할 수 있습니다.",
@@ -842,6 +1203,17 @@ class ImageEditorApp:
         tk.Button(info_row, text="영역 초기화", command=self._crop_reset, bg=APP_BORDER, fg=APP_TEXT,
                   font=f_small, relief="flat", cursor="hand2", padx=10).pack(side="right")
 
+        # ── JPEG 무손실 자르기 (MCU 블록 경계에 맞춘 영역만 무손실로 자를 수 있음) ──
+        frm_lossless = card()
+        self.crop_chk_lossless = tk.Checkbutton(
+            frm_lossless, text="JPEG 무손실 자르기 (왼쪽/위 경계를 8/16px 블록에 맞춤)",
+            variable=self.crop_lossless, command=self._crop_redraw, bg=APP_CARD, fg=APP_TEXT,
+            font=f_label, activebackground=APP_CARD, anchor="w", state="disabled")
+        self.crop_chk_lossless.pack(anchor="w")
+        tk.Label(frm_lossless, text="원본과 저장 형식이 모두 JPEG이고 jpegtran이 있을 때 적용되며, "
+                                    "실제로 잘릴 영역을 점선으로 표시합니다.",
+                 bg=APP_CARD, fg=APP_SUBTEXT, font=("Helvetica", 8), anchor="w").pack(anchor="w")
+
         # ── 상태 안내 (저장은 하단 공용 '미리보기'/'실행' 버튼 사용) ──
         bottom_row = tk.Frame(container, bg=APP_BG)
         bottom_row.pack(fill="x", pady=(8, 0))
@@ -854,6 +1226,7 @@ class ImageEditorApp:
 
     def _crop_draw_placeholder(self):
         self.crop_canvas.delete("all")
+        self._crop_items = None
         self.crop_canvas.create_text(
             self.CROP_CANVAS_W // 2, self.CROP_CANVAS_H // 2,
             text="이미지를 선택하세요", fill=APP_SUBTEXT, font=("Helvetica", 10)
@@ -880,106 +1253,256 @@ class ImageEditorApp:
         if not os.path.isfile(path):
             self.crop_lbl_status.config(text="  파일을 찾을 수 없습니다.", fg=APP_ERROR)
             return
+        # 캔버스 표시에는 축소 이미지만 필요하므로 JPEG은 축소 디코딩으로 읽고,
+        # 원본 해상도 디코딩은 미리보기/실행 시점(_build_job의 로더)으로 미룹니다.
+        max_w, max_h = self.CROP_CANVAS_W - 20, self.CROP_CANVAS_H - 20
         try:
-            img = Image.open(path)
-            img.load()
+            disp_img, orig_size, _fmt, _mode = aie_engine.load_preview_image(path, (max_w, max_h))
         except Exception as e:
             self.crop_lbl_status.config(text=f"  이미지 열기 실패: {e}", fg=APP_ERROR)
             return
 
         self.crop_image_path.set(path)
-        self.crop_pil_image = img
-        self.crop_orig_w, self.crop_orig_h = img.size
+        self.crop_display_image = disp_img
+        self.crop_orig_w, self.crop_orig_h = orig_size
+        try:
+            self.crop_mcu = aie_engine.jpeg_mcu_size(path)
+        except Exception:
+            self.crop_mcu = None
+        # jpegtran이 없으면 격자에 맞춰 넓혀도 무손실로 얻는 것이 없으므로 선택할 수 없게 둡니다.
+        lossless_ok = bool(self.crop_mcu and aie_engine.find_jpegtran())
+        self.crop_chk_lossless.config(state="normal" if lossless_ok else "disabled")
 
-        # 캔버스 안에 맞도록 축소 비율 계산 (확대는 하지 않음)
-        max_w, max_h = self.CROP_CANVAS_W - 20, self.CROP_CANVAS_H - 20
-        scale = min(max_w / self.crop_orig_w, max_h / self.crop_orig_h, 1.0)
-        self.crop_scale = scale
-        self.crop_disp_w = max(1, int(self.crop_orig_w * scale))
-        self.crop_disp_h = max(1, int(self.crop_orig_h * scale))
-        self.crop_img_x0 = (self.CROP_CANVAS_W - self.crop_disp_w) // 2
-        self.crop_img_y0 = (self.CROP_CANVAS_H - self.crop_disp_h) // 2
+        # 캔버스 안에 맞도록 축소 비율 계산 (처음에는 확대하지 않음)
+        self.crop_fit_scale = min(max_w / self.crop_orig_w, max_h / self.crop_orig_h, 1.0)
+        self._crop_apply_view(self.crop_fit_scale, 0, 0)
 
-        disp_img = img.copy()
-        if disp_img.mode not in ("RGB", "RGBA"):
-            disp_img = disp_img.convert("RGBA")
-        disp_img.thumbnail((self.crop_disp_w, self.crop_disp_h), Image.Resampling.LANCZOS)
-        self.crop_photo = ImageTk.PhotoImage(disp_img)
+        # 축소 이미지로 만든 피라미드로 그리고, 원본 해상도 피라미드는 축소 이미지보다 크게 확대할 때
+        # 처음 만듭니다(_crop_request_full_pyramid). 확대하지 않으면 원본은 처리 시점에만 디코딩합니다.
+        self.crop_pyramid = aie_engine.ImagePyramid(disp_img, (self.crop_orig_w, self.crop_orig_h))
+        self._crop_full_future = None
 
         # 잘라낼 영역을 이미지 전체로 초기화
         self.crop_rect = [self.crop_img_x0, self.crop_img_y0,
                            self.crop_img_x0 + self.crop_disp_w, self.crop_img_y0 + self.crop_disp_h]
 
+        self._crop_render_view()
+        self._crop_create_items()
         self._crop_redraw()
         self.crop_lbl_status.config(text=f"  이미지 로드 완료: {os.path.basename(path)}", fg=APP_SUCCESS)
 
+    # ── 확대/이동 ──
+    def _crop_apply_view(self, scale, x0, y0):
+        """보기 배율과 원본 (0, 0)의 캔버스 위치를 정합니다. 이미지가 캔버스보다 작은 방향은 가운데에 두고,
+        큰 방향은 캔버스 밖에 빈 공간이 생기지 않도록 이동 범위를 제한합니다."""
+        self.crop_scale = scale
+        self.crop_disp_w = self.crop_orig_w * scale
+        self.crop_disp_h = self.crop_orig_h * scale
+        if self.crop_disp_w <= self.CROP_CANVAS_W:
+            x0 = (self.CROP_CANVAS_W - self.crop_disp_w) / 2
+        else:
+            x0 = min(0, max(self.CROP_CANVAS_W - self.crop_disp_w, x0))
+        if self.crop_disp_h <= self.CROP_CANVAS_H:
+            y0 = (self.CROP_CANVAS_H - self.crop_disp_h) / 2
+        else:
+            y0 = min(0, max(self.CROP_CANVAS_H - self.crop_disp_h, y0))
+        self.crop_img_x0, self.crop_img_y0 = x0, y0
+        self.crop_lbl_zoom.config(text=f"{scale * 100:.0f}%")
+
+    def _crop_change_view(self, scale, x0, y0):
+        """보기를 바꾸고, 잘라낼 영역은 원본 좌표가 그대로 유지되도록 새 캔버스 좌표로 옮깁니다."""
+        if not self.crop_display_image:
+            return
+        old_scale, old_x0, old_y0 = self.crop_scale, self.crop_img_x0, self.crop_img_y0
+        src = [(self.crop_rect[i] - (old_x0 if i % 2 == 0 else old_y0)) / old_scale for i in range(4)]
+        self._crop_apply_view(scale, x0, y0)
+        self._crop_request_full_pyramid()
+        self.crop_rect = [self.crop_img_x0 + src[0] * self.crop_scale, self.crop_img_y0 + src[1] * self.crop_scale,
+                          self.crop_img_x0 + src[2] * self.crop_scale, self.crop_img_y0 + src[3] * self.crop_scale]
+        self._crop_render_view()
+        self._crop_redraw()
+
+    def _crop_set_zoom(self, scale, cx=None, cy=None):
+        """캔버스 점 (cx, cy)(기본: 가운데) 아래의 원본 위치를 고정한 채 배율을 바꿉니다."""
+        if not self.crop_display_image:
+            return
+        scale = max(self.crop_fit_scale, min(max(self.CROP_MAX_ZOOM, self.crop_fit_scale), scale))
+        cx = self.CROP_CANVAS_W / 2 if cx is None else cx
+        cy = self.CROP_CANVAS_H / 2 if cy is None else cy
+        sx = (cx - self.crop_img_x0) / self.crop_scale
+        sy = (cy - self.crop_img_y0) / self.crop_scale
+        self._crop_change_view(scale, cx - sx * scale, cy - sy * scale)
+
+    def _crop_zoom(self, factor, cx=None, cy=None):
+        self._crop_set_zoom(self.crop_scale * factor, cx, cy)
+
+    def _crop_zoom_fit(self):
+        self._crop_set_zoom(self.crop_fit_scale)
+
+    def _crop_on_wheel(self, event):
+        if getattr(event, "num", None) == 5 or getattr(event, "delta", 0) < 0:
+            factor = 1 / self.CROP_ZOOM_STEP
+        else:
+            factor = self.CROP_ZOOM_STEP
+        self._crop_zoom(factor, event.x, event.y)
+
+    def _crop_on_pan_press(self, event):
+        self._crop_pan_start = (event.x, event.y, self.crop_img_x0, self.crop_img_y0)
+
+    def _crop_on_pan_drag(self, event):
+        # 크롭 영역 드래그와 같이 한 프레임에 마지막 움직임만 반영합니다.
+        if not self._crop_pan_start or not self.crop_display_image:
+            return
+        self._crop_pending_pan = (event.x, event.y)
+        if self._crop_pan_after is None:
+            self._crop_pan_after = self.master.after(self.CROP_FRAME_MS, self._crop_flush_pan)
+
+    def _crop_flush_pan(self):
+        self._crop_pan_after = None
+        pan, self._crop_pending_pan = self._crop_pending_pan, None
+        if pan is None or not self._crop_pan_start:
+            return
+        px, py, x0, y0 = self._crop_pan_start
+        self._crop_change_view(self.crop_scale, x0 + pan[0] - px, y0 + pan[1] - py)
+
+    def _crop_render_view(self):
+        """캔버스에 보이는 부분만 피라미드에서 그려 crop_photo로 만듭니다. (비용이 캔버스 크기에 비례)"""
+        vx1, vy1 = max(0.0, self.crop_img_x0), max(0.0, self.crop_img_y0)
+        vx2 = min(float(self.CROP_CANVAS_W), self.crop_img_x0 + self.crop_disp_w)
+        vy2 = min(float(self.CROP_CANVAS_H), self.crop_img_y0 + self.crop_disp_h)
+        # 화면 픽셀 경계에 맞춰 그려야 이미지와 크롭 영역 표시가 어긋나지 않습니다.
+        vx1, vy1, vx2, vy2 = int(vx1), int(vy1), max(int(vx1) + 1, round(vx2)), max(int(vy1) + 1, round(vy2))
+        box = tuple((v - o) / self.crop_scale for v, o in ((vx1, self.crop_img_x0), (vy1, self.crop_img_y0),
+                                                           (vx2, self.crop_img_x0), (vy2, self.crop_img_y0)))
+        view = self.crop_pyramid.render(box, (vx2 - vx1, vy2 - vy1))
+        # 투명한 부분은 캔버스 배경색 대신 체크무늬로 보여줍니다.
+        self.crop_photo = ImageTk.PhotoImage(aie_engine.composite_on_checkerboard(view))
+        self._crop_view_origin = (vx1, vy1)
+        if self._crop_items is not None:
+            self.crop_canvas.itemconfigure(self._crop_items["image"], image=self.crop_photo)
+            self.crop_canvas.coords(self._crop_items["image"], vx1, vy1)
+
+    def _crop_request_full_pyramid(self):
+        """축소 이미지의 해상도를 넘어 확대하면 원본 해상도 피라미드를 뒤에서 만듭니다. (이미지당 한 번)
+        원본 디코딩 결과는 공유 캐시에 남으므로 미리보기/실행에서 다시 디코딩하지 않습니다."""
+        pyramid = self.crop_pyramid
+        if (pyramid is None or pyramid.base_scale >= 1 or self.crop_scale <= pyramid.base_scale
+                or self._crop_full_future is not None):
+            return
+        path = self.crop_image_path.get()
+        self._crop_full_future = aie_engine.shared_pool().submit(
+            lambda: aie_engine.ImagePyramid(aie_engine.load_image(path)))
+        self.master.after(self.JOB_POLL_MS, self._crop_poll_full_pyramid, path, self._crop_full_future)
+
+    def _crop_poll_full_pyramid(self, path, future):
+        if future is not self._crop_full_future or not self.crop_canvas.winfo_exists():
+            return  # 다른 이미지를 불러왔거나 화면이 바뀜
+        if not future.done():
+            self.master.after(self.JOB_POLL_MS, self._crop_poll_full_pyramid, path, future)
+            return
+        try:
+            pyramid = future.result()
+        except Exception:
+            # 원본을 읽지 못하면 축소 이미지로 계속 표시 (실행 시 오류로 안내됨).
+            # 끝난 작업을 그대로 두어 확대할 때마다 다시 디코딩하지 않습니다.
+            return
+        self._crop_full_future = None
+        if self.crop_display_image and self.crop_image_path.get() == path:
+            self.crop_pyramid = pyramid
+            self._crop_render_view()
+
     def _crop_reset(self):
-        if not self.crop_pil_image:
+        if not self.crop_display_image:
             return
         self.crop_rect = [self.crop_img_x0, self.crop_img_y0,
                            self.crop_img_x0 + self.crop_disp_w, self.crop_img_y0 + self.crop_disp_h]
         self._crop_redraw()
 
-    def _crop_redraw(self):
+    def _crop_create_items(self):
+        """캔버스 항목(이미지, 어둡게 칠할 바깥 영역 4개, 크롭 영역, MCU 정렬 영역, 핸들 8개)을 만듭니다.
+        이미지를 불러올 때 한 번만 호출하고, 드래그 중에는 _crop_redraw가 좌표만 옮깁니다."""
         c = self.crop_canvas
         c.delete("all")
-        if not self.crop_pil_image:
+        dim_kwargs = dict(fill="black", stipple="gray50", outline="")
+        items = {
+            "image": c.create_image(*self._crop_view_origin, anchor="nw", image=self.crop_photo),
+            "dims": [c.create_rectangle(0, 0, 0, 0, **dim_kwargs) for _ in range(4)],
+            # 크롭 영역 (내부를 옅게 채워서 어디를 클릭해도 이동 드래그가 되도록 함)
+            "rect": c.create_rectangle(0, 0, 0, 0, outline=APP_ACCENT, width=2,
+                                       fill=APP_ACCENT, stipple="gray12", tags="crop_rect"),
+            # 무손실 자르기: MCU 격자에 맞춰 실제로 잘릴 영역 (점선)
+            "snap": c.create_rectangle(0, 0, 0, 0, outline=APP_WARN, width=1, dash=(4, 3), state="hidden"),
+            "handles": {},
+        }
+        for name in self.CROP_HANDLE_CURSORS:
+            items["handles"][name] = c.create_rectangle(0, 0, 0, 0, fill=APP_ACCENT, outline="white", width=1,
+                                                        tags=("crop_handle", f"crop_handle_{name}"))
+        self._crop_items = items
+
+    def _crop_redraw(self):
+        """crop_rect에 맞춰 캔버스 항목의 좌표만 갱신합니다. (항목을 지우고 다시 만들지 않음)"""
+        if not self.crop_display_image:
             self._crop_draw_placeholder()
             return
-
-        c.create_image(self.crop_img_x0, self.crop_img_y0, anchor="nw", image=self.crop_photo)
+        if self._crop_items is None:
+            self._crop_create_items()
+        c = self.crop_canvas
+        items = self._crop_items
 
         x1, y1, x2, y2 = self.crop_rect
         ix1, iy1 = self.crop_img_x0, self.crop_img_y0
         ix2, iy2 = self.crop_img_x0 + self.crop_disp_w, self.crop_img_y0 + self.crop_disp_h
 
-        # 잘려나갈(제외되는) 바깥 영역을 어둡게 표시
-        dim_kwargs = dict(fill="black", stipple="gray50", outline="")
-        if y1 > iy1:
-            c.create_rectangle(ix1, iy1, ix2, y1, **dim_kwargs)
-        if y2 < iy2:
-            c.create_rectangle(ix1, y2, ix2, iy2, **dim_kwargs)
-        if x1 > ix1:
-            c.create_rectangle(ix1, y1, x1, y2, **dim_kwargs)
-        if x2 < ix2:
-            c.create_rectangle(x2, y1, ix2, y2, **dim_kwargs)
-
-        # 크롭 영역 (내부를 옅게 채워서 어디를 클릭해도 이동 드래그가 되도록 함)
-        rect_id = c.create_rectangle(x1, y1, x2, y2, outline=APP_ACCENT, width=2,
-                                      fill=APP_ACCENT, stipple="gray12", tags="crop_rect")
-        c.tag_bind(rect_id, "<ButtonPress-1>", self._crop_on_rect_press)
-
-        # 8방향 핸들 (모서리 4개 + 변 중앙 4개)
-        hs = self.CROP_HANDLE_SIZE
+        # 잘려나갈(제외되는) 바깥 영역을 어둡게 표시 (폭이 0이면 그려지지 않음)
+        for item, box in zip(items["dims"], ((ix1, iy1, ix2, y1), (ix1, y2, ix2, iy2),
+                                             (ix1, y1, x1, y2), (x2, y1, ix2, y2))):
+            c.coords(item, *box)
+        c.coords(items["rect"], x1, y1, x2, y2)
+
+        if self._crop_is_lossless():
+            sx1, sy1, sx2, sy2 = self._crop_get_effective_coords()
+            c.coords(items["snap"], ix1 + sx1 * self.crop_scale, iy1 + sy1 * self.crop_scale,
+                     ix1 + sx2 * self.crop_scale, iy1 + sy2 * self.crop_scale)
+            c.itemconfigure(items["snap"], state="disabled")
+        else:
+            c.itemconfigure(items["snap"], state="hidden")
+
+        hs = self.CROP_HANDLE_SIZE / 2
         mx, my = (x1 + x2) / 2, (y1 + y2) / 2
         handle_positions = {
             "tl": (x1, y1), "t": (mx, y1), "tr": (x2, y1),
             "l": (x1, my), "r": (x2, my),
             "bl": (x1, y2), "b": (mx, y2), "br": (x2, y2),
         }
-        cursor_map = {
-            "tl": "size_nw_se", "br": "size_nw_se", "tr": "size_ne_sw", "bl": "size_ne_sw",
-            "t": "size_ns", "b": "size_ns", "l": "size_we", "r": "size_we",
-        }
         for name, (hx, hy) in handle_positions.items():
-            hid = c.create_rectangle(hx - hs / 2, hy - hs / 2, hx + hs / 2, hy + hs / 2,
-                                      fill=APP_ACCENT, outline="white", width=1)
-            cur = cursor_map[name]
-            c.tag_bind(hid, "<ButtonPress-1>", lambda e, n=name: self._crop_on_handle_press(e, n))
-            c.tag_bind(hid, "<Enter>", lambda e, cu=cur: self.crop_canvas.config(cursor=cu))
-            c.tag_bind(hid, "<Leave>", lambda e: self.crop_canvas.config(cursor="crosshair"))
+            c.coords(items["handles"][name], hx - hs, hy - hs, hx + hs, hy + hs)
 
         self._crop_update_info_label()
 
     def _crop_update_info_label(self):
-        x1, y1, x2, y2 = self._crop_get_original_coords()
+        x1, y1, x2, y2 = self._crop_get_effective_coords()
         w, h = max(0, x2 - x1), max(0, y2 - y1)
-        self.crop_lbl_info.config(
-            text=f"잘라낼 영역: {w} × {h} px  (원본 {self.crop_orig_w} × {self.crop_orig_h} px 중)",
-            fg=APP_TEXT
-        )
-
-    def _crop_on_handle_press(self, event, handle_name):
+        text = f"잘라낼 영역: {w} × {h} px  (원본 {self.crop_orig_w} × {self.crop_orig_h} px 중)"
+        if self._crop_is_lossless():
+            text += f"  · {self.crop_mcu[0]}×{self.crop_mcu[1]} 블록 정렬"
+        self.crop_lbl_info.config(text=text, fg=APP_TEXT)
+
+    def _crop_current_handle(self):
+        """마우스 아래에 있는 핸들 이름 ('tl', 't', ...). 핸들이 아니면 None."""
+        for tag in self.crop_canvas.gettags("current"):
+            if tag.startswith("crop_handle_"):
+                return tag[len("crop_handle_"):]
+        return None
+
+    def _crop_on_handle_enter(self, event):
+        name = self._crop_current_handle()
+        if name:
+            self.crop_canvas.config(cursor=self.CROP_HANDLE_CURSORS[name])
+
+    def _crop_on_handle_press(self, event):
+        handle_name = self._crop_current_handle()
+        if not handle_name:
+            return
         self._crop_drag_handle = handle_name
         self._crop_drag_start = (event.x, event.y)
         self._crop_drag_rect0 = list(self.crop_rect)
@@ -990,25 +1513,40 @@ class ImageEditorApp:
         self._crop_drag_rect0 = list(self.crop_rect)
 
     def _crop_on_drag(self, event):
-        if not self._crop_drag_handle or not self.crop_pil_image:
+        """움직임 이벤트는 좌표만 기록하고, 화면 갱신은 CROP_FRAME_MS마다 마지막 좌표로 한 번만 합니다.
+        (마우스가 빠르게 움직여 이벤트가 몰려도 이벤트마다 다시 그리지 않음)"""
+        if not self._crop_drag_handle or not self.crop_display_image:
+            return
+        self._crop_pending_motion = (event.x, event.y)
+        if self._crop_motion_after is None:
+            self._crop_motion_after = self.master.after(self.CROP_FRAME_MS, self._crop_flush_motion)
+
+    def _crop_flush_motion(self):
+        self._crop_motion_after = None
+        motion, self._crop_pending_motion = self._crop_pending_motion, None
+        if motion is None or not self._crop_drag_handle or not self.crop_display_image:
             return
         if self._crop_drag_handle == "move":
-            self._crop_do_move_drag(event)
+            self._crop_do_move_drag(*motion)
         else:
-            self._crop_do_handle_drag(event)
+            self._crop_do_handle_drag(*motion)
 
     def _crop_on_release(self, event):
+        # 아직 그리지 않은 마지막 움직임을 반영한 뒤 드래그를 끝냅니다.
+        if self._crop_motion_after is not None:
+            self.master.after_cancel(self._crop_motion_after)
+            self._crop_flush_motion()
         self._crop_drag_handle = None
         self._crop_drag_start = None
         self._crop_drag_rect0 = None
 
-    def _crop_do_handle_drag(self, event):
+    def _crop_do_handle_drag(self, x, y):
         ix1, iy1 = self.crop_img_x0, self.crop_img_y0
         ix2, iy2 = self.crop_img_x0 + self.crop_disp_w, self.crop_img_y0 + self.crop_disp_h
         min_size = self.CROP_MIN_SIZE
 
-        x = max(ix1, min(ix2, event.x))
-        y = max(iy1, min(iy2, event.y))
+        x = max(ix1, min(ix2, x))
+        y = max(iy1, min(iy2, y))
 
         x1, y1, x2, y2 = self.crop_rect
         h = self._crop_drag_handle
@@ -1025,14 +1563,14 @@ class ImageEditorApp:
         self.crop_rect = [x1, y1, x2, y2]
         self._crop_redraw()
 
-    def _crop_do_move_drag(self, event):
+    def _crop_do_move_drag(self, x, y):
         if not self._crop_drag_rect0 or not self._crop_drag_start:
             return
         ix1, iy1 = self.crop_img_x0, self.crop_img_y0
         ix2, iy2 = self.crop_img_x0 + self.crop_disp_w, self.crop_img_y0 + self.crop_disp_h
 
-        dx = event.x - self._crop_drag_start[0]
-        dy = event.y - self._crop_drag_start[1]
+        dx = x - self._crop_drag_start[0]
+        dy = y - self._crop_drag_start[1]
         x1, y1, x2, y2 = self._crop_drag_rect0
         w, h = x2 - x1, y2 - y1
 
@@ -1044,7 +1582,7 @@ class ImageEditorApp:
 
     def _crop_get_original_coords(self):
         """캔버스 좌표계의 크롭 영역을 원본 이미지 픽셀 좌표로 변환합니다."""
-        if not self.crop_pil_image or self.crop_scale <= 0:
+        if not self.crop_display_image or self.crop_scale <= 0:
             return 0, 0, 0, 0
         x1, y1, x2, y2 = self.crop_rect
         ox1 = round((x1 - self.crop_img_x0) / self.crop_scale)
@@ -1057,22 +1595,30 @@ class ImageEditorApp:
         oy2 = max(0, min(oy2, self.crop_orig_h))
         return ox1, oy1, ox2, oy2
 
+    def _crop_is_lossless(self):
+        return bool(self.crop_display_image and self.crop_mcu and self.crop_lossless.get()
+                    and aie_engine.find_jpegtran())
+
+    def _crop_get_effective_coords(self):
+        """JPEG으로 저장할 때 실제로 잘릴 원본 좌표. 무손실 자르기가 켜져 있으면 MCU 격자에 맞춘 영역입니다.
+        (캔버스 표시용이며, 작업은 _crop_get_original_coords의 영역으로 만들고 JPEG 저장 시에만 맞춥니다.)"""
+        box = self._crop_get_original_coords()
+        if self._crop_is_lossless():
+            box = aie_engine.snap_crop_to_mcu(box, self.crop_mcu)
+        return box
+
     def _crop_guess_ext(self):
         path = self.crop_image_path.get().strip() if hasattr(self, "crop_image_path") else ""
         return self._guess_ext_from_path(path, ".png")
 
-    def _crop_save_with_format(self, image, output_path):
-        ext = os.path.splitext(output_path)[1].lower()
-        if ext in (".jpg", ".jpeg") and image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-        image.save(output_path)
-
     # ========================================================================
     # "ICO 파일 변환" 기능 (ico_converter.py 이식)
     # ========================================================================
     def _build_ico_ui(self, parent):
         self.ico_image_path = None
-        self.ico_pil_image = None
+        self.ico_preview_image = None  # 110px 미리보기용 축소 이미지 (원본은 처리 시점에 디코딩)
+        self.ico_orig_size = (0, 0)
+        self.ico_transparent = False
         self.ico_output_path = None
         self.ico_preview_photo = None
 
@@ -1107,6 +1653,8 @@ class ImageEditorApp:
             bd=0, padx=20, pady=8, cursor="hand2", command=self._ico_select_file
         )
         self.ico_select_btn.pack()
+        tk.Button(inner, text="폴더 일괄 변환…", font=f_small, bg=APP_BORDER, fg=APP_TEXT,
+                  relief="flat", cursor="hand2", padx=10, command=self._ico_convert_folder).pack(pady=(6, 0))
 
         self.ico_drop_frame.drop_target_register(DND_FILES)
         self.ico_drop_frame.dnd_bind("<<Drop>>", self._ico_on_drop)
@@ -1178,14 +1726,18 @@ class ImageEditorApp:
 
     def _ico_load_image(self, path):
         try:
-            img = Image.open(path)
-            img.load()
+            preview, orig_size, _fmt, mode = aie_engine.load_preview_image(path, (110, 110))
+            # 투명도는 알파/팔레트 모드일 때만 원본에서 확인합니다. (JPEG 등은 원본을 디코딩하지 않음)
+            transparent = (mode in ("RGBA", "LA", "P")
+                           and aie_engine.has_transparency(aie_engine.load_image(path)))
         except Exception as e:
             messagebox.showerror("이미지 열기 실패", f"이미지를 여는 중 오류가 발생했습니다.\n\n{e}")
             return
 
         self.ico_image_path = path
-        self.ico_pil_image = img
+        self.ico_preview_image = preview
+        self.ico_orig_size = orig_size
+        self.ico_transparent = transparent
 
         base, _ext = os.path.splitext(path)
         self.ico_output_path = base + ".ico"
@@ -1193,10 +1745,39 @@ class ImageEditorApp:
         self._ico_refresh_info()
         self._ico_refresh_preview()
 
+    def _ico_convert_folder(self):
+        """폴더 안의 이미지(하위 폴더 제외)를 각각 원본 옆의 같은 이름 .ico 파일로 한 번에 변환합니다.
+        변환은 작업 스레드에서 공유 스레드 풀로 동시에 처리합니다(aie_engine.IcoBatchOp)."""
+        folder = filedialog.askdirectory(title="ICO로 변환할 이미지 폴더 선택")
+        if not folder:
+            return
+        paths = sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                       if name.lower().endswith(ICO_SUPPORTED_EXTS)
+                       and os.path.isfile(os.path.join(folder, name)))
+        if not paths:
+            messagebox.showwarning("경고", "폴더에 변환할 이미지가 없습니다.")
+            return
+        existing = [p for p in paths if os.path.exists(aie_engine.ico_output_path(p))]
+        if existing and not messagebox.askyesno(
+                "덮어쓰기 확인", f"이미 있는 ICO 파일 {len(existing)}개를 덮어씁니다. 계속할까요?"):
+            return
+
+        def on_done(results):
+            failures = [(src, error) for src, _out, error in results if error]
+            message = f"{len(results) - len(failures)}/{len(results)}개 ICO 파일을 만들었습니다:\n{folder}"
+            if failures:
+                details = "\n".join(f"- {os.path.basename(src)}: {error}" for src, error in failures[:10])
+                messagebox.showwarning("일부 실패", f"{message}\n\n실패한 파일:\n{details}")
+            else:
+                messagebox.showinfo("성공", message)
+
+        op = aie_engine.IcoBatchOp(self.encoder_profile.get())
+        self._start_job((op, lambda: paths, paths), on_done, f"ICO 파일 {len(paths)}개를 만드는 중...")
+
     def _ico_refresh_info(self):
         name = os.path.basename(self.ico_image_path)
-        w, h = self.ico_pil_image.size
-        transparent = self._ico_has_transparency(self.ico_pil_image)
+        w, h = self.ico_orig_size
+        transparent = self.ico_transparent
 
         self.ico_name_label.config(text=name)
         self.ico_meta_label.config(
@@ -1215,57 +1796,189 @@ class ImageEditorApp:
                 fg=APP_SUBTEXT
             )
 
-    @staticmethod
-    def _ico_has_transparency(img):
-        if img.mode in ("RGBA", "LA"):
-            return img.getchannel("A").getextrema()[0] < 255
-        if img.mode == "P" and "transparency" in img.info:
-            return True
-        return False
-
     def _ico_refresh_preview(self):
-        thumb = self.ico_pil_image.copy()
-        thumb.thumbnail((110, 110), Image.Resampling.LANCZOS)
+        thumb = self.ico_preview_image
         if thumb.mode != "RGBA":
             thumb = thumb.convert("RGBA")
 
-        checker = self._ico_checker_bg(thumb.size)
-        composed = Image.alpha_composite(checker, thumb)
+        composed = Image.alpha_composite(aie_engine.checkerboard(thumb.size), thumb)
 
         self.ico_preview_photo = ImageTk.PhotoImage(composed)
         self.ico_preview_canvas.delete("all")
         self.ico_preview_canvas.create_image(60, 60, image=self.ico_preview_photo)
 
     @staticmethod
-    def _ico_checker_bg(size, cell=8):
-        """투명 영역을 시각적으로 보여주기 위한 체크무늬 배경 생성."""
-        w, h = size
-        bg = Image.new("RGBA", (w, h), (255, 255, 255, 255))
-        light, dark = (255, 255, 255, 255), (222, 222, 224, 255)
-        for y in range(0, h, cell):
-            for x in range(0, w, cell):
-                color = dark if ((x // cell) + (y // cell)) % 2 == 0 else light
-                bw, bh = min(cell, w - x), min(cell, h - y)
-                bg.paste(Image.new("RGBA", (bw, bh), color), (x, y))
-        return bg
+    def _ico_frames_sheet(master, gap=16):
+        """ICO에 들어갈 프레임(큰 것부터)을 체크무늬 배경 위에 아래쪽을 맞춰 가로로 늘어놓은 이미지."""
+        frames = sorted(aie_engine.ico_frames(master).items(), reverse=True)
+        width = sum(size[0] for size, _img in frames) + gap * (len(frames) + 1)
+        height = max(size[1] for size, _img in frames) + gap * 2
+        sheet = Image.new("RGBA", (width, height), (255, 255, 255, 255))
+        x = gap
+        for (fw, fh), frame in frames:
+            y = height - gap - fh
+            checker = aie_engine.checkerboard((fw, fh), cell=max(2, min(8, fw // 8)))
+            sheet.paste(Image.alpha_composite(checker, frame), (x, y))
+            x += fw + gap
+        return sheet
+
+    # ========================================================================
+    # "여러 이미지 병합 (격자)" - 장수 제한 없는 이미지 목록과 행 × 열 설정
+    # ========================================================================
+    def _build_merge_list_ui(self, container):
+        self._ui_section(container, "이미지 목록 (위에서부터 왼쪽→오른쪽, 위→아래 순서로 배치)")
+        card = self._ui_card(container)
+
+        list_row = tk.Frame(card, bg=APP_CARD)
+        list_row.pack(fill="x")
+        self.merge_listbox = tk.Listbox(list_row, height=7, selectmode=tk.EXTENDED, font=("Courier", 9),
+                                        bg="#F5F7FA", relief="flat", activestyle="none",
+                                        highlightthickness=0, fg=APP_TEXT)
+        scroll = ttk.Scrollbar(list_row, orient="vertical", command=self.merge_listbox.yview)
+        self.merge_listbox.config(yscrollcommand=scroll.set)
+        self.merge_listbox.pack(side="left", fill="x", expand=True)
+        scroll.pack(side="left", fill="y")
+        self.merge_listbox.drop_target_register(DND_FILES)
+        self.merge_listbox.dnd_bind("<<Drop>>", self._merge_list_on_drop)
+
+        btn_row = tk.Frame(card, bg=APP_CARD)
+        btn_row.pack(fill="x", pady=(6, 0))
+        for text, command, accent in (("파일 추가", self._merge_list_browse_files, True),
+                                      ("폴더 추가", self._merge_list_browse_folder, True),
+                                      ("위로", lambda: self._merge_list_move(-1), False),
+                                      ("아래로", lambda: self._merge_list_move(1), False),
+                                      ("삭제", self._merge_list_remove, False),
+                                      ("모두 지우기", self._merge_list_clear, False)):
+            tk.Button(btn_row, text=text, command=command, relief="flat", cursor="hand2", padx=8,
+                      bg=APP_ACCENT if accent else APP_BORDER, fg="white" if accent else APP_TEXT,
+                      font=("Helvetica", 9, "bold" if accent else "normal")).pack(side="left", padx=(0, 4))
+        self.merge_list_count_label = tk.Label(btn_row, bg=APP_CARD, fg=APP_SUBTEXT, font=("Helvetica", 9))
+        self.merge_list_count_label.pack(side="right")
+
+        self._ui_section(container, "격자 배치")
+        grid_card = self._ui_card(container)
+        tk.Checkbutton(grid_card, text="자동 (장수에 맞춰 정사각형에 가깝게)", variable=self.merge_grid_auto,
+                       command=self._merge_list_refresh, bg=APP_CARD, fg=APP_TEXT, font=("Helvetica", 10),
+                       activebackground=APP_CARD, anchor="w").grid(row=0, column=0, columnspan=4, sticky="w")
+        rows, cols = aie_engine.auto_grid_shape(max(2, len(self.merge_list_paths)))
+        tk.Label(grid_card, text="행:", bg=APP_CARD, fg=APP_TEXT, font=("Helvetica", 10)).grid(
+            row=1, column=0, sticky="w", pady=4)
+        rows_stepper, self.merge_rows_var = self._create_stepper(grid_card, 1, 100, rows, width=4)
+        rows_stepper.grid(row=1, column=1, sticky="w", padx=(4, 16), pady=4)
+        tk.Label(grid_card, text="열:", bg=APP_CARD, fg=APP_TEXT, font=("Helvetica", 10)).grid(
+            row=1, column=2, sticky="w", pady=4)
+        cols_stepper, self.merge_cols_var = self._create_stepper(grid_card, 1, 100, cols, width=4)
+        cols_stepper.grid(row=1, column=3, sticky="w", padx=4, pady=4)
+        self.merge_grid_steppers = (rows_stepper, cols_stepper)
+        for var in (self.merge_rows_var, self.merge_cols_var):
+            var.trace_add("write", lambda *_: self._merge_list_refresh_shape())
+            var.trace_add("write", self._live_preview_schedule)
+        self.merge_grid_shape_label = tk.Label(grid_card, bg=APP_CARD, fg=APP_SUBTEXT, font=("Helvetica", 9),
+                                               anchor="w")
+        self.merge_grid_shape_label.grid(row=2, column=0, columnspan=4, sticky="w")
+
+        self._merge_list_refresh()
+
+    def _merge_list_refresh(self):
+        """목록 상자와 장수/격자 안내를 self.merge_list_paths에 맞춰 다시 그립니다."""
+        self.merge_listbox.delete(0, tk.END)
+        for i, path in enumerate(self.merge_list_paths, 1):
+            self.merge_listbox.insert(tk.END, f"{i:>3}. {os.path.basename(path)}")
+        self.merge_list_count_label.config(text=f"{len(self.merge_list_paths)}장")
+        auto = self.merge_grid_auto.get()
+        for stepper in self.merge_grid_steppers:
+            self._set_widget_tree_state(stepper, "disabled" if auto else "normal")
+        if auto:
+            rows, cols = aie_engine.auto_grid_shape(max(2, len(self.merge_list_paths)))
+            self.merge_rows_var.set(str(rows))
+            self.merge_cols_var.set(str(cols))
+        self._merge_list_refresh_shape()
+        self._live_preview_schedule()
 
     @staticmethod
-    def _ico_fit_to_square(img, size):
-        """비율을 유지한 채 정사각형 캔버스 중앙에 배치하고 남는 영역은 투명 처리."""
-        img = img.convert("RGBA")
-        w, h = img.size
-        scale = min(size[0] / w, size[1] / h)
-        nw, nh = max(1, round(w * scale)), max(1, round(h * scale))
-        resized = img.resize((nw, nh), Image.Resampling.LANCZOS)
-        canvas = Image.new("RGBA", size, (0, 0, 0, 0))
-        offset = ((size[0] - nw) // 2, (size[1] - nh) // 2)
-        canvas.paste(resized, offset, resized)
-        return canvas
+    def _set_widget_tree_state(widget, state):
+        """widget과 그 안의 모든 하위 위젯 중 state 옵션이 있는 것을 한꺼번에 활성/비활성화합니다."""
+        pending = [widget]
+        while pending:
+            w = pending.pop()
+            pending.extend(w.winfo_children())
+            try:
+                w.config(state=state)
+            except tk.TclError:
+                pass  # Frame처럼 state 옵션이 없는 위젯
+
+    def _merge_list_refresh_shape(self):
+        count = len(self.merge_list_paths)
+        try:
+            rows, cols = int(self.merge_rows_var.get()), int(self.merge_cols_var.get())
+        except ValueError:
+            return
+        if count and rows * cols < count:
+            text, color = f"{rows}행 × {cols}열 격자에는 {rows * cols}장까지만 넣을 수 있습니다.", APP_ERROR
+        else:
+            text, color = f"{rows}행 × {cols}열 격자에 {count}장을 배치합니다.", APP_SUBTEXT
+        self.merge_grid_shape_label.config(text=text, fg=color)
+
+    def _merge_list_add(self, paths):
+        """파일/폴더 경로를 목록 끝에 추가합니다. 폴더는 안의 이미지들을 이름순으로 펼칩니다."""
+        for path in paths:
+            if os.path.isdir(path):
+                names = sorted(n for n in os.listdir(path) if n.lower().endswith(aie_engine.IMAGE_EXTS))
+                self.merge_list_paths.extend(os.path.join(path, n) for n in names)
+            elif os.path.isfile(path):
+                self.merge_list_paths.append(path)
+        self._merge_list_refresh()
+
+    def _merge_list_on_drop(self, event):
+        try:
+            paths = self.master.splitlist(event.data)
+        except Exception:
+            paths = [event.data]
+        self._merge_list_add(paths)
+
+    def _merge_list_browse_files(self):
+        paths = filedialog.askopenfilenames(
+            title="병합할 이미지 선택 (여러 개 선택 가능)",
+            filetypes=[("이미지 파일", "*.jpg *.jpeg *.png *.bmp *.gif *.webp *.tiff *.tif"), ("모든 파일", "*.*")])
+        if paths:
+            self._merge_list_add(paths)
+
+    def _merge_list_browse_folder(self):
+        folder = filedialog.askdirectory(title="병합할 이미지가 들어 있는 폴더 선택")
+        if folder:
+            self._merge_list_add([folder])
+
+    def _merge_list_move(self, delta):
+        selected = list(self.merge_listbox.curselection())
+        if not selected:
+            return
+        paths = self.merge_list_paths
+        order = selected if delta < 0 else reversed(selected)
+        moved = []
+        for i in order:
+            j = i + delta
+            if 0 <= j < len(paths) and j not in moved:
+                paths[i], paths[j] = paths[j], paths[i]
+                moved.append(j)
+            else:
+                moved.append(i)
+        self._merge_list_refresh()
+        for i in moved:
+            self.merge_listbox.selection_set(i)
+
+    def _merge_list_remove(self):
+        for i in sorted(self.merge_listbox.curselection(), reverse=True):
+            del self.merge_list_paths[i]
+        self._merge_list_refresh()
+
+    def _merge_list_clear(self):
+        self.merge_list_paths.clear()
+        self._merge_list_refresh()
 
     def _create_merge_options_widgets(self, container, mode):
         """병합 모드에 필요한 옵션 위젯들을 카드 스타일로 생성합니다."""
         # 모든 병합 모드(2장/3장 가로·세로, 4분할 그리드)에서 "크기 기준" 옵션을 보여줍니다.
-        if mode in ("2_horiz", "2_vert", "3_horiz", "3_vert", "4_grid"):
+        if mode in MERGE_MODES:
             self._ui_section(container, "크기 기준")
             size_card = self._ui_card(container)
             tk.Label(size_card, text="사진 크기가 서로 다를 경우:", bg=APP_CARD, fg=APP_TEXT,
@@ -1276,6 +1989,17 @@ class ImageEditorApp:
                 tk.Radiobutton(size_card, text=text, variable=self.merge_size_mode, value=value,
                                bg=APP_CARD, fg=APP_TEXT, font=("Helvetica", 10),
                                activebackground=APP_CARD, anchor="w").pack(anchor="w")
+            filter_row = tk.Frame(size_card, bg=APP_CARD)
+            filter_row.pack(anchor="w", pady=(6, 0))
+            tk.Label(filter_row, text="리샘플링 필터:", bg=APP_CARD, fg=APP_TEXT,
+                     font=("Helvetica", 10)).pack(side="left")
+            ttk.Combobox(filter_row, textvariable=self.merge_resample, state="readonly", width=10,
+                         values=[name.upper() for name in aie_engine.RESAMPLE_FILTERS],
+                         font=("Helvetica", 10)).pack(side="left", padx=8)
+            # 예상 시간은 실시간 미리보기와 함께(같은 지연 후) 다시 계산합니다. (_live_preview_update)
+            self.merge_lbl_estimate = tk.Label(size_card, text="", bg=APP_CARD, fg=APP_SUBTEXT,
+                                               font=("Helvetica", 9), anchor="w")
+            self.merge_lbl_estimate.pack(anchor="w", pady=(4, 0))
 
         self._ui_section(container, "여백 및 테두리 설정")
         card = self._ui_card(container)
@@ -1293,6 +2017,8 @@ class ImageEditorApp:
                  anchor="w", width=18).grid(row=2, column=0, sticky="w", pady=(14, 4))
         border_stepper, self.border_var = self._create_stepper(card, 0, 50, 0)
         border_stepper.grid(row=2, column=1, sticky="w", pady=(14, 4))
+        for var in (self.gap_var, self.border_var):
+            var.trace_add("write", self._live_preview_schedule)
 
         tk.Label(card, text="테두리 색상:", bg=APP_CARD, fg=APP_TEXT, font=("Helvetica", 10),
                  anchor="w", width=18).grid(row=3, column=0, sticky="w", pady=4)
@@ -1349,6 +2075,7 @@ class ImageEditorApp:
                 entry_widget.delete(0, tk.END)
                 entry_widget.insert(0, filepaths[0])
                 entry_widget.config(state="readonly")
+                self._live_preview_schedule()
         except Exception as e:
             messagebox.showerror("드롭 처리 오류", f"파일 드롭 처리 중 오류 발생: {e}")
 
@@ -1356,6 +2083,7 @@ class ImageEditorApp:
         file_path = filedialog.askopenfilename(title="이미지 파일 선택", filetypes=[("이미지 파일", "*.jpg *.jpeg *.png *.bmp *.gif"), ("모든 파일", "*.*")])
         if file_path:
             entry_widget.config(state="normal"); entry_widget.delete(0, tk.END); entry_widget.insert(0, file_path); entry_widget.config(state="readonly")
+            self._live_preview_schedule()
 
     def open_link(self, url):
         try: webbrowser.open_new_tab(url)
@@ -1370,55 +2098,52 @@ class ImageEditorApp:
             messagebox.showwarning("색상 오류", f"잘못된 색상 코드 '{color_code}'입니다.\n기본값 '{default_color}'로 대체합니다.")
             return default_color
     
-    def _merge_save_with_format(self, image, output_path):
-        """병합 결과 이미지를 저장 경로의 확장자에 맞춰 저장합니다.
-        PNG/WEBP 등 투명도를 지원하는 포맷은 그대로 저장하고, JPEG처럼 투명도를
-        지원하지 않는 포맷은 흰색 배경에 합성한 뒤 저장합니다."""
-        ext = os.path.splitext(output_path)[1].lower()
-        if ext in (".jpg", ".jpeg"):
-            if image.mode == "RGBA":
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[3])
-                image = background
-            image.save(output_path, format="JPEG", quality=95, optimize=True)
-        else:
-            image.save(output_path)
-
-    def _load_multiple_images(self, num_expected):
-        images, image_paths = [], [entry.get() for entry in self.image_paths_entries]
-        if len(image_paths) != num_expected: return None
-        for i, path in enumerate(image_paths):
-            if not path:
-                messagebox.showwarning("경고", f"{num_expected}개의 이미지를 모두 선택해주세요 (이미지 {i+1} 누락)."); return None
+    @staticmethod
+    def _load_multiple_images(image_paths):
+        """병합할 이미지들을 공유 스레드 풀에서 동시에 불러와 입력 순서대로 돌려줍니다.
+        (작업 스레드에서 호출되므로 대화상자를 띄우지 않고, 실패한 칸의 정보를 담아 EngineError를 발생시킵니다.
+        여러 칸이 실패하면 가장 앞선 칸의 오류를 알립니다.)"""
+        def load(path):
             try:
-                img = Image.open(path)
-                # 투명도를 포함해 일관되게 합성할 수 있도록 RGBA로 통일합니다.
-                # (팔레트 모드의 투명 정보도 convert('RGBA')에서 올바르게 펼쳐집니다.)
-                img = img.convert('RGBA')
-                images.append(img)
+                # 원본 모드 그대로 불러오고, RGB/RGBA 통일은 엔진(MergeOp)이 투명도 유무를 보고 결정합니다.
+                # 디코딩 결과는 공유 캐시에 남아 미리보기 후 실행 시 다시 디코딩하지 않습니다.
+                return aie_engine.load_image(path)
             except Exception as e:
-                messagebox.showerror("오류", f"이미지 로드/처리 중 오류 ({path}): {e}"); return None
-        return images
+                raise EngineError(f"이미지 로드/처리 중 오류 ({path}): {e}")
+        return aie_engine.parallel_map(load, image_paths)
 
-    def _load_single_image(self, entry_widget):
-        path = entry_widget.get()
-        if not path:
-            messagebox.showwarning("경고", "처리할 이미지를 선택해주세요."); return None
+    @staticmethod
+    def _load_single_image(path):
+        """뒤집기/회전 대상 이미지를 불러옵니다. (작업 스레드에서 호출)"""
         try:
-            img = Image.open(path)
+            img = aie_engine.load_image(path)
             if img.mode == 'RGBA': img = img.convert('RGB')
             return img
         except FileNotFoundError:
-            messagebox.showerror("오류", f"파일을 찾을 수 없습니다: {path}"); return None
+            raise EngineError(f"파일을 찾을 수 없습니다: {path}")
         except Exception as e:
-            messagebox.showerror("오류", f"이미지 로드 중 오류 ({path}): {e}"); return None
+            raise EngineError(f"이미지 로드 중 오류 ({path}): {e}")
+
+    def _collect_merge_paths(self, num_expected):
+        if num_expected is None:  # 여러 이미지 병합 (격자)
+            if len(self.merge_list_paths) < 2:
+                messagebox.showwarning("경고", "병합할 이미지를 2개 이상 추가해주세요."); return None
+            return list(self.merge_list_paths)
+        image_paths = [entry.get() for entry in self.image_paths_entries]
+        if len(image_paths) != num_expected: return None
+        for i, path in enumerate(image_paths):
+            if not path:
+                messagebox.showwarning("경고", f"{num_expected}개의 이미지를 모두 선택해주세요 (이미지 {i+1} 누락)."); return None
+        return image_paths
 
-    def _generate_processed_image(self):
-        """현재 설정에 따라 처리된 이미지를 생성합니다."""
+    def _build_job(self):
+        """현재 화면의 옵션 값을 읽어 (작업 객체, 입력 로더, 원본 경로 목록)을 만듭니다.
+        Tk 변수는 메인 스레드에서만 읽어야 하므로 여기서 모든 값을 확정하고, 파일 디코딩과
+        실제 처리는 로더/작업 객체에 담아 작업 스레드(_start_job)로 넘깁니다.
+        입력값이 올바르지 않으면 안내 대화상자를 띄우고 None을 반환합니다."""
         mode = self.active_mode_value
-        processed_image = None
 
-        if mode in ["2_horiz", "2_vert", "3_horiz", "3_vert", "4_grid"]:
+        if mode in MERGE_MODES:
             try:
                 gap = int(self.gap_var.get())
                 border_width = int(self.border_var.get())
@@ -1439,157 +2164,530 @@ class ImageEditorApp:
             self._update_preview_from_entry(self.current_border_color, self.border_color_preview)
             self._update_preview_from_entry(self.current_fill_color, self.fill_color_preview)
 
-            num_images = 2 if mode in ["2_horiz", "2_vert"] else 3 if mode in ["3_horiz", "3_vert"] else 4 if mode == "4_grid" else 0
-            images = self._load_multiple_images(num_images)
-            if not images: return None
-
-            size_mode = self.merge_size_mode.get()
-            if mode in ["2_horiz", "3_horiz"]: processed_image = self.merge_horizontal(images, gap, gap_color, size_mode, fill_color)
-            elif mode in ["2_vert", "3_vert"]: processed_image = self.merge_vertical(images, gap, gap_color, size_mode, fill_color)
-            elif mode == "4_grid": processed_image = self.merge_4_grid(images, gap, gap_color, size_mode, fill_color)
-            
-            if processed_image and border_width > 0:
-                processed_image = ImageOps.expand(processed_image, border=border_width, fill=border_color)
+            image_paths = self._collect_merge_paths(MERGE_MODES[mode][1])
+            if not image_paths: return None
 
-        elif mode == "flip_image":
-            image = self._load_single_image(self.single_image_entry)
-            if not image: return None
-            
-            flip_option_text = self.flip_options_combobox.get()
-            if flip_option_text == "좌우 뒤집기":
-                processed_image = image.transpose(Image.FLIP_LEFT_RIGHT)
-            elif flip_option_text == "상하 뒤집기":
-                processed_image = image.transpose(Image.FLIP_TOP_BOTTOM)
-            elif flip_option_text == "상하/좌우 뒤집기":
-                processed_image = image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.FLIP_TOP_BOTTOM)
-            else:
-                messagebox.showerror("오류", "유효한 뒤집기 옵션을 선택해주세요.")
+            grid_shape = {}
+            if MERGE_MODES[mode][1] is None and not self.merge_grid_auto.get():
+                try:
+                    grid_shape = dict(rows=int(self.merge_rows_var.get()), cols=int(self.merge_cols_var.get()))
+                except ValueError:
+                    messagebox.showerror("입력 오류", "행 수와 열 수는 숫자여야 합니다.")
+                    return None
+            try:
+                op = MergeOp.from_mode(mode, gap=gap, gap_color=gap_color, border=border_width,
+                                       border_color=border_color, fill_color=fill_color,
+                                       size_mode=self.merge_size_mode.get(),
+                                       resample=self.merge_resample.get().lower(), **grid_shape)
+                op.validate(len(image_paths))
+            except EngineError as e:
+                messagebox.showerror("입력 오류", str(e))
                 return None
+            return op, lambda: self._load_multiple_images(image_paths), image_paths
 
-        elif mode == "rotate_image":
-            image = self._load_single_image(self.single_image_entry)
-            if not image: return None
-            
-            rotate_option_text = self.rotate_options_combobox.get()
-            if rotate_option_text == "시계 방향으로 90°":
-                processed_image = image.transpose(Image.ROTATE_270)
-            elif rotate_option_text == "시계 방향으로 180°":
-                processed_image = image.transpose(Image.ROTATE_180)
-            elif rotate_option_text == "시계 방향으로 270°":
-                processed_image = image.transpose(Image.ROTATE_90)
-            else:
-                messagebox.showerror("오류", "유효한 회전 옵션을 선택해주세요.")
+        elif mode in ("flip_image", "rotate_image"):
+            path = self.single_image_entry.get() if self.single_image_entry else ""
+            if not path:
+                messagebox.showwarning("경고", "처리할 이미지를 선택해주세요."); return None
+
+            op = self._selected_transform_op(mode)
+            if op is None:
+                kind = "뒤집기" if mode == "flip_image" else "회전"
+                messagebox.showerror("오류", f"유효한 {kind} 옵션을 선택해주세요.")
                 return None
+            return op, lambda: self._load_single_image(path), [path]
 
         elif mode == "resize_image":
             path = self.resize_image_path.get().strip() if hasattr(self, "resize_image_path") else ""
             if not path or not os.path.isfile(path):
                 messagebox.showwarning("경고", "크기를 조정할 이미지를 먼저 선택해주세요.")
                 return None
-            try:
-                img = Image.open(path)
-            except Exception as e:
-                messagebox.showerror("오류", f"이미지 로드 중 오류가 발생했습니다: {e}")
-                return None
 
-            orig_w, orig_h = img.size
+            quality = self.resize_resample_quality.get()
+            resample = self.resize_resample.get().lower()
             if self.resize_mode.get() == "percent":
-                pct = self.resize_percent.get() / 100
-                new_w = max(1, int(orig_w * pct))
-                new_h = max(1, int(orig_h * pct))
+                op = ResizeOp(percent=self.resize_percent.get(), quality=quality, resample=resample)
             else:
                 try:
-                    new_w = max(1, self.resize_custom_w.get())
-                    new_h = max(1, self.resize_custom_h.get())
+                    op = ResizeOp(width=self.resize_custom_w.get(), height=self.resize_custom_h.get(),
+                                  quality=quality, resample=resample)
                 except (tk.TclError, ValueError):
                     messagebox.showwarning("경고", "너비/높이 값이 올바르지 않습니다. 값을 다시 확인해주세요.")
                     return None
 
-            processed_image = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+            def load_resize_source():
+                try:
+                    return aie_engine.load_image(path)
+                except Exception as e:
+                    raise EngineError(f"이미지 로드 중 오류가 발생했습니다: {e}")
+            return op, load_resize_source, [path]
 
         elif mode == "crop_image":
-            if not getattr(self, "crop_pil_image", None):
+            if not getattr(self, "crop_display_image", None):
                 messagebox.showwarning("경고", "자를 이미지를 먼저 선택해주세요.")
                 return None
             x1, y1, x2, y2 = self._crop_get_original_coords()
             if (x2 - x1) < 1 or (y2 - y1) < 1:
                 messagebox.showwarning("경고", "잘라낼 영역이 너무 작습니다.")
                 return None
-            processed_image = self.crop_pil_image.crop((x1, y1, x2, y2))
+            path = self.crop_image_path.get()
+            return CropOp((x1, y1, x2, y2)), lambda: aie_engine.load_image(path), [path]
 
         elif mode == "ico_convert":
-            if not getattr(self, "ico_pil_image", None):
+            if not getattr(self, "ico_preview_image", None):
                 messagebox.showwarning("경고", "ICO로 변환할 이미지를 먼저 선택해주세요.")
                 return None
-            processed_image = self._ico_fit_to_square(self.ico_pil_image, ICO_LARGEST_SIZE)
+            path = self.ico_image_path
+            return IcoOp(ICO_LARGEST_SIZE), lambda: aie_engine.load_image(path), [path]
+
+        return None
+
+    # ========================================================================
+    # 실시간 미리보기 (옵션을 바꾸면 축소 입력으로 결과를 바로 다시 그림)
+    # ========================================================================
+    LIVE_PREVIEW_MODES = ("flip_image", "rotate_image", "resize_image")  # 병합 모드(MERGE_MODES)도 지원
+    LIVE_PREVIEW_SIZE = (220, 180)
+    # 슬라이더/스테퍼를 연달아 움직이는 동안에는 다시 그리지 않고, 마지막 변경 후 이 시간(ms)이 지나면 그립니다.
+    LIVE_PREVIEW_DELAY_MS = 100
+
+    def _build_live_preview_pane(self, parent):
+        pane = tk.Frame(parent, bg=APP_BG)
+        pane.pack(side="right", fill="y", padx=(10, 0))
+        self._ui_section(pane, "실시간 미리보기")
+        card = self._ui_card(pane)
+        width, height = self.LIVE_PREVIEW_SIZE
+        self.live_preview_canvas = tk.Canvas(card, width=width, height=height, bg="#EAECF2",
+                                             highlightthickness=0)
+        self.live_preview_canvas.pack()
+        self.live_preview_label = tk.Label(card, text="", bg=APP_CARD, fg=APP_TEXT, font=("Helvetica", 9),
+                                           anchor="w", justify="left")
+        self.live_preview_label.pack(fill="x", pady=(6, 0))
+        tk.Label(card, text="옵션을 바꾸면 축소한 이미지로 바로 다시 그립니다.\n"
+                            "원본 해상도 처리는 '실행'할 때만 합니다.",
+                 bg=APP_CARD, fg=APP_SUBTEXT, font=("Helvetica", 8), justify="left", anchor="w").pack(
+                     fill="x", pady=(2, 0))
+
+    def _live_preview_alive(self):
+        return self.live_preview_canvas is not None and self.live_preview_canvas.winfo_exists()
+
+    def _live_preview_schedule(self, *_):
+        """옵션이 바뀔 때 호출됩니다. (Tk 변수 trace/이벤트 콜백 겸용)"""
+        if self._live_preview_after is not None:
+            self.master.after_cancel(self._live_preview_after)
+            self._live_preview_after = None
+        if self._live_preview_alive():
+            self._live_preview_after = self.master.after(self.LIVE_PREVIEW_DELAY_MS, self._live_preview_update)
+
+    def _live_preview_message(self, text):
+        self._live_preview_seq += 1  # 아직 그리는 중인 이전 결과는 버립니다.
+        width, height = self.LIVE_PREVIEW_SIZE
+        self.live_preview_canvas.delete("all")
+        self.live_preview_canvas.create_text(width // 2, height // 2, text=text, fill=APP_SUBTEXT,
+                                             font=("Helvetica", 9), width=width - 20, justify="center")
+        self.live_preview_label.config(text="")
+
+    def _live_preview_job(self):
+        """현재 옵션 값으로 (작업 객체, 원본 경로 목록)을 만듭니다. 아직 그릴 수 없으면 안내 문구를 돌려줍니다.
+        입력 중인 값이 잠시 올바르지 않은 경우가 많으므로 _build_job과 달리 대화상자를 띄우지 않습니다."""
+        mode = self.active_mode_value
+        if mode in MERGE_MODES:
+            if MERGE_MODES[mode][1] is None:
+                paths = list(self.merge_list_paths)
+            else:
+                paths = [entry.get() for entry in self.image_paths_entries]
+            if len(paths) < 2 or not all(paths):
+                return "병합할 이미지를 모두 선택하면\n여기에 결과가 보입니다."
+            try:
+                gap, border = int(self.gap_var.get()), int(self.border_var.get())
+                colors = [var.get() for var in (self.current_gap_color, self.current_border_color,
+                                                self.current_fill_color)]
+                for color in colors:
+                    Image.new("RGB", (1, 1), color)
+                grid_shape = {}
+                if MERGE_MODES[mode][1] is None and not self.merge_grid_auto.get():
+                    grid_shape = dict(rows=int(self.merge_rows_var.get()), cols=int(self.merge_cols_var.get()))
+            except ValueError:
+                return "여백/테두리/행·열 값이나 색상 코드를 확인해주세요."
+            try:
+                op = MergeOp.from_mode(mode, gap=gap, gap_color=colors[0], border=border,
+                                       border_color=colors[1], fill_color=colors[2],
+                                       size_mode=self.merge_size_mode.get(),
+                                       resample=self.merge_resample.get().lower(), **grid_shape)
+                op.validate(len(paths))
+            except EngineError as e:
+                return str(e)
+            return op, paths
+
+        if mode in ("flip_image", "rotate_image"):
+            path = self.single_image_entry.get() if self.single_image_entry else ""
+            op = self._selected_transform_op(mode)
+            if not path or op is None:
+                return "이미지를 선택하면\n여기에 결과가 보입니다."
+            return op, [path]
+
+        if mode == "resize_image":
+            path = self.resize_image_path.get().strip()
+            if not path or not os.path.isfile(path):
+                return "이미지를 선택하면\n여기에 결과가 보입니다."
+            try:
+                if self.resize_mode.get() == "percent":
+                    op = ResizeOp(percent=self.resize_percent.get(), resample=self.resize_resample.get().lower())
+                else:
+                    op = ResizeOp(width=self.resize_custom_w.get(), height=self.resize_custom_h.get(),
+                                  resample=self.resize_resample.get().lower())
+            except (tk.TclError, ValueError):
+                return "크기 값을 확인해주세요."
+            return op, [path]
+        return None
+
+    def _live_preview_update(self):
+        """현재 옵션으로 축소 결과를 공유 스레드 풀에서 그립니다. 원본 해상도 처리는 '실행' 때만 합니다."""
+        self._live_preview_after = None
+        if not self._live_preview_alive():
+            return
+        job = self._live_preview_job()
+        if job is None:
+            return
+        if isinstance(job, str):
+            self._live_preview_message(job)
+            self._merge_update_estimate(None, None)
+            return
+        op, paths = job
+        self._live_preview_seq += 1
+        future = aie_engine.shared_pool().submit(aie_engine.render_live_preview, op, paths,
+                                                 self.LIVE_PREVIEW_SIZE)
+        self._live_preview_poll(future, self._live_preview_seq)
+        if isinstance(op, MergeOp):
+            self._merge_update_estimate(op, paths)
+
+    def _merge_update_estimate(self, op, paths):
+        """병합 입력을 배치 크기로 맞추는 예상 시간을 필터별로 재어 보여줍니다. op가 None이면 문구를 지웁니다.
+        측정은 공유 스레드 풀에서 하며, 크기 조정 화면과 같은 표본 측정 결과를 엔진이 기억해 다시 씁니다."""
+        if not self._merge_estimate_alive():
+            return
+        self._merge_estimate_seq += 1
+        if op is None:
+            self.merge_lbl_estimate.config(text="")
+            return
+        future = aie_engine.shared_pool().submit(aie_engine.estimate_merge_seconds, op, paths)
+        self._merge_poll_estimate(future, self._merge_estimate_seq)
+
+    def _merge_estimate_alive(self):
+        label = getattr(self, "merge_lbl_estimate", None)
+        return label is not None and label.winfo_exists()
+
+    def _merge_poll_estimate(self, future, seq):
+        if seq != self._merge_estimate_seq or not self._merge_estimate_alive():
+            return  # 더 최근 요청이 있거나 다른 기능 화면으로 바뀜
+        if not future.done():
+            self.master.after(self.JOB_POLL_MS, self._merge_poll_estimate, future, seq)
+            return
+        try:
+            estimates = future.result()
+        except Exception:
+            self.merge_lbl_estimate.config(text="")
+            return
+        name = self.merge_resample.get().lower()
+        if not estimates[name]:
+            self.merge_lbl_estimate.config(text="크기를 맞출 입력이 없어 리샘플링하지 않습니다.")
+            return
+        self.merge_lbl_estimate.config(text=self._format_estimate(estimates, name))
 
-        return processed_image
+    def _live_preview_poll(self, future, seq):
+        if seq != self._live_preview_seq or not self._live_preview_alive():
+            return  # 더 최근 요청이 있거나 다른 기능 화면으로 바뀜
+        if not future.done():
+            self.master.after(self.JOB_POLL_MS, self._live_preview_poll, future, seq)
+            return
+        try:
+            image, (out_w, out_h) = future.result()
+        except Exception as e:
+            self._live_preview_message(str(e) if isinstance(e, EngineError) else f"미리보기를 그릴 수 없습니다.\n{e}")
+            return
+        width, height = self.LIVE_PREVIEW_SIZE
+        # 투명한 결과는 체크무늬 위에 보여줍니다.
+        self._live_preview_photo = ImageTk.PhotoImage(aie_engine.composite_on_checkerboard(image))
+        self.live_preview_canvas.delete("all")
+        self.live_preview_canvas.create_image(width // 2, height // 2, image=self._live_preview_photo)
+        self.live_preview_label.config(text=f"결과 크기: {out_w} × {out_h} px")
+
+    # ========================================================================
+    # 작업 스레드 (미리보기/실행 중에도 Tk mainloop가 멈추지 않도록 처리)
+    # ========================================================================
+    JOB_POLL_MS = 50
+
+    def _build_job_status_row(self, bottom_frame, before):
+        """하단 버튼 위에 표시되는 진행 표시줄 + 상태 문구 + 취소 버튼 (작업 중일 때만 보임)."""
+        self.job_frame = tk.Frame(bottom_frame, bg=APP_BG)
+        self._job_pack_before = before
+        self.job_progress = ttk.Progressbar(self.job_frame, mode="indeterminate", length=220)
+        self.job_progress.pack(side=tk.LEFT, padx=(0, 10))
+        self.job_status_label = tk.Label(self.job_frame, text="", bg=APP_BG, fg=APP_SUBTEXT,
+                                          font=('Helvetica', 9), anchor="w")
+        self.job_status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.job_cancel_btn = tk.Button(self.job_frame, text="취소", command=self._cancel_job,
+                                         bg=APP_BORDER, fg=APP_TEXT, font=('Helvetica', 9),
+                                         relief="flat", cursor="hand2", padx=10)
+        self.job_cancel_btn.pack(side=tk.RIGHT)
+
+    def _set_busy(self, busy, message=""):
+        state = "disabled" if busy else "normal"
+        self.preview_btn.config(state=state)
+        self.action_btn.config(state=state)
+        if busy:
+            self.job_status_label.config(text=message, fg=APP_SUBTEXT)
+            if not self.job_cancel_btn.winfo_ismapped():
+                self.job_cancel_btn.pack(side=tk.RIGHT)
+            if not self.job_frame.winfo_ismapped():
+                self.job_frame.pack(fill=tk.X, pady=(0, 8), before=self._job_pack_before)
+            self.job_progress.start(12)
+        else:
+            self.job_progress.stop()
+            self.job_frame.pack_forget()
+            self._refresh_save_status()
+
+    # ------------------------------------------------------------------------
+    # 저장 스레드 (인코딩/파일 기록을 UI 스레드 밖에서 순서대로 처리)
+    # ------------------------------------------------------------------------
+    def _enqueue_save(self, image, output_path, profile, quality, save_kwargs=None):
+        """처리 결과를 저장 대기열에 넣습니다. 저장 스레드는 대기열이 빌 때까지 순서대로 저장하고 끝나며,
+        데몬 스레드가 아니므로 창을 닫아도 진행 중인 저장은 마저 끝납니다.
+        저장은 임시 파일에 쓴 뒤 이름을 바꾸므로(aie_engine.save_image) 도중에 실패해도 깨진 파일이 남지 않습니다."""
+        with self._save_lock:
+            self._save_pending.append((image, output_path, profile, quality, save_kwargs))
+            start_thread = not self._save_running
+            self._save_running = True
+        self._save_count += 1
+        if start_thread:
+            threading.Thread(target=self._save_worker, name="aie-save").start()
+        if self._save_count == 1:
+            self.master.after(self.JOB_POLL_MS, self._poll_saves)
+        self._refresh_save_status()
+
+    def _save_worker(self):
+        while True:
+            with self._save_lock:
+                if not self._save_pending:
+                    self._save_running = False
+                    return
+                image, output_path, profile, quality, save_kwargs = self._save_pending.popleft()
+            self._save_results.put(("start", output_path))
+            try:
+                aie_engine.save_image(image, output_path, profile, quality, save_kwargs)
+                self._save_results.put(("saved", output_path))
+            except Exception as e:
+                self._save_results.put(("error", f"이미지 저장 중 오류 발생: {e}"))
+
+    def _poll_saves(self):
+        while True:
+            try:
+                kind, payload = self._save_results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "start":
+                self._save_current = payload
+            else:
+                self._save_count -= 1
+                self._save_current = None
+                if kind == "saved":
+                    messagebox.showinfo("성공", f"작업이 성공적으로 완료되어 저장되었습니다:\n{payload}")
+                else:
+                    messagebox.showerror("저장 오류", payload)
+        self._refresh_save_status()
+        if self._save_count > 0:
+            self.master.after(self.JOB_POLL_MS, self._poll_saves)
+
+    def _refresh_save_status(self):
+        """처리 중인 작업이 없을 때 하단 상태 줄에 저장 진행 상황을 표시합니다. (버튼은 계속 사용 가능)"""
+        if self._active_job:
+            return
+        if self._save_count <= 0:
+            if self.job_frame.winfo_ismapped():
+                self.job_progress.stop()
+                self.job_frame.pack_forget()
+            return
+        name = os.path.basename(self._save_current) if self._save_current else ""
+        waiting = self._save_count - 1
+        text = f"저장하는 중: {name}" if name else "저장을 준비하는 중..."
+        if waiting > 0:
+            text += f"  (대기 {waiting}개)"
+        self.job_status_label.config(text=text, fg=APP_SUBTEXT)
+        self.job_cancel_btn.pack_forget()
+        if not self.job_frame.winfo_ismapped():
+            self.job_frame.pack(fill=tk.X, pady=(0, 8), before=self._job_pack_before)
+            self.job_progress.start(12)
+
+    def _job_fingerprint(self, op, paths):
+        """처리 결과를 결정하는 모든 값(기능, 작업 객체의 옵션, 원본 파일의 경로/수정 시각/크기)을
+        하나의 키로 묶습니다. 작업 객체는 불변 dataclass라 옵션 값 비교가 그대로 됩니다.
+        원본 파일 정보를 읽을 수 없으면 None을 반환해 재사용하지 않습니다."""
+        try:
+            sources = tuple(aie_engine.ImageCache.make_key(p) for p in paths)
+        except (OSError, TypeError):
+            return None
+        return (self.active_mode_value, op, sources)
+
+    def _has_cached_result(self, job):
+        op, _loader, paths = job
+        fingerprint = self._job_fingerprint(op, paths)
+        return bool(fingerprint is not None and self._last_result and self._last_result[0] == fingerprint)
+
+    def _start_job(self, job, on_success, message, post=None, cancel_event=None):
+        """작업 객체를 작업 스레드에서 실행하고, 결과는 master.after 폴링으로 메인 스레드에 전달합니다.
+        post가 주어지면 처리 결과에 대해 작업 스레드에서 추가로 실행합니다(예: 미리보기용 축소).
+        작업 스레드는 Tk 위젯/변수를 절대 건드리지 않고 큐로만 진행 상황과 결과를 보냅니다.
+        직전 결과와 지문이 같으면(미리보기 후 설정을 바꾸지 않고 실행) 처리를 건너뛰고 그 결과를 씁니다.
+        병합 미리보기는 축소 결과만 만들므로(MergePreviewOp) 기억하지 않으며, 병합은 같은 설정으로
+        '실행'을 다시 누를 때만 직전 결과를 재사용합니다."""
+        op, loader, paths = job
+        fingerprint = self._job_fingerprint(op, paths)
+        cached = None
+        if fingerprint is not None and self._last_result and self._last_result[0] == fingerprint:
+            cached = self._last_result[1]
+
+        self._job_seq += 1
+        job_id = self._job_seq
+        cancel_event = cancel_event or threading.Event()
+        self._active_job = (job_id, cancel_event)
+        results = queue.Queue()
+
+        def worker():
+            try:
+                if cached is not None:
+                    result = cached
+                else:
+                    results.put(("stage", "이미지를 불러오는 중..."))
+                    inputs = loader()
+                    if cancel_event.is_set():
+                        return
+                    results.put(("stage", "이미지를 처리하는 중..."))
+                    result = op.apply(inputs)
+                final = result
+                if post is not None and not cancel_event.is_set():
+                    final = post(result)
+                results.put(("done", (result, final)))
+            except EngineError as e:
+                results.put(("error", str(e)))
+            except Exception as e:
+                results.put(("error", f"이미지 처리 중 오류가 발생했습니다: {e}"))
+
+        threading.Thread(target=worker, name=f"aie-job-{job_id}", daemon=True).start()
+        self._set_busy(True, message)
+        self.master.after(self.JOB_POLL_MS, self._poll_job, job_id, results, on_success, fingerprint)
+
+    def _poll_job(self, job_id, results, on_success, fingerprint):
+        # 취소되었거나 다른 작업으로 대체된 경우 결과를 버리고 폴링을 멈춥니다.
+        if not self._active_job or self._active_job[0] != job_id:
+            return
+        while True:
+            try:
+                kind, payload = results.get_nowait()
+            except queue.Empty:
+                self.master.after(self.JOB_POLL_MS, self._poll_job, job_id, results, on_success, fingerprint)
+                return
+            if kind == "stage":
+                self.job_status_label.config(text=payload)
+                continue
+            self._active_job = None
+            self._set_busy(False)
+            if kind == "error":
+                messagebox.showerror("오류", payload)
+            else:
+                result, final = payload
+                if fingerprint is not None and isinstance(result, Image.Image):
+                    self._last_result = (fingerprint, result)
+                on_success(final)
+            return
+
+    def _cancel_job(self):
+        """진행 중인 작업을 취소합니다. PIL 연산 자체는 중간에 멈출 수 없으므로 작업 스레드는
+        다음 단계에서 스스로 종료하고, 그 사이 끝난 결과는 폐기됩니다. 화면은 즉시 다시 사용할 수 있습니다."""
+        if not self._active_job:
+            return
+        self._active_job[1].set()
+        self._active_job = None
+        self._set_busy(False)
+
+    # 병합 미리보기를 그리는 최대 크기. 미리보기 창(780x550)의 2배로 그려 두어 조금 확대해도 볼 만합니다.
+    MERGE_PREVIEW_SIZE = (1560, 1100)
+
+    @staticmethod
+    def _prepare_preview(image, source_size=None, max_width=780, max_height=550):
+        """미리보기 창용 표시 피라미드를 만듭니다. (작업 스레드에서 호출)
+        image가 실제 결과(source_size)를 줄여 그린 것이면 피라미드의 좌표는 실제 결과 기준이 됩니다.
+        결과 전체를 리샘플링하지 않고, 처음 보일 창 맞춤 배율에 필요한 축소 단계 하나만 미리 만들어 둡니다."""
+        pyramid = aie_engine.ImagePyramid(image, source_size)
+        img_width, img_height = pyramid.source_size
+        pyramid.level(pyramid.level_for(min(max_width / img_width, max_height / img_height, 1.0)))
+        return pyramid
 
     def show_preview(self):
-        """미리보기 창을 표시합니다."""
-        processed_image = self._generate_processed_image()
-        if not processed_image:
+        """미리보기 창을 표시합니다. 처리와 화면 맞춤 축소는 작업 스레드에서 수행됩니다.
+        병합은 원본 해상도 결과를 만들지 않고 같은 배치를 줄여 축소 입력으로만 그립니다(MergePreviewOp).
+        그래서 병합은 미리보기 결과를 '실행'에서 재사용하지 않고, 실행 시 원본 해상도로 다시 처리합니다."""
+        job = self._build_job()
+        if not job:
             return
-        
+        mode = self.active_mode_value
+        if mode == "ico_convert":
+            # ICO는 실제로 파일에 들어갈 해상도별 프레임을 나란히 보여줍니다. (만든 프레임은 저장 시 재사용)
+            def post(master):
+                return self._prepare_preview(self._ico_frames_sheet(master))
+        elif mode in MERGE_MODES:
+            op, _loader, paths = job
+            job = (aie_engine.MergePreviewOp(op, self.MERGE_PREVIEW_SIZE), lambda: paths, paths)
+
+            def post(result):
+                image, source_size = result
+                return self._prepare_preview(image, source_size)
+        else:
+            post = self._prepare_preview
+        self._start_job(job, self._open_preview_window, "미리보기를 만드는 중...", post=post)
+
+    def _open_preview_window(self, pyramid):
+        img_width, img_height = pyramid.source_size
+
         # 미리보기 창 생성
         preview_window = Toplevel(self.master)
         preview_window.title("미리보기")
         preview_window.geometry("800x600")
-        
-        # 이미지를 화면 크기에 맞게 조정
-        max_width, max_height = 780, 550
-        img_width, img_height = processed_image.size
-        
-        # 비율 유지하면서 크기 조정
-        ratio = min(max_width / img_width, max_height / img_height)
-        if ratio < 1:  # 이미지가 창보다 클 경우만 축소
-            new_width = int(img_width * ratio)
-            new_height = int(img_height * ratio)
-            display_image = processed_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        else:
-            display_image = processed_image
-        
-        # Tkinter에서 표시할 수 있도록 변환
-        photo = ImageTk.PhotoImage(display_image)
-        
-        # 스크롤 가능한 캔버스 생성
-        canvas_frame = ttk.Frame(preview_window)
-        canvas_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        canvas = tk.Canvas(canvas_frame, bg='gray')
-        scrollbar_y = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=canvas.yview)
-        scrollbar_x = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=canvas.xview)
-        
-        canvas.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
-        
-        scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
-        scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # 이미지를 캔버스에 추가
-        canvas.create_image(0, 0, anchor=tk.NW, image=photo)
-        canvas.config(scrollregion=canvas.bbox(tk.ALL))
-        
-        # 이미지 정보 표시
-        info_text = f"원본 크기: {img_width} x {img_height} 픽셀"
-        if ratio < 1:
-            info_text += f" | 미리보기: {display_image.size[0]} x {display_image.size[1]} 픽셀 ({int(ratio*100)}%)"
-        
-        info_label = ttk.Label(preview_window, text=info_text, font=('Helvetica', 9))
-        info_label.pack(pady=(0, 10))
-        
+
+        # 확대/축소 도구 + 이미지 정보
+        toolbar = ttk.Frame(preview_window)
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 0))
+        info_label = ttk.Label(toolbar, font=('Helvetica', 9))
+
+        def on_scale_change(scale):
+            text = f"원본 크기: {img_width} x {img_height} 픽셀 | 보기 배율 {scale * 100:.1f}%"
+            if scale > pyramid.base_scale:
+                # 축소해 그린 미리보기(병합)를 그보다 크게 보는 중이라 세부는 흐리게 보입니다.
+                text += " (축소 미리보기 - 실행하면 원본 해상도로 처리)"
+            info_label.config(text=text)
+
+        # 보이는 타일만 PhotoImage로 바꾸는 스크롤 가능한 보기
+        view = TiledImageView(preview_window, pyramid, on_scale_change=on_scale_change)
+        for text, command in (("맞춤", view.zoom_fit), ("1:1", lambda: view.set_scale(1.0)),
+                              ("－", lambda: view.zoom_step(-1)), ("＋", lambda: view.zoom_step(1))):
+            ttk.Button(toolbar, text=text, width=5, command=command).pack(side=tk.LEFT, padx=(0, 4))
+        info_label.pack(side=tk.LEFT, padx=(8, 0))
+        view.frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
         # 닫기 버튼
         close_btn = ttk.Button(preview_window, text="닫기", command=preview_window.destroy)
         close_btn.pack(pady=(0, 10))
-        
+
         # 닫기 버튼에 포커스 설정
         close_btn.focus_set()
-        
-        # 이미지 참조 유지 (가비지 컬렉션 방지)
-        preview_window.photo = photo
+
+        # 보기 참조 유지 (가비지 컬렉션 방지)
+        preview_window.view = view
 
     def process_action(self):
         mode = self.active_mode_value
+        job = self._build_job()
+        if not job:
+            return
+
         save_kwargs = {}
         dialog_kwargs = {"title": "결과 이미지 저장 위치 선택"}
 
@@ -1599,7 +2697,7 @@ class ImageEditorApp:
             if getattr(self, "ico_output_path", None):
                 dialog_kwargs["initialfile"] = os.path.basename(self.ico_output_path)
                 dialog_kwargs["initialdir"] = os.path.dirname(self.ico_output_path)
-            save_kwargs = {"format": "ICO", "sizes": ICO_SIZES}
+            save_kwargs = IcoOp.save_kwargs()
 
         elif mode == "resize_image":
             dialog_kwargs["defaultextension"] = self._resize_guess_ext()
@@ -1619,9 +2717,12 @@ class ImageEditorApp:
                 dialog_kwargs["initialfile"] = f"{base}_cropped{self._crop_guess_ext()}"
                 dialog_kwargs["initialdir"] = os.path.dirname(src_path)
 
-        elif mode in ("2_horiz", "2_vert", "3_horiz", "3_vert", "4_grid"):
+        elif mode in MERGE_MODES:
             # 병합은 원본 이미지가 여러 장이므로 첫 번째 이미지의 파일명/확장자를 기준으로 삼습니다.
-            first_path = self.image_paths_entries[0].get().strip() if self.image_paths_entries else ""
+            if MERGE_MODES[mode][1] is None:
+                first_path = self.merge_list_paths[0] if self.merge_list_paths else ""
+            else:
+                first_path = self.image_paths_entries[0].get().strip() if self.image_paths_entries else ""
             ext = self._guess_ext_from_path(first_path, ".png")
             dialog_kwargs["defaultextension"] = ext
             dialog_kwargs["filetypes"] = COMMON_SAVE_FILETYPES
@@ -1645,133 +2746,66 @@ class ImageEditorApp:
         if not output_path:
             return
 
-        processed_image = self._generate_processed_image()
+        # 포맷별 압축 옵션은 하단 '저장 설정' 프로필을 따르고, JPEG은 투명한 부분을 흰색에 합성합니다.
+        profile = self.encoder_profile.get()
+        quality = None
+        if mode == "resize_image":
+            quality = int(self.resize_quality.get())
+        elif mode in MERGE_MODES:
+            quality = self.MERGE_JPEG_QUALITY
+
+        def save_result(processed_image):
+            # 인코딩/기록은 저장 스레드에서 하므로 처리가 끝나면 바로 다음 작업을 시작할 수 있습니다.
+            self._enqueue_save(processed_image, output_path, profile, quality, save_kwargs or None)
+
+        method = self.jpeg_transform_method.get()
+        if (mode in ("flip_image", "rotate_image") and method != "reencode"
+                and aie_engine.can_transform_jpeg_losslessly(job[2][0], output_path)):
+            # JPEG → JPEG 회전/뒤집기는 디코딩/재인코딩 없이 파일 단위로 처리해 바로 저장합니다.
+            op, _loader, paths = job
+            jpeg_op = aie_engine.JpegTransformOp(op, output_path, method)
+
+            def on_jpeg_saved(result):
+                path, used = result
+                messagebox.showinfo("성공", f"작업이 성공적으로 완료되어 저장되었습니다 "
+                                            f"({self.JPEG_METHOD_LABELS[used]}):\n{path}")
+
+            self._start_job((jpeg_op, lambda: paths, paths), on_jpeg_saved, "JPEG을 변환해 저장하는 중...")
+            return
 
-        if processed_image:
-            try:
-                if mode == "resize_image":
-                    self._resize_save_with_format(processed_image, output_path)
-                elif mode == "crop_image":
-                    self._crop_save_with_format(processed_image, output_path)
-                elif mode in ("2_horiz", "2_vert", "3_horiz", "3_vert", "4_grid"):
-                    self._merge_save_with_format(processed_image, output_path)
-                else:
-                    processed_image.save(output_path, **save_kwargs)
-                messagebox.showinfo("성공", f"작업이 성공적으로 완료되어 저장되었습니다:\n{output_path}")
-            except Exception as e:
-                messagebox.showerror("저장 오류", f"이미지 저장 중 오류 발생: {e}")
-
-    def merge_horizontal(self, images, gap, gap_color, size_mode, fill_color):
-        """이미지들을 가로로 병합합니다.
-        size_mode: 'smaller'(작은 사이즈에 맞춤) / 'larger'(큰 사이즈에 맞춤) / 'none'(크기 변경 안 함).
-        'none'을 선택하면 이미지 높이가 제각각일 수 있어, 이미지 위/아래에 남는 여백만
-        fill_color로 채웁니다(이미지 자체의 투명한 부분은 건드리지 않아 투명도가 유지됩니다)."""
-        if size_mode == "none":
-            resized = images
-        else:
-            target_h = min(img.height for img in images) if size_mode == "smaller" else max(img.height for img in images)
-            resized = [img if img.height == target_h else
-                       img.resize((max(1, round(img.width * target_h / img.height)), target_h), Image.Resampling.LANCZOS)
-                       for img in images]
-
-        canvas_h = max(img.height for img in resized)
-        total_w = sum(img.width for img in resized) + gap * (len(resized) - 1)
-        dst = Image.new('RGBA', (total_w, canvas_h), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(dst)
-
-        x = 0
-        for i, img in enumerate(resized):
-            y = (canvas_h - img.height) // 2
-            if y > 0:  # 이미지 위쪽 여백
-                draw.rectangle([x, 0, x + img.width, y], fill=fill_color)
-            if y + img.height < canvas_h:  # 이미지 아래쪽 여백
-                draw.rectangle([x, y + img.height, x + img.width, canvas_h], fill=fill_color)
-            dst.paste(img, (x, y), img)
-            x += img.width
-            if i < len(resized) - 1 and gap > 0:
-                draw.rectangle([x, 0, x + gap, canvas_h], fill=gap_color)
-                x += gap
-        return dst
-
-    def merge_vertical(self, images, gap, gap_color, size_mode, fill_color):
-        """이미지들을 세로로 병합합니다. size_mode/fill_color 의미는 merge_horizontal과 동일하며
-        기준 축이 너비(width)라는 점만 다릅니다."""
-        if size_mode == "none":
-            resized = images
-        else:
-            target_w = min(img.width for img in images) if size_mode == "smaller" else max(img.width for img in images)
-            resized = [img if img.width == target_w else
-                       img.resize((target_w, max(1, round(img.height * target_w / img.width))), Image.Resampling.LANCZOS)
-                       for img in images]
-
-        canvas_w = max(img.width for img in resized)
-        total_h = sum(img.height for img in resized) + gap * (len(resized) - 1)
-        dst = Image.new('RGBA', (canvas_w, total_h), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(dst)
-
-        y = 0
-        for i, img in enumerate(resized):
-            x = (canvas_w - img.width) // 2
-            if x > 0:  # 이미지 왼쪽 여백
-                draw.rectangle([0, y, x, y + img.height], fill=fill_color)
-            if x + img.width < canvas_w:  # 이미지 오른쪽 여백
-                draw.rectangle([x + img.width, y, canvas_w, y + img.height], fill=fill_color)
-            dst.paste(img, (x, y), img)
-            y += img.height
-            if i < len(resized) - 1 and gap > 0:
-                draw.rectangle([0, y, canvas_w, y + gap], fill=gap_color)
-                y += gap
-        return dst
-
-    def merge_4_grid(self, images, gap, gap_color, size_mode, fill_color):
-        """4장을 2x2 격자로 병합합니다.
-        size_mode: 'smaller'(각 행을 작은 높이에 맞춤, 기존 동작) / 'larger'(큰 높이에 맞춤) /
-        'none'(크기 변경 안 함). 상단 2장(행1)과 하단 2장(행2)을 각각 독립적으로 정렬 기준을
-        적용하고, 열 너비/행 높이가 이미지마다 달라 남는 여백은 fill_color로, 행/열 사이
-        여백은 gap_color로 채웁니다. 이미지 자체의 투명한 부분은 건드리지 않습니다."""
-        def resize_row(img_a, img_b):
-            if size_mode == "none":
-                return img_a, img_b
-            target_h = min(img_a.height, img_b.height) if size_mode == "smaller" else max(img_a.height, img_b.height)
-            a = img_a if img_a.height == target_h else img_a.resize(
-                (max(1, round(img_a.width * target_h / img_a.height)), target_h), Image.Resampling.LANCZOS)
-            b = img_b if img_b.height == target_h else img_b.resize(
-                (max(1, round(img_b.width * target_h / img_b.height)), target_h), Image.Resampling.LANCZOS)
-            return a, b
-
-        img0_r, img1_r = resize_row(images[0], images[1])
-        img2_r, img3_r = resize_row(images[2], images[3])
-
-        h1 = max(img0_r.height, img1_r.height)  # size_mode='none'이면 행 내에서도 높이가 다를 수 있음
-        h2 = max(img2_r.height, img3_r.height)
-        w_col1 = max(img0_r.width, img2_r.width)
-        w_col2 = max(img1_r.width, img3_r.width)
-        total_width = w_col1 + w_col2 + gap
-        total_height = h1 + h2 + gap
-
-        dst = Image.new('RGBA', (total_width, total_height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(dst)
-        # 행/열 사이의 여백(십자 모양)을 여백 색으로 채웁니다.
-        if gap > 0:
-            draw.rectangle([w_col1, 0, w_col1 + gap, total_height], fill=gap_color)
-            draw.rectangle([0, h1, total_width, h1 + gap], fill=gap_color)
-
-        cells = ((img0_r, 0, 0, w_col1, h1), (img1_r, w_col1 + gap, 0, w_col2, h1),
-                 (img2_r, 0, h1 + gap, w_col1, h2), (img3_r, w_col1 + gap, h1 + gap, w_col2, h2))
-        for img, cell_x, cell_y, cell_w, cell_h in cells:
-            x_off = (cell_w - img.width) // 2
-            y_off = (cell_h - img.height) // 2
-            if x_off > 0:  # 열 너비보다 이미지가 좁으면 좌우 여백을 채웁니다.
-                draw.rectangle([cell_x, cell_y, cell_x + x_off, cell_y + cell_h], fill=fill_color)
-                draw.rectangle([cell_x + cell_w - x_off, cell_y, cell_x + cell_w, cell_y + cell_h], fill=fill_color)
-            if y_off > 0:  # 행 높이보다 이미지가 낮으면(size_mode='none') 위아래 여백을 채웁니다.
-                draw.rectangle([cell_x, cell_y, cell_x + cell_w, cell_y + y_off], fill=fill_color)
-                draw.rectangle([cell_x, cell_y + cell_h - y_off, cell_x + cell_w, cell_y + cell_h], fill=fill_color)
-            dst.paste(img, (cell_x + x_off, cell_y + y_off), img)
-        return dst
+        if (mode == "crop_image" and self._crop_is_lossless()
+                and aie_engine.can_transform_jpeg_losslessly(job[2][0], output_path)):
+            # JPEG → JPEG 자르기는 MCU 격자에 맞춘 영역의 DCT 계수만 복사해 바로 저장합니다.
+            # 저장 형식이 JPEG으로 정해진 이 경로에서만 영역을 격자에 맞춥니다(JpegCropOp → crop_jpeg_file).
+            op, _loader, paths = job
+            jpeg_op = aie_engine.JpegCropOp(op.box, output_path)
+
+            def on_jpeg_cropped(result):
+                path, used = result
+                detail = "무손실 자르기" if used == "lossless" else "원본 압축 설정으로 다시 인코딩"
+                messagebox.showinfo("성공", f"작업이 성공적으로 완료되어 저장되었습니다 ({detail}):\n{path}")
+
+            self._start_job((jpeg_op, lambda: paths, paths), on_jpeg_cropped, "JPEG을 잘라 저장하는 중...")
+            return
+
+        if (mode in MERGE_MODES and not self._has_cached_result(job)
+                and aie_engine.should_stream_merge(job[0], job[2], output_path)):
+            # 결과가 아주 큰 병합은 전체 캔버스를 메모리에 만들지 않고 띠 단위로 파일에 바로 기록합니다.
+            op, _loader, paths = job
+            cancel_event = threading.Event()
+            streamed = aie_engine.StreamedMergeOp(op, output_path, cancel_event=cancel_event, profile=profile)
+
+            def on_saved(path):
+                messagebox.showinfo("성공", f"작업이 성공적으로 완료되어 저장되었습니다:\n{path}")
+
+            self._start_job((streamed, lambda: paths, paths), on_saved,
+                            "큰 이미지를 나누어 병합하고 저장하는 중...", cancel_event=cancel_event)
+            return
+
+        self._start_job(job, save_result, "이미지를 처리하는 중...")
 
 if __name__ == "__main__":
     if 'TkinterDnD' in globals():
         root = TkinterDnD.Tk()
         app = ImageEditorApp(root)
-        root.mainloop()
\ No newline at end of file
+        root.mainloop()
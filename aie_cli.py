@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+알파카 이미지 편집기 명령줄 일괄 처리 (aie)
+
+GUI 없이 폴더/글롭 패턴에 포함된 모든 이미지에 뒤집기/회전/크기 조정/자르기/ICO 변환을
+적용합니다. 실제 처리는 GUI와 같은 aie_engine을 사용하며, CPU 코어 수만큼의 프로세스로
+나누어 동시에 처리한 뒤 마지막에 초당 처리 장수를 출력합니다.
+
+사용 예:
+    python aie_cli.py resize ./photos --percent 50
+    python aie_cli.py rotate "./scans/**/*.jpg" --degrees 90 -o ./rotated
+    python aie_cli.py ico ./logos
+    python aie_cli.py merge scan1.tif scan2.tif scan3.tif scan4.tif --layout grid -o sheet.png
+    python aie_cli.py merge ./shots --layout grid --cols 10 -o contact_sheet.jpg
+
+결과 파일명은 GUI의 기본 저장 이름과 같이 원본 이름 뒤에
+_flipped / _rotated / _resized / _cropped 를 붙이며, ICO 변환은 확장자만 .ico로 바꿉니다.
+병합(merge)은 입력 전체를 하나로 합쳐 -o로 지정한 파일에 저장하며, 결과가 아주 크고 PNG/BMP/TIFF로
+저장하는 경우 전체 캔버스를 메모리에 만들지 않고 띠 단위로 기록합니다.
+
+필요 패키지:
+    pip install Pillow
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image
+
+import aie_engine
+from aie_engine import (IMAGE_EXTS, SIZE_MODES, RESAMPLE_FILTERS, DEFAULT_RESAMPLE, JPEG_TRANSFORM_METHODS,
+                        ENCODER_PROFILES, DEFAULT_ENCODER_PROFILE,
+                        EngineError, MergeOp, FlipOp, RotateOp, ResizeOp, CropOp, IcoOp)
+
+MERGE_JPEG_QUALITY = 95  # 병합 결과를 JPEG으로 저장할 때의 품질 (GUI와 동일)
+RESIZE_JPEG_QUALITY = 85  # 크기 조정 결과의 기본 저장 품질 (GUI 품질 슬라이더의 기본값과 동일)
+PROFILE_HELP = ("저장 설정: fastest=압축 최소(가장 빠름), balanced=기본, "
+                "smallest=PNG optimize/JPEG progressive 등 최대 압축(가장 느림) (기본: balanced)")
+
+# 명령 → 결과 파일명 접미사 (GUI의 process_action 기본 저장 이름과 동일)
+OUTPUT_SUFFIXES = {
+    "flip": "_flipped",
+    "rotate": "_rotated",
+    "resize": "_resized",
+    "crop": "_cropped",
+}
+
+
+def collect_inputs(patterns):
+    """폴더(하위 폴더 포함)·글롭 패턴·파일 경로를 이미지 파일 목록으로 펼칩니다.
+    반환값은 (원본 경로, 기준 폴더) 목록이며, 기준 폴더는 -o 지정 시 하위 폴더 구조를
+    유지하는 데 사용합니다."""
+    found, seen = [], set()
+
+    def add(path, root):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen and path.lower().endswith(IMAGE_EXTS):
+            seen.add(key)
+            found.append((path, root))
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    add(os.path.join(dirpath, name), pattern)
+        elif os.path.isfile(pattern):
+            add(pattern, os.path.dirname(pattern))
+        else:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, os.path.dirname(path))
+    return found
+
+
+def build_output_path(command, src_path, root, output_dir):
+    base, ext = os.path.splitext(src_path)
+    if command == "ico":
+        out_path = base + ".ico"
+    else:
+        out_path = base + OUTPUT_SUFFIXES[command] + ext
+    if output_dir:
+        rel = os.path.relpath(out_path, root) if root else os.path.basename(out_path)
+        out_path = os.path.join(output_dir, rel)
+    return out_path
+
+
+def is_own_output(command, src_path):
+    """이전 실행에서 만들어진 결과 파일을 다시 처리하지 않도록 걸러냅니다."""
+    if command == "ico":
+        return False
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    return stem.endswith(OUTPUT_SUFFIXES[command])
+
+
+def build_operation(args):
+    if args.command == "flip":
+        return FlipOp(args.direction)
+    if args.command == "rotate":
+        return RotateOp(args.degrees)
+    if args.command == "resize":
+        quality = "fast" if args.fast else "exact"
+        if args.percent is not None:
+            return ResizeOp(percent=args.percent, quality=quality, resample=args.filter)
+        return ResizeOp(width=args.width, height=args.height, quality=quality, resample=args.filter)
+    if args.command == "crop":
+        return CropOp(tuple(args.box))
+    return IcoOp()
+
+
+def _save(image, out_path, op, quality, profile):
+    # ICO는 해상도별 프레임을 직접 만들어 256px은 PNG, 작은 크기는 BMP로 넣습니다(aie_engine.save_ico).
+    save_kwargs = IcoOp.save_kwargs() if isinstance(op, IcoOp) else None
+    aie_engine.save_image(image, out_path, profile, quality, save_kwargs)
+
+
+def process_one(op, src_path, out_path, quality, jpeg_method="reencode", profile=DEFAULT_ENCODER_PROFILE):
+    """작업자 프로세스에서 이미지 1장을 처리합니다. 실패 시 예외 대신 오류 메시지를 반환합니다.
+    뒤집기/회전에서 원본과 결과가 모두 JPEG이면 jpeg_method('lossless'/'exif')로 파일 단위 변환하고,
+    자르기는 jpeg_method가 'lossless'이면 MCU 격자에 맞춘 영역으로 무손실 자릅니다."""
+    try:
+        if (isinstance(op, CropOp) and jpeg_method == "lossless"
+                and aie_engine.can_transform_jpeg_losslessly(src_path, out_path)):
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            aie_engine.crop_jpeg_file(src_path, out_path, op.box)
+            return None
+        if (isinstance(op, (FlipOp, RotateOp)) and jpeg_method != "reencode"
+                and aie_engine.can_transform_jpeg_losslessly(src_path, out_path)):
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            aie_engine.transform_jpeg_file(src_path, out_path, op, jpeg_method)
+            return None
+        with Image.open(src_path) as img:
+            img.load()
+            if isinstance(op, (FlipOp, RotateOp)) and img.mode == "RGBA":
+                img = img.convert("RGB")  # GUI의 _load_single_image와 동일한 처리
+            result = op.apply(img)
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        _save(result, out_path, op, quality, profile)
+        return None
+    except (EngineError, OSError, ValueError) as e:
+        return str(e)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="aie", description="알파카 이미지 편집기 일괄 처리 (폴더/글롭 패턴 단위)")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="이미지 파일, 폴더(하위 폴더 포함) 또는 글롭 패턴")
+    common.add_argument("-o", "--output-dir", help="결과 저장 폴더 (기본: 원본과 같은 폴더)")
+    common.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="동시에 처리할 프로세스 수 (기본: CPU 코어 수)")
+    common.add_argument("-q", "--quality", type=int, default=None,
+                        help="JPEG/WEBP 저장 품질 10~100 (기본: GUI와 같이 resize는 85, 그 외는 Pillow 기본값)")
+    common.add_argument("--overwrite", action="store_true", help="이미 있는 결과 파일을 덮어씁니다")
+    common.add_argument("--profile", choices=tuple(ENCODER_PROFILES), default=DEFAULT_ENCODER_PROFILE,
+                        help=PROFILE_HELP)
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    jpeg = argparse.ArgumentParser(add_help=False)
+    jpeg.add_argument("--jpeg", choices=JPEG_TRANSFORM_METHODS, default="lossless", dest="jpeg_method",
+                      help="JPEG → JPEG 저장 방식: lossless=무손실(jpegtran, 없으면 원본 압축 설정으로 재인코딩), "
+                           "exif=EXIF 방향 값만 변경, reencode=다시 인코딩 (기본: lossless)")
+
+    p = sub.add_parser("flip", parents=[common, jpeg], help="이미지 뒤집기")
+    p.add_argument("--direction", choices=("horizontal", "vertical", "both"), default="horizontal",
+                   help="horizontal=좌우, vertical=상하, both=상하/좌우 (기본: horizontal)")
+
+    p = sub.add_parser("rotate", parents=[common, jpeg], help="이미지 회전 (시계 방향)")
+    p.add_argument("--degrees", type=int, choices=(90, 180, 270), default=90)
+
+    p = sub.add_parser("resize", parents=[common], help="이미지 크기 조정")
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument("--percent", type=float, help="축소 비율 1~100 (%%)")
+    group.add_argument("--size", nargs=2, type=int, metavar=("W", "H"), help="결과 너비/높이 (px)")
+    p.add_argument("--fast", action="store_true",
+                   help="큰 비율로 줄일 때 정수 배로 먼저 줄인 뒤 필터 적용 (거의 같은 결과, 훨씬 빠름)")
+    p.add_argument("--filter", choices=tuple(RESAMPLE_FILTERS), default=DEFAULT_RESAMPLE,
+                   help="리샘플링 필터 (기본: lanczos, 빠른 순: nearest < box < bilinear < hamming < bicubic)")
+
+    p = sub.add_parser("crop", parents=[common], help="이미지 자르기")
+    p.add_argument("--box", nargs=4, type=int, required=True, metavar=("X1", "Y1", "X2", "Y2"),
+                   help="원본 픽셀 좌표 기준 잘라낼 영역")
+    p.add_argument("--lossless", action="store_const", const="lossless", default="reencode", dest="jpeg_method",
+                   help="JPEG → JPEG이면 왼쪽/위 경계를 8/16px 블록에 맞춰 무손실로 자릅니다 (영역이 조금 넓어질 수 있음)")
+
+    sub.add_parser("ico", parents=[common], help="ICO 파일 변환")
+
+    p = sub.add_parser("merge", help="여러 이미지를 하나로 병합")
+    p.add_argument("inputs", nargs="+", help="병합할 이미지 (폴더/글롭 패턴은 이름순으로 펼침)")
+    p.add_argument("-o", "--output", required=True, help="결과 파일 경로")
+    p.add_argument("--layout", choices=("horizontal", "vertical", "grid"), default="horizontal",
+                   help="병합 방향 (grid는 행 × 열 격자, 기본: horizontal)")
+    p.add_argument("--rows", type=int, default=0, help="grid 행 수 (기본: 0=자동)")
+    p.add_argument("--cols", type=int, default=0,
+                   help="grid 열 수 (기본: 0=자동, 행/열 모두 자동이면 정사각형에 가깝게)")
+    p.add_argument("--gap", type=int, default=10, help="여백 크기 px (기본: 10)")
+    p.add_argument("--gap-color", default="#FFFFFF")
+    p.add_argument("--border", type=int, default=0, help="테두리 굵기 px (기본: 0)")
+    p.add_argument("--border-color", default="#000000")
+    p.add_argument("--fill-color", default="#FFFFFF", help="비율 차이로 남는 빈 공간 색상")
+    p.add_argument("--size-mode", choices=SIZE_MODES, default="smaller",
+                   help="크기가 다를 때 맞출 기준 (기본: smaller)")
+    p.add_argument("--fast", action="store_true", help="입력 크기를 맞출 때 빠른 리샘플링 사용 (resize --fast와 동일)")
+    p.add_argument("--filter", choices=tuple(RESAMPLE_FILTERS), default=DEFAULT_RESAMPLE,
+                   help="입력 크기를 맞출 때 쓸 리샘플링 필터 (기본: lanczos)")
+    p.add_argument("--stream", choices=("auto", "always", "never"), default="auto",
+                   help="띠 단위 기록 사용 여부 (PNG/BMP/TIFF만, 기본: 결과가 아주 클 때만)")
+    p.add_argument("--profile", choices=tuple(ENCODER_PROFILES), default=DEFAULT_ENCODER_PROFILE,
+                   help=PROFILE_HELP)
+    return parser
+
+
+def run_merge(args):
+    paths = [path for path, _root in collect_inputs(args.inputs)]
+    if len(paths) < 2:
+        print("오류: 병합하려면 2개 이상의 이미지가 필요합니다.", file=sys.stderr)
+        return 2
+    op = MergeOp(args.layout, gap=args.gap, gap_color=args.gap_color, border=args.border,
+                 border_color=args.border_color, fill_color=args.fill_color, size_mode=args.size_mode,
+                 rows=args.rows, cols=args.cols, quality="fast" if args.fast else "exact",
+                 resample=args.filter)
+    stream = args.stream == "always" or (
+        args.stream == "auto" and aie_engine.should_stream_merge(op, paths, args.output))
+
+    started = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        if stream:
+            aie_engine.stream_merge_to_file(op, paths, args.output, profile=args.profile)
+        else:
+            images = aie_engine.parallel_map(aie_engine.load_image, paths)
+            _save(op.apply(images), args.output, op, MERGE_JPEG_QUALITY, args.profile)
+    except (EngineError, OSError, ValueError) as e:
+        print(f"실패: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"완료: {args.output} ({len(paths)}개 병합{', 띠 단위 기록' if stream else ''}, {elapsed:.2f}초)")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "merge":
+        return run_merge(args)
+    if args.command == "resize":
+        if args.percent is not None and not 1 <= args.percent <= 100:
+            print("오류: --percent는 1~100 사이여야 합니다.", file=sys.stderr)
+            return 2
+        args.width, args.height = args.size if args.size else (None, None)
+    quality = args.quality
+    if quality is None and args.command == "resize":
+        quality = RESIZE_JPEG_QUALITY
+    if quality is not None:
+        quality = max(10, min(100, quality))
+    op = build_operation(args)
+
+    jobs, owners, duplicates = [], {}, 0
+    for src_path, root in collect_inputs(args.inputs):
+        if is_own_output(args.command, src_path):
+            continue
+        out_path = build_output_path(args.command, src_path, root, args.output_dir)
+        # ICO 변환에서 logo.png/logo.jpg처럼 결과 이름이 겹치면 먼저 나온 원본만 처리합니다.
+        owner = owners.setdefault(os.path.normcase(os.path.abspath(out_path)), src_path)
+        if owner != src_path:
+            duplicates += 1
+            print(f"실패: {src_path} (결과 파일 이름이 {owner}의 결과와 같습니다: {out_path})", file=sys.stderr)
+            continue
+        if not args.overwrite and os.path.exists(out_path):
+            print(f"건너뜀 (이미 있음): {out_path}")
+            continue
+        jobs.append((src_path, out_path))
+
+    if not jobs:
+        print("처리할 이미지가 없습니다.", file=sys.stderr)
+        return 1
+
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"{len(jobs)}개 이미지를 {workers}개 프로세스로 처리합니다...")
+    failures = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jpeg_method = getattr(args, "jpeg_method", "reencode")
+        futures = {pool.submit(process_one, op, src, dst, quality, jpeg_method, args.profile): (src, dst)
+                   for src, dst in jobs}
+        for future in as_completed(futures):
+            src, dst = futures[future]
+            error = future.result()
+            if error:
+                failures += 1
+                print(f"실패: {src} ({error})", file=sys.stderr)
+            else:
+                print(f"완료: {dst}")
+    elapsed = time.perf_counter() - started
+
+    done = len(jobs) - failures
+    rate = done / elapsed if elapsed > 0 else float("inf")
+    print(f"\n{done}/{len(jobs)}개 완료, {elapsed:.2f}초 ({rate:.1f} images/s)")
+    return 1 if failures or duplicates else 0
+
+
+if __name__ == "__main__":
+    from multiprocessing import freeze_support
+    freeze_support()
+    sys.exit(main())
@@ -0,0 +1,1675 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+알파카 이미지 편집기 처리 엔진 (Alpaca Image Editor Engine)
+
+병합/뒤집기/회전/크기 조정/자르기/ICO 변환을 Tkinter 없이 수행하는 순수 파이썬 모듈.
+각 기능은 옵션 값만 담는 작업 객체(MergeOp, FlipOp, RotateOp, ResizeOp, CropOp, IcoOp)로
+표현되며, apply()에 PIL 이미지를 넘기면 결과 이미지를 돌려줍니다.
+GUI(aie.v260731.py)도 이 모듈을 호출하므로 화면이 없는 서버에서도 동일한 결과를 얻을 수 있습니다.
+
+필요 패키지:
+    pip install Pillow
+"""
+
+import hashlib
+import io
+import math
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from PIL import Image, ImageFilter, JpegImagePlugin
+
+# 엔진이 입력으로 받는 이미지 확장자 (ICO 변환/일괄 처리가 공통으로 사용)
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff", ".tif", ".webp")
+
+# ============================================================================
+# "ICO 파일 변환" 기능에서 사용하는 상수
+# ============================================================================
+ICO_SIZES = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
+ICO_LARGEST_SIZE = ICO_SIZES[-1]
+ICO_SUPPORTED_EXTS = IMAGE_EXTS
+ICO_PNG_MIN_SIZE = 256      # 이 크기 이상의 프레임은 PNG로, 작은 프레임은 BMP(32비트 + AND 마스크)로 넣음
+ICO_SHARPEN_MAX_SIZE = 48   # 이 크기 이하의 작은 아이콘은 축소 후 살짝 선명하게 보정
+
+# GUI의 병합 모드 값 → (병합 방향, 필요한 이미지 수)
+MERGE_MODES = {
+    "2_horiz": ("horizontal", 2),
+    "2_vert": ("vertical", 2),
+    "3_horiz": ("horizontal", 3),
+    "3_vert": ("vertical", 3),
+    "4_grid": ("grid", 4),
+    "n_grid": ("grid", None),  # 장수 제한 없음(2장 이상), 행 × 열 지정 또는 자동
+}
+
+SIZE_MODES = ("smaller", "larger", "none")
+
+# 리샘플링 품질: 'exact'(원본에서 바로 LANCZOS) / 'fast'(정수 배 선축소 후 LANCZOS)
+RESAMPLE_QUALITIES = ("exact", "fast")
+# 'fast'일 때 결과 크기의 몇 배까지를 Image.reduce(박스 평균, 매우 빠름)로 먼저 줄일지.
+# Image.thumbnail의 기본값과 같으며, 나머지 2배 이내의 축소만 LANCZOS로 처리합니다.
+FAST_REDUCING_GAP = 2.0
+
+# 크기 조정/병합에서 고를 수 있는 리샘플링 필터 (대체로 빠른 것부터 느린 순서)
+RESAMPLE_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "box": Image.Resampling.BOX,
+    "bilinear": Image.Resampling.BILINEAR,
+    "hamming": Image.Resampling.HAMMING,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+DEFAULT_RESAMPLE = "lanczos"
+# 처리 시간 예측용 표본 크기 (리샘플링 시간은 내용과 무관하고 픽셀 수/밴드 수/배율에 비례합니다)
+RESAMPLE_BENCH_SIZE = (1024, 1024)
+
+
+class EngineError(ValueError):
+    """작업 옵션이나 입력 이미지가 올바르지 않을 때 발생하는 예외."""
+
+
+# ============================================================================
+# 공용 헬퍼
+# ============================================================================
+def has_transparency(img):
+    """이미지에 실제로 투명한 픽셀(또는 투명 팔레트/투명 색상 키)이 있는지 확인합니다."""
+    if img.mode in ("RGBA", "LA", "PA"):
+        return img.getchannel("A").getextrema()[0] < 255
+    return "transparency" in img.info
+
+
+def may_have_transparency(img):
+    """픽셀을 디코딩하지 않고 헤더 정보만으로 투명도가 있을 수 있는지 판단합니다.
+    (알파 채널이 있으면 실제로는 모두 불투명하더라도 True로 보수적으로 판단합니다.)"""
+    return img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+
+
+# 투명 영역 표시용 체크무늬 색상
+CHECKER_LIGHT = (255, 255, 255, 255)
+CHECKER_DARK = (222, 222, 224, 255)
+
+
+@lru_cache(maxsize=32)
+def checkerboard(size, cell=8, light=CHECKER_LIGHT, dark=CHECKER_DARK):
+    """투명 영역을 보여주기 위한 체크무늬 배경 (RGBA, 왼쪽 위 칸이 dark).
+    2×2칸 타일 하나를 가로로 이어 붙여 띠를 만들고 그 띠를 세로로 쌓으므로, 붙이는 횟수가
+    칸 수가 아니라 가로/세로 타일 수의 합에 비례합니다. (크기, 칸, 색상)별로 보관해 다시 쓰므로
+    반환된 이미지는 여러 곳에서 공유됩니다. 직접 수정하지 말고 alpha_composite 등 새 이미지를 만드는 연산만 쓰세요."""
+    width, height = size
+    span = cell * 2
+    tile = Image.new("RGBA", (span, span), light)
+    tile.paste(dark, (0, 0, cell, cell))
+    tile.paste(dark, (cell, cell, span, span))
+    row = Image.new("RGBA", (width, span))
+    for x in range(0, width, span):
+        row.paste(tile, (x, 0))
+    board = Image.new("RGBA", (width, height))
+    for y in range(0, height, span):
+        board.paste(row, (0, y))
+    return board
+
+
+def composite_on_checkerboard(img, cell=8):
+    """투명도가 있는 이미지를 체크무늬 배경 위에 합성한 RGB 이미지. 투명도가 없으면 그대로 돌려줍니다."""
+    if not may_have_transparency(img):
+        return img
+    rgba = img if img.mode == "RGBA" else img.convert("RGBA")
+    return Image.alpha_composite(checkerboard(rgba.size, cell), rgba).convert("RGB")
+
+
+def merge_mode_for(images):
+    """병합 캔버스의 모드. 실제로 투명한 픽셀이 있는 이미지가 하나라도 있을 때만 RGBA이고,
+    모두 불투명하면(JPEG 사진 등) RGB로 합성해 알파 합성 없이 붙여 넣습니다.
+    RGB 경로는 픽셀당 메모리가 그대로이면서도 마스크 합성 단계가 없어 더 빠릅니다."""
+    return "RGBA" if any(parallel_map(has_transparency, images)) else "RGB"
+
+
+def resample_image(img, size, quality="exact", resample=DEFAULT_RESAMPLE):
+    """img를 size로 리샘플링합니다. resample은 RESAMPLE_FILTERS의 이름(기본 LANCZOS)입니다.
+    quality='fast'이면 큰 비율로 줄일 때 먼저 정수 배로 선축소(reducing_gap)한 뒤 필터를 적용해,
+    결과는 거의 같으면서 훨씬 빠릅니다.
+    (예: 60MP 이미지를 10%로 줄이면 LANCZOS가 훑는 원본 픽셀이 수십 분의 1로 줄어듭니다.)"""
+    if quality not in RESAMPLE_QUALITIES:
+        raise EngineError(f"알 수 없는 리샘플링 품질입니다: {quality}")
+    if resample not in RESAMPLE_FILTERS:
+        raise EngineError(f"알 수 없는 리샘플링 필터입니다: {resample}")
+    gap = FAST_REDUCING_GAP if quality == "fast" else None
+    return img.resize(size, RESAMPLE_FILTERS[resample], reducing_gap=gap)
+
+
+@lru_cache(maxsize=64)
+def benchmark_resample(mode, scale, quality="exact", repeat=3):
+    """mode 이미지를 scale배로 리샘플링하는 시간을 필터별로 재어 {필터 이름: 원본 1메가픽셀당 초}로
+    돌려줍니다. 같은 모드의 RESAMPLE_BENCH_SIZE 표본으로 필터마다 repeat번 재어 가장 짧은 값을 쓰며,
+    결과는 (모드, 배율, 품질)별로 기억해 두므로 같은 조건은 다시 재지 않습니다."""
+    sample = Image.effect_noise(RESAMPLE_BENCH_SIZE, 64).convert(mode)
+    w, h = RESAMPLE_BENCH_SIZE
+    target = (max(1, round(w * scale)), max(1, round(h * scale)))
+    megapixels = w * h / 1e6
+    result = {}
+    for name in RESAMPLE_FILTERS:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            resample_image(sample, target, quality, name)
+            best = min(best, time.perf_counter() - started)
+        result[name] = best / megapixels
+    return result
+
+
+def estimate_resize_seconds(size, target_size, mode, quality="exact"):
+    """size 크기의 mode 이미지를 target_size로 조정할 때의 예상 시간(초)을 필터별로 돌려줍니다."""
+    scale = (target_size[0] / size[0] + target_size[1] / size[1]) / 2
+    per_mp = benchmark_resample(mode, round(scale, 2), quality)
+    megapixels = size[0] * size[1] / 1e6
+    return {name: seconds * megapixels for name, seconds in per_mp.items()}
+
+
+def estimate_merge_seconds(op, paths):
+    """MergeOp이 입력을 배치 크기로 맞출 때의 예상 리샘플링 시간(초)을 필터별로 돌려줍니다.
+    원본 크기/모드는 파일 헤더로만 읽고, 크기가 바뀌는 입력마다 estimate_resize_seconds를 더합니다.
+    (입력은 공유 스레드 풀에서 동시에 조정되므로 실제 시간은 이보다 짧을 수 있습니다.)"""
+    sizes = read_image_sizes(paths)
+    layout = op.compute_layout(sizes)
+    total = dict.fromkeys(RESAMPLE_FILTERS, 0.0)
+    for path, size, (x1, y1, x2, y2) in zip(paths, sizes, layout.placements):
+        target = (x2 - x1, y2 - y1)
+        if target == tuple(size) or min(target) < 1:
+            continue
+        with Image.open(path) as img:
+            mode = "RGBA" if may_have_transparency(img) else "RGB"
+        for name, seconds in estimate_resize_seconds(size, target, mode, op.quality).items():
+            total[name] += seconds
+    return total
+
+
+def fit_to_square(img, size):
+    """비율을 유지한 채 정사각형 캔버스 중앙에 배치하고 남는 영역은 투명 처리."""
+    img = img.convert("RGBA")
+    w, h = img.size
+    scale = min(size[0] / w, size[1] / h)
+    nw, nh = max(1, round(w * scale)), max(1, round(h * scale))
+    resized = img.resize((nw, nh), Image.Resampling.LANCZOS)
+    canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+    offset = ((size[0] - nw) // 2, (size[1] - nh) // 2)
+    canvas.paste(resized, offset, resized)
+    return canvas
+
+
+# ============================================================================
+# 공유 작업 스레드 풀
+# ============================================================================
+# Pillow는 디코딩/리샘플링/모드 변환 중에 GIL을 놓으므로, 여러 장을 다루는 단계는 스레드만으로도
+# 여러 코어를 동시에 씁니다. 풀은 처음 필요할 때 한 번만 만들어 프로세스 전체가 함께 씁니다.
+_POOL_THREAD_PREFIX = "aie-pool"
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1),
+                                       thread_name_prefix=_POOL_THREAD_PREFIX)
+        return _pool
+
+
+def parallel_map(func, items):
+    """items 각각에 func를 공유 스레드 풀에서 동시에 적용하고 결과를 입력 순서대로 돌려줍니다.
+    예외는 모든 작업이 끝난 뒤 가장 앞선 항목의 것을 그대로 다시 발생시킵니다.
+    항목이 1개 이하이거나 이미 풀 작업 스레드 안이면(중첩 대기로 인한 교착 방지) 그 자리에서 실행합니다."""
+    items = list(items)
+    if len(items) <= 1 or threading.current_thread().name.startswith(_POOL_THREAD_PREFIX):
+        return [func(item) for item in items]
+    futures = [shared_pool().submit(func, item) for item in items]
+    wait(futures)
+    return [f.result() for f in futures]
+
+
+# ============================================================================
+# 디코딩된 이미지 캐시 (미리보기 → 실행 사이에 같은 파일을 다시 디코딩하지 않도록 공유)
+# ============================================================================
+# 캐시 메모리 한도(MB). 환경 변수 AIE_CACHE_MB로 바꿀 수 있으며 0이면 캐시를 쓰지 않습니다.
+DEFAULT_CACHE_BUDGET_MB = 512
+
+# 모드별 픽셀당 바이트 수 (PIL은 3밴드 이미지도 픽셀당 4바이트로 저장합니다.
+# 목록에 없는 모드는 밴드 수로 추정합니다.)
+_MODE_BYTES = {"1": 1, "L": 1, "P": 1, "LA": 4, "I;16": 2, "I": 4, "F": 4,
+               "RGB": 4, "RGBA": 4, "CMYK": 4, "YCbCr": 4, "LAB": 4, "HSV": 4}
+
+
+def image_nbytes(img):
+    """이미지가 메모리에서 차지하는 대략적인 바이트 수."""
+    return img.width * img.height * _MODE_BYTES.get(img.mode, len(img.getbands()))
+
+
+def _decode(path):
+    img = Image.open(path)
+    img.load()
+    if getattr(img, "n_frames", 1) > 1:
+        # 다중 프레임(GIF/TIFF)은 load() 후에도 파일을 열어두므로 첫 프레임만 복사해 파일을 닫습니다.
+        frame = img.copy()
+        frame.format = img.format
+        img.close()
+        img = frame
+    return img
+
+
+class ImageCache:
+    """(경로, 수정 시각, 파일 크기, 모드)를 키로 디코딩된 이미지를 보관하는 LRU 캐시.
+    메모리 한도(MB)를 넘으면 가장 오래 사용하지 않은 이미지부터 바이트 크기 기준으로 내보냅니다.
+    작업 스레드와 메인 스레드가 함께 사용하므로 내부 상태는 잠금으로 보호합니다.
+    반환된 이미지는 여러 곳에서 공유되므로 호출한 쪽에서 직접 수정하면 안 됩니다
+    (paste/draw 등이 필요하면 copy()한 뒤 사용하세요)."""
+
+    def __init__(self, budget_mb=DEFAULT_CACHE_BUDGET_MB):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(path, mode=None):
+        st = os.stat(path)
+        return (os.path.normcase(os.path.abspath(path)), st.st_mtime_ns, st.st_size, mode)
+
+    def set_budget_mb(self, budget_mb):
+        with self._lock:
+            self.budget_bytes = int(budget_mb * 1024 * 1024)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def used_bytes(self):
+        return self._bytes
+
+    def get(self, path, mode=None):
+        """디코딩된 이미지를 돌려줍니다. mode가 주어지면 해당 모드로 변환된 이미지를 돌려주며,
+        변환 전 원본이 이미 캐시에 있으면 다시 디코딩하지 않고 그것을 변환합니다."""
+        key = self.make_key(path, mode)
+        with self._lock:
+            img = self._lookup(key)
+            if img is not None:
+                self.hits += 1
+                return img
+            self.misses += 1
+            native = self._lookup(key[:3] + (None,)) if mode else None
+        # 디코딩은 잠금 밖에서 수행해 다른 스레드의 캐시 조회를 막지 않습니다.
+        if native is None:
+            native = _decode(path)
+            if mode is None or native.mode == mode:
+                self._store(key, native)
+                return native
+        img = native.convert(mode)
+        self._store(key, img)
+        return img
+
+    def get_proxy(self, path, side):
+        """가로/세로가 side px 안에 들어오는 축소 이미지(실시간 미리보기용 대리 이미지)를 돌려줍니다.
+        원본이 이미 디코딩되어 캐시에 있으면 그것을 줄이고, 없으면 원본 전체를 디코딩하지 않고
+        load_preview_image()로 읽습니다. 결과는 원본과 같은 한도 안에서 함께 보관됩니다."""
+        key = self.make_key(path, ("proxy", side))
+        with self._lock:
+            img = self._lookup(key)
+            if img is not None:
+                self.hits += 1
+                return img
+            self.misses += 1
+            native = self._lookup(key[:3] + (None,))
+        if native is None:
+            img = load_preview_image(path, (side, side))[0]
+        else:
+            img = fit_within(native, (side, side))
+        self._store(key, img)
+        return img
+
+    def _lookup(self, key):
+        img = self._entries.get(key)
+        if img is not None:
+            self._entries.move_to_end(key)
+        return img
+
+    def _store(self, key, img):
+        size = image_nbytes(img)
+        with self._lock:
+            if size > self.budget_bytes:
+                return  # 한도보다 큰 이미지는 캐시하지 않습니다.
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= image_nbytes(old)
+            self._entries[key] = img
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.budget_bytes and self._entries:
+            _key, img = self._entries.popitem(last=False)
+            self._bytes -= image_nbytes(img)
+
+
+def _budget_from_env():
+    try:
+        return max(0.0, float(os.environ.get("AIE_CACHE_MB", DEFAULT_CACHE_BUDGET_MB)))
+    except ValueError:
+        return DEFAULT_CACHE_BUDGET_MB
+
+
+# 프로세스 전체가 공유하는 캐시
+image_cache = ImageCache(_budget_from_env())
+
+
+def load_image(path, mode=None):
+    """공유 캐시를 거쳐 이미지를 불러옵니다. 반환된 이미지는 수정하지 말고 읽기 전용으로 사용하세요."""
+    return image_cache.get(path, mode)
+
+
+def fit_within(img, max_size, resample=Image.Resampling.LANCZOS):
+    """비율을 유지해 max_size 안에 들어오도록 줄인 새 이미지 (이미 들어오면 img 그대로).
+    Image.thumbnail()과 같은 크기를 쓰지만 원본을 바꾸지 않으므로 캐시에서 받은 이미지에도 쓸 수 있습니다."""
+    width, height = img.size
+    ratio = min(max_size[0] / width, max_size[1] / height)
+    if ratio >= 1:
+        return img
+    size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+    return img.resize(size, resample, reducing_gap=FAST_REDUCING_GAP)
+
+
+def load_preview_image(path, max_size, resample=Image.Resampling.LANCZOS):
+    """화면 표시용으로 max_size 안에 들어오는 축소 이미지를 불러옵니다.
+    JPEG은 draft()로 DCT 단계에서 1/2·1/4·1/8 크기로 바로 디코딩하므로 원본 전체를 디코딩하지 않습니다.
+    (마지막 축소의 화질을 위해 표시 크기의 2배 이상은 남겨 둡니다.) 실제 저장에 쓰는 원본 해상도
+    디코딩은 load_image()로 처리 시점까지 미룹니다.
+    반환값: (축소 이미지, 원본 크기, 원본 형식, 원본 모드)"""
+    with Image.open(path) as img:
+        orig_size, fmt, mode = img.size, img.format, img.mode
+        if fmt == "JPEG":
+            img.draft(None, (max_size[0] * 2, max_size[1] * 2))
+        img.thumbnail(max_size, resample)
+        preview = img.copy()
+    return preview, orig_size, fmt, mode
+
+
+# 미리보기 창이 한 번에 PhotoImage로 바꾸는 타일 크기 (px)
+PREVIEW_TILE_SIZE = 256
+
+
+class ImagePyramid:
+    """표시용 다해상도 피라미드 (원본 기준 1/1, 1/2, 1/4, ... 단계).
+    원본 좌표의 임의 영역을 화면 크기로 그릴 때, 필요한 배율보다 크면서 가장 작은 단계에서 잘라
+    리샘플링하므로 확대/축소 정도와 관계없이 비용이 화면(뷰포트) 픽셀 수에 비례합니다.
+    base는 원본보다 작은 축소 이미지여도 되며(base.size < source_size), 이때도 좌표는 항상 원본 기준입니다.
+    축소 단계는 처음 필요할 때 이미 만든 더 큰 단계에서 한 번에 줄여 만들고(잠금으로 보호), 이후에는 다시 씁니다.
+    그래서 1:1로만 보는 아주 큰 이미지는 전체 축소를 한 번도 하지 않습니다."""
+
+    def __init__(self, base, source_size=None, min_size=256):
+        if base.mode not in ("L", "RGB", "RGBA"):
+            base = base.convert("RGBA" if may_have_transparency(base) else "RGB")
+        self.source_size = tuple(source_size or base.size)
+        # 원본 1px이 base에서 몇 px인지 (원본 그대로면 1.0)
+        self.base_scale = base.size[0] / self.source_size[0]
+        self._levels = {0: base}
+        self._lock = threading.Lock()
+        self.level_count = 1
+        width, height = base.size
+        while max(width, height) > min_size:
+            width, height = (width + 1) // 2, (height + 1) // 2
+            self.level_count += 1
+
+    @property
+    def has_alpha(self):
+        return self._levels[0].mode == "RGBA"
+
+    def level(self, index):
+        """index 단계 이미지 (base의 1/2**index 크기)."""
+        with self._lock:
+            img = self._levels.get(index)
+            if img is None:
+                parent = max(i for i in self._levels if i < index)
+                img = self._levels[parent].reduce(2 ** (index - parent))
+                self._levels[index] = img
+        return img
+
+    def level_for(self, scale):
+        """화면 배율 scale(원본 1px당 화면 px)을 표현할 수 있는 가장 작은 단계 번호."""
+        level = 0
+        while level + 1 < self.level_count and self.base_scale / 2 ** (level + 1) >= scale:
+            level += 1
+        return level
+
+    def render(self, box, out_size):
+        """원본 좌표 box(x1, y1, x2, y2, 실수 가능)를 out_size 크기로 그린 이미지.
+        확대(원본 1px이 화면 1px보다 큼)할 때는 픽셀 경계가 보이도록 NEAREST를 씁니다."""
+        scale = out_size[0] / max(1e-9, box[2] - box[0])
+        img = self.level(self.level_for(scale))
+        # 단계 이미지의 크기는 반올림되어 있으므로 가로/세로 배율을 따로 구해 box가 이미지를 벗어나지 않게 합니다.
+        fx, fy = img.width / self.source_size[0], img.height / self.source_size[1]
+        level_box = (box[0] * fx, box[1] * fy, box[2] * fx, box[3] * fy)
+        resample = Image.Resampling.NEAREST if scale >= 1 else Image.Resampling.BILINEAR
+        return img.resize(out_size, resample, box=level_box)
+
+    def display_size(self, scale):
+        """배율 scale로 그렸을 때의 전체 크기 (px)."""
+        return max(1, math.ceil(self.source_size[0] * scale)), max(1, math.ceil(self.source_size[1] * scale))
+
+    def render_tile(self, scale, column, row, tile=PREVIEW_TILE_SIZE):
+        """배율 scale로 그린 전체 화면을 tile×tile로 나눴을 때 (column, row)번째 타일 (오른쪽/아래 끝 타일은 작음).
+        타일 경계는 항상 tile의 배수라 체크무늬 배경(칸 8px)도 타일 사이에서 끊기지 않습니다."""
+        width, height = self.display_size(scale)
+        x1, y1 = column * tile, row * tile
+        x2, y2 = min(width, x1 + tile), min(height, y1 + tile)
+        sw, sh = self.source_size
+        box = (x1 / scale, y1 / scale, min(sw, x2 / scale), min(sh, y2 / scale))
+        return self.render(box, (x2 - x1, y2 - y1))
+
+
+# ============================================================================
+# 병합 배치 계산 (행 × 열 격자)
+# ============================================================================
+@dataclass(frozen=True)
+class MergeLayout:
+    """병합 결과의 기하 정보. 모든 영역은 (x1, y1, x2, y2) 형식이며 x2/y2는 포함하지 않습니다.
+    캔버스 전체는 gap_color를 바탕으로 하고, 그 위에 regions()의 영역들이 서로 겹치지 않게 놓입니다.
+    placements의 크기는 크기 기준(size_mode)을 적용해 리사이즈된 뒤의 이미지 크기와 같습니다."""
+    canvas_size: Tuple[int, int]
+    inner_box: Tuple[int, int, int, int]
+    cells: Tuple[Tuple[int, int, int, int], ...]
+    placements: Tuple[Tuple[int, int, int, int], ...]
+
+    def regions(self):
+        """바탕(gap_color) 위에 칠할 (영역, 종류) 목록. 종류: 'border' / 'fill' / 이미지 번호(int).
+        테두리는 네 변의 띠로, 칸의 남는 공간은 이미지 주변의 위/아래/왼쪽/오른쪽 조각으로 나누어
+        모든 픽셀이 최대 한 번만 칠해지도록 합니다."""
+        w, h = self.canvas_size
+        ix1, iy1, ix2, iy2 = self.inner_box
+        out = [((0, 0, w, iy1), "border"), ((0, iy2, w, h), "border"),
+               ((0, iy1, ix1, iy2), "border"), ((ix2, iy1, w, iy2), "border")]
+        for (cx1, cy1, cx2, cy2), (px1, py1, px2, py2) in zip(self.cells, self.placements):
+            out += [((cx1, cy1, cx2, py1), "fill"), ((cx1, py2, cx2, cy2), "fill"),
+                    ((cx1, py1, px1, py2), "fill"), ((px2, py1, cx2, py2), "fill")]
+        out += [(box, i) for i, box in enumerate(self.placements)]
+        return [(box, kind) for box, kind in out if box[2] > box[0] and box[3] > box[1]]
+
+    def scaled(self, scale):
+        """모든 좌표를 round(v * scale)로 옮긴 배치 (미리보기용 축소 배치).
+        같은 좌표는 항상 같은 값으로 옮겨지므로 맞닿은 영역은 줄인 뒤에도 틈이나 겹침 없이 맞닿고,
+        여백/테두리/채우기 띠와 이미지 위치는 원본 배치를 그대로 줄인 것과 같습니다.
+        (배율이 아주 작으면 1px보다 가는 띠나 이미지는 너비 0이 되어 regions()에서 빠집니다.)"""
+        def fit(box):
+            return tuple(round(v * scale) for v in box)
+        width, height = self.canvas_size
+        return MergeLayout(canvas_size=(max(1, round(width * scale)), max(1, round(height * scale))),
+                           inner_box=fit(self.inner_box), cells=tuple(map(fit, self.cells)),
+                           placements=tuple(map(fit, self.placements)))
+
+    def rects_for_rows(self, y1, y2):
+        """regions() 중 [y1, y2) 행 범위와 겹치는 (영역, 종류) 목록."""
+        return [(box, kind) for box, kind in self.regions() if box[1] < y2 and box[3] > y1]
+
+
+def _fit_size(size, target, axis):
+    """axis('height' 또는 'width') 방향 길이를 target에 맞춘 크기 (비율 유지)."""
+    w, h = size
+    if axis == "height":
+        return size if h == target else (max(1, round(w * target / h)), target)
+    return size if w == target else (target, max(1, round(h * target / w)))
+
+
+def compute_grid_layout(sizes, rows, cols, gap, size_mode, border=0):
+    """sizes(행 우선 순서)의 이미지를 rows × cols 격자에 배치한 MergeLayout을 계산합니다.
+    size_mode가 'smaller'/'larger'이면 열이 여러 개일 때는 각 행의 높이를, 열이 하나뿐일 때는
+    열 전체의 너비를 작은/큰 쪽에 맞춥니다('none'은 크기 변경 없음). 행 높이는 그 행에서 가장 높은
+    이미지, 열 너비는 그 열에서 가장 넓은 이미지를 따르며, 각 이미지는 칸 가운데에 놓입니다."""
+    sizes = list(sizes)
+    pick = min if size_mode == "smaller" else max
+    if size_mode != "none":
+        if cols == 1:
+            target_w = pick(w for w, _h in sizes)
+            sizes = [_fit_size(s, target_w, "width") for s in sizes]
+        else:
+            for r in range(rows):
+                row = sizes[r * cols:(r + 1) * cols]
+                if not row:
+                    break
+                target_h = pick(h for _w, h in row)
+                sizes[r * cols:(r + 1) * cols] = [_fit_size(s, target_h, "height") for s in row]
+
+    row_h = [0] * rows
+    col_w = [0] * cols
+    for i, (w, h) in enumerate(sizes):
+        r, c = divmod(i, cols)
+        row_h[r] = max(row_h[r], h)
+        col_w[c] = max(col_w[c], w)
+
+    col_x, x = [], border
+    for w in col_w:
+        col_x.append(x)
+        x += w + gap
+    row_y, y = [], border
+    for h in row_h:
+        row_y.append(y)
+        y += h + gap
+    inner_w = sum(col_w) + gap * (cols - 1)
+    inner_h = sum(row_h) + gap * (rows - 1)
+
+    cells, placements = [], []
+    for i, (w, h) in enumerate(sizes):
+        r, c = divmod(i, cols)
+        cx, cy = col_x[c], row_y[r]
+        cells.append((cx, cy, cx + col_w[c], cy + row_h[r]))
+        px, py = cx + (col_w[c] - w) // 2, cy + (row_h[r] - h) // 2
+        placements.append((px, py, px + w, py + h))
+
+    return MergeLayout(
+        canvas_size=(inner_w + border * 2, inner_h + border * 2),
+        inner_box=(border, border, border + inner_w, border + inner_h),
+        cells=tuple(cells), placements=tuple(placements))
+
+
+def read_image_sizes(paths):
+    """파일 헤더만 읽어 각 이미지의 크기를 돌려줍니다. (픽셀은 디코딩하지 않음)"""
+    sizes = []
+    for path in paths:
+        with Image.open(path) as img:
+            sizes.append(img.size)
+    return sizes
+
+
+def render_merge_layout(layout, images, mode, gap_color, fill_color, border_color, quality="exact",
+                        resample=DEFAULT_RESAMPLE):
+    """MergeLayout대로 최종 캔버스(테두리 포함)를 한 번만 만들어 합성합니다.
+    각 이미지의 모드 변환과 배치 크기 리사이즈는 공유 스레드 풀에서 동시에 처리하고, 모두 끝나면
+    캔버스를 gap_color로 생성해 테두리 띠와 칸의 남는 공간만 색으로 채운 뒤 각 이미지를 정확히 한 번
+    붙여 넣습니다. 이미지 영역은 다른 색이 칠해지지 않으므로 마스크 없이 그대로 복사하며,
+    RGBA 이미지의 투명도(알파 값)도 원본 그대로 유지됩니다. quality/resample은 resample_image와 같습니다."""
+    def fit(item):
+        img, (x1, y1, x2, y2) = item
+        if x2 <= x1 or y2 <= y1:
+            return None  # 축소 배치에서 너비가 0이 된 이미지 (regions()에 나오지 않음)
+        if img.mode != mode:
+            img = img.convert(mode)
+        if img.size != (x2 - x1, y2 - y1):
+            img = resample_image(img, (x2 - x1, y2 - y1), quality, resample)
+        return img
+
+    fitted = parallel_map(fit, zip(images, layout.placements))
+    colors = {"border": border_color, "fill": fill_color}
+    dst = Image.new(mode, layout.canvas_size, gap_color)
+    for box, kind in layout.regions():
+        if kind in colors:
+            dst.paste(colors[kind], box)
+        else:
+            dst.paste(fitted[kind], box[:2])
+    return dst
+
+
+# ============================================================================
+# 작업 객체 (옵션 값만 담으며 Tk 변수에 의존하지 않습니다)
+# ============================================================================
+def auto_grid_shape(count):
+    """count장을 정사각형에 가깝게 배치하는 (행 수, 열 수). 열을 행보다 같거나 많게 잡습니다.
+    (4장 → 2x2, 12장 → 3x4, 200장 → 14x15)"""
+    cols = math.ceil(math.sqrt(count))
+    return math.ceil(count / cols), cols
+
+
+@dataclass(frozen=True)
+class MergeOp:
+    """여러 장의 이미지를 하나로 병합합니다. layout: 'horizontal' / 'vertical' / 'grid'(행 × 열).
+    grid는 rows/cols로 격자 크기를 정하며, 0이면 장수에 맞춰 자동으로 정합니다(둘 다 0이면
+    정사각형에 가깝게, 하나만 지정하면 나머지를 장수에 맞게). 마지막 행은 비어 있는 칸이 있을 수 있습니다.
+    입력 이미지의 모드는 자유이며, 투명한 입력이 있을 때만 RGBA로, 아니면 RGB로 합성합니다."""
+    layout: str
+    gap: int = 10
+    gap_color: str = "#FFFFFF"
+    border: int = 0
+    border_color: str = "#000000"
+    fill_color: str = "#FFFFFF"
+    size_mode: str = "smaller"
+    rows: int = 0
+    cols: int = 0
+    quality: str = "exact"
+    resample: str = DEFAULT_RESAMPLE
+
+    @classmethod
+    def from_mode(cls, mode, **options):
+        """GUI의 병합 모드 값('2_horiz', '4_grid' 등)으로 작업 객체를 만듭니다."""
+        if mode not in MERGE_MODES:
+            raise EngineError(f"알 수 없는 병합 모드입니다: {mode}")
+        return cls(layout=MERGE_MODES[mode][0], **options)
+
+    def validate(self, count):
+        """옵션 값과 입력 장수가 올바른지 확인하고, 아니면 EngineError를 발생시킵니다."""
+        if self.gap < 0 or self.border < 0:
+            raise EngineError("여백과 테두리 굵기는 0 이상이어야 합니다.")
+        if self.size_mode not in SIZE_MODES:
+            raise EngineError(f"알 수 없는 크기 기준입니다: {self.size_mode}")
+        if count < 2:
+            raise EngineError("병합하려면 2개 이상의 이미지가 필요합니다.")
+        if self.layout not in ("horizontal", "vertical", "grid"):
+            raise EngineError(f"알 수 없는 병합 방향입니다: {self.layout}")
+        if self.quality not in RESAMPLE_QUALITIES:
+            raise EngineError(f"알 수 없는 리샘플링 품질입니다: {self.quality}")
+        if self.resample not in RESAMPLE_FILTERS:
+            raise EngineError(f"알 수 없는 리샘플링 필터입니다: {self.resample}")
+        if self.rows < 0 or self.cols < 0:
+            raise EngineError("행/열 수는 0(자동) 이상이어야 합니다.")
+        rows, cols = self.grid_shape(count)
+        if rows * cols < count:
+            raise EngineError(f"{rows}행 × {cols}열 격자에는 이미지를 {rows * cols}개까지만 넣을 수 있습니다. "
+                              f"(선택한 이미지 {count}개)")
+
+    def grid_shape(self, count):
+        """병합 방향에 해당하는 (행 수, 열 수). 지정한 격자가 장수보다 커서 통째로 비는 행/열은 뺍니다."""
+        if self.layout == "horizontal":
+            return 1, count
+        if self.layout == "vertical":
+            return count, 1
+        if not (self.rows or self.cols):
+            return auto_grid_shape(count)
+        if self.cols:
+            cols = min(self.cols, count)
+            rows = math.ceil(count / cols)
+            return (min(self.rows, rows) if self.rows else rows), cols
+        cols = math.ceil(count / self.rows)
+        return math.ceil(count / cols), cols
+
+    def compute_layout(self, sizes):
+        """원본 크기 목록으로 테두리를 포함한 결과 배치(MergeLayout)를 계산합니다."""
+        self.validate(len(sizes))
+        rows, cols = self.grid_shape(len(sizes))
+        return compute_grid_layout(sizes, rows, cols, self.gap, self.size_mode, self.border)
+
+    def apply(self, images):
+        mode = merge_mode_for(images)
+        layout = self.compute_layout([img.size for img in images])
+        return render_merge_layout(layout, images, mode, self.gap_color, self.fill_color, self.border_color,
+                                   self.quality, self.resample)
+
+
+@dataclass(frozen=True)
+class FlipOp:
+    """이미지를 뒤집습니다. direction: 'horizontal'(좌우) / 'vertical'(상하) / 'both'(상하/좌우)."""
+    direction: str = "horizontal"
+
+    def apply(self, image):
+        if self.direction == "horizontal":
+            return image.transpose(Image.FLIP_LEFT_RIGHT)
+        if self.direction == "vertical":
+            return image.transpose(Image.FLIP_TOP_BOTTOM)
+        if self.direction == "both":
+            return image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.FLIP_TOP_BOTTOM)
+        raise EngineError(f"알 수 없는 뒤집기 방향입니다: {self.direction}")
+
+
+@dataclass(frozen=True)
+class RotateOp:
+    """이미지를 시계 방향으로 90°/180°/270° 회전합니다."""
+    degrees: int = 90
+
+    def apply(self, image):
+        # PIL의 ROTATE_* 상수는 반시계 방향 기준이므로 시계 방향 각도와 반대로 대응됩니다.
+        transpose = {90: Image.ROTATE_270, 180: Image.ROTATE_180, 270: Image.ROTATE_90}.get(self.degrees)
+        if transpose is None:
+            raise EngineError(f"지원하지 않는 회전 각도입니다: {self.degrees}")
+        return image.transpose(transpose)
+
+
+@dataclass(frozen=True)
+class ResizeOp:
+    """이미지 크기를 조정합니다. percent가 지정되면 비율(%)로, 아니면 width/height(px)로 조정합니다.
+    quality: 'exact'(기본) / 'fast'(큰 비율 축소 시 정수 배 선축소 후 필터 적용, resample_image 참고).
+    resample: RESAMPLE_FILTERS의 필터 이름 (기본 'lanczos')."""
+    percent: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    quality: str = "exact"
+    resample: str = DEFAULT_RESAMPLE
+
+    def target_size(self, size):
+        """원본 크기(size)에 대한 결과 크기를 계산합니다."""
+        orig_w, orig_h = size
+        if self.percent is not None:
+            pct = self.percent / 100
+            return max(1, int(orig_w * pct)), max(1, int(orig_h * pct))
+        if self.width is None or self.height is None:
+            raise EngineError("비율 또는 너비/높이 중 하나는 지정해야 합니다.")
+        return max(1, int(self.width)), max(1, int(self.height))
+
+    def apply(self, image):
+        return resample_image(image, self.target_size(image.size), self.quality, self.resample)
+
+
+@dataclass(frozen=True)
+class CropOp:
+    """원본 픽셀 좌표 (x1, y1, x2, y2) 영역을 잘라냅니다. 이미지 밖으로 벗어난 좌표는 경계에 맞춥니다."""
+    box: Tuple[int, int, int, int]
+
+    def clamped_box(self, size):
+        """이미지 크기(size) 안으로 맞춘 영역. 1px보다 작으면 EngineError."""
+        x1, y1, x2, y2 = self.box
+        width, height = size
+        x1, x2 = max(0, min(x1, width)), max(0, min(x2, width))
+        y1, y2 = max(0, min(y1, height)), max(0, min(y2, height))
+        if (x2 - x1) < 1 or (y2 - y1) < 1:
+            raise EngineError("잘라낼 영역이 너무 작습니다.")
+        return x1, y1, x2, y2
+
+    def apply(self, image):
+        return image.crop(self.clamped_box(image.size))
+
+
+@dataclass(frozen=True)
+class IcoOp:
+    """ICO 저장용 정사각형(기본 256×256, 여백 투명) 이미지를 만듭니다.
+    저장 시에는 save_kwargs()를 함께 넘겨 ICO_SIZES의 모든 해상도를 포함시킵니다."""
+    size: Tuple[int, int] = ICO_LARGEST_SIZE
+
+    def apply(self, image):
+        return fit_to_square(image, self.size)
+
+    @staticmethod
+    def save_kwargs():
+        return {"format": "ICO", "sizes": ICO_SIZES}
+
+
+# ============================================================================
+# 실시간 미리보기 (원본 대신 캐시된 축소 입력으로 결과를 저해상도로 그림)
+# ============================================================================
+# 대리 이미지의 최소 한 변 (px). 필요한 크기를 2의 거듭제곱으로 올려 두어, 옵션이나 배율이
+# 조금 바뀌어도 같은 대리 이미지를 캐시에서 다시 쓰게 합니다.
+PROXY_MIN_SIDE = 64
+
+
+def proxy_side(needed):
+    """needed px 이상인 가장 작은 2의 거듭제곱 (최소 PROXY_MIN_SIDE)."""
+    side = PROXY_MIN_SIDE
+    while side < needed:
+        side *= 2
+    return side
+
+
+def load_proxy_image(path, needed):
+    """가로/세로가 needed px 이상 남아 있는 캐시된 축소 이미지 (원본이 더 작으면 원본 크기).
+    공유 캐시의 이미지이므로 수정하지 말고 읽기 전용으로 사용하세요."""
+    return image_cache.get_proxy(path, proxy_side(needed))
+
+
+def render_merge_preview(op, paths, max_size):
+    """병합 결과를 원본 해상도로 만들지 않고 max_size 안에 맞춘 크기로만 그립니다.
+    원본 크기(파일 헤더)로 실제 병합과 똑같이 배치를 계산한 뒤 그 배치를 MergeLayout.scaled()로 줄이고,
+    캐시된 축소 입력을 줄인 칸에 붙여 넣습니다. 그리는 비용이 결과 크기가 아니라 max_size에 비례하며,
+    여백/테두리/채우기 띠와 이미지 위치는 실제 결과를 같은 배율로 줄인 것과 일치합니다.
+    반환값: (미리보기 이미지, 실제 결과 크기)"""
+    layout = op.compute_layout(read_image_sizes(paths))
+    width, height = layout.canvas_size
+    scale = min(1.0, max_size[0] / width, max_size[1] / height)
+    small = layout.scaled(scale)
+
+    def load(item):
+        path, (x1, y1, x2, y2) = item
+        return load_proxy_image(path, max(x2 - x1, y2 - y1))
+
+    proxies = parallel_map(load, zip(paths, small.placements))
+    image = render_merge_layout(small, proxies, merge_mode_for(proxies), op.gap_color, op.fill_color,
+                                op.border_color, "fast", "bilinear")
+    return image, layout.canvas_size
+
+
+@dataclass(frozen=True)
+class MergePreviewOp:
+    """병합 미리보기용 파일 단위 작업. apply(paths)는 render_merge_preview()의 결과
+    (max_size 안의 미리보기 이미지, 실제 결과 크기)를 돌려줍니다."""
+    merge: MergeOp
+    max_size: Tuple[int, int]
+
+    def apply(self, paths):
+        return render_merge_preview(self.merge, paths, self.max_size)
+
+
+def render_live_preview(op, paths, max_size):
+    """op를 원본 대신 축소 입력에 실행해, 실제 결과를 max_size 안에 맞춘 저해상도 이미지를 만듭니다.
+    병합/뒤집기/회전/크기 조정(MergeOp/FlipOp/RotateOp/ResizeOp)을 지원하며, 원본은 파일 헤더로
+    크기만 읽습니다. 반환값: (미리보기 이미지, 실제 결과 크기)"""
+    if isinstance(op, MergeOp):
+        return render_merge_preview(op, paths, max_size)
+    if len(paths) != 1:
+        raise EngineError("이미지 한 장이 필요합니다.")
+    max_w, max_h = max_size
+    width, height = read_image_sizes(paths)[0]
+    if isinstance(op, ResizeOp):
+        target_w, target_h = op.target_size((width, height))
+        # 원본을 창에 맞추는 배율로 결과도 줄여, 크기 변화가 미리보기에서도 그대로 보이게 합니다.
+        scale = min(1.0, max_w / width, max_h / height)
+        proxy = load_proxy_image(paths[0], math.ceil(max(width, height) * scale))
+        size = (max(1, round(target_w * scale)), max(1, round(target_h * scale)))
+        # 확대하거나 가로/세로 비율이 크게 바뀌면 결과가 창보다 커지므로, fit_within과 같은 규칙으로
+        # max_size 안에 맞춘 크기로 바로 리샘플링합니다. (비용이 목표 크기가 아니라 창 크기에 비례)
+        ratio = min(1.0, max_w / size[0], max_h / size[1])
+        size = (max(1, round(size[0] * ratio)), max(1, round(size[1] * ratio)))
+        return resample_image(proxy, size, "fast", op.resample), (target_w, target_h)
+    if isinstance(op, (FlipOp, RotateOp)):
+        proxy = fit_within(load_proxy_image(paths[0], max(max_w, max_h)), max_size)
+        result = op.apply(proxy)
+        if isinstance(op, RotateOp) and op.degrees in (90, 270):
+            width, height = height, width
+        return fit_within(result, max_size), (width, height)
+    raise EngineError("이 기능은 실시간 미리보기를 지원하지 않습니다.")
+
+
+# ============================================================================
+# 인코더 설정 (모든 저장 경로가 같은 프로필로 포맷별 압축 옵션을 정함)
+# ============================================================================
+@dataclass(frozen=True)
+class EncoderProfile:
+    """포맷별 인코더 옵션 묶음. 속도와 파일 크기 사이의 절충을 이름 하나로 고를 수 있게 합니다."""
+    png_compress_level: int     # zlib 압축 수준 0~9 (높을수록 작고 느림)
+    png_optimize: bool          # 여러 압축 설정을 시도해 가장 작은 결과 선택 (큰 이미지에서 매우 느림)
+    webp_method: int            # 0~6 (높을수록 작고 느림)
+    jpeg_optimize: bool         # 허프만 표 최적화 (한 번 더 훑으므로 약간 느림)
+    jpeg_progressive: bool
+    jpeg_subsampling: str       # 크로마 서브샘플링 ("4:4:4" / "4:2:2" / "4:2:0")
+
+
+ENCODER_PROFILES = {
+    "fastest": EncoderProfile(png_compress_level=1, png_optimize=False, webp_method=0,
+                              jpeg_optimize=False, jpeg_progressive=False, jpeg_subsampling="4:2:0"),
+    "balanced": EncoderProfile(png_compress_level=6, png_optimize=False, webp_method=4,
+                               jpeg_optimize=True, jpeg_progressive=False, jpeg_subsampling="4:2:0"),
+    "smallest": EncoderProfile(png_compress_level=9, png_optimize=True, webp_method=6,
+                               jpeg_optimize=True, jpeg_progressive=True, jpeg_subsampling="4:2:0"),
+}
+DEFAULT_ENCODER_PROFILE = "balanced"
+
+
+def encoder_profile(name):
+    try:
+        return ENCODER_PROFILES[name]
+    except KeyError:
+        raise EngineError(f"알 수 없는 저장 설정입니다: {name}")
+
+
+def encoder_save_kwargs(output_path, profile=DEFAULT_ENCODER_PROFILE, quality=None):
+    """output_path의 확장자에 맞는 image.save() 인자. quality가 None이면 Pillow 기본 품질을 씁니다."""
+    settings = encoder_profile(profile)
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext in (".jpg", ".jpeg"):
+        kwargs = {"format": "JPEG", "optimize": settings.jpeg_optimize,
+                  "progressive": settings.jpeg_progressive, "subsampling": settings.jpeg_subsampling}
+    elif ext == ".png":
+        kwargs = {"format": "PNG", "compress_level": settings.png_compress_level,
+                  "optimize": settings.png_optimize}
+    elif ext == ".webp":
+        kwargs = {"format": "WEBP", "method": settings.webp_method}
+    elif ext == ".ico":
+        return IcoOp.save_kwargs()
+    else:
+        return {}
+    if quality is not None and kwargs["format"] in ("JPEG", "WEBP"):
+        kwargs["quality"] = int(quality)
+    return kwargs
+
+
+def flatten_for_jpeg(image, background=(255, 255, 255)):
+    """JPEG처럼 투명도를 지원하지 않는 포맷용으로, 투명한 부분을 background 색에 합성한 RGB 이미지."""
+    if image.mode in ("RGB", "L", "CMYK"):
+        return image
+    if not has_transparency(image):
+        return image.convert("RGB")
+    rgba = image.convert("RGBA")
+    flat = Image.new("RGB", rgba.size, background)
+    flat.paste(rgba, mask=rgba.getchannel("A"))
+    return flat
+
+
+def _create_temp_file(directory, suffix):
+    """directory에 겹치지 않는 이름의 빈 임시 파일을 만들고 경로를 돌려줍니다.
+    mkstemp(0600)와 달리 os.open의 권한 0666을 주므로 umask가 적용된 일반 파일 권한으로 만들어집니다."""
+    while True:
+        tmp = os.path.join(directory, f".aie-{os.urandom(6).hex()}{suffix}")
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return tmp
+
+
+@contextmanager
+def atomic_output(path):
+    """path와 같은 폴더에 만든 임시 파일 경로를 내주고, 블록이 정상적으로 끝나면 os.replace로 path에 한 번에 옮깁니다.
+    쓰는 도중 예외가 나거나 프로그램이 죽어도 path에는 이전 파일이 그대로 있고 반쯤 쓴 파일이 남지 않습니다.
+    임시 파일은 확장자를 유지하므로 Pillow가 확장자로 저장 형식을 정하는 경우에도 그대로 쓸 수 있습니다."""
+    tmp = _create_temp_file(os.path.dirname(path) or ".", os.path.splitext(path)[1])
+    try:
+        yield tmp
+        try:
+            if os.path.exists(path):
+                shutil.copymode(path, tmp)  # 덮어쓸 때는 기존 파일의 권한을 유지
+        except OSError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def save_image(image, output_path, profile=DEFAULT_ENCODER_PROFILE, quality=None, save_kwargs=None):
+    """저장 경로의 확장자와 저장 설정(profile)에 맞춰 이미지를 저장합니다. (GUI/CLI 공용)
+    save_kwargs를 주면 프로필 대신 그 인자로 저장합니다(예: IcoOp.save_kwargs()).
+    임시 파일에 쓴 뒤 이름을 바꾸므로 저장 도중 실패해도 기존 파일이 깨지지 않습니다."""
+    kwargs = encoder_save_kwargs(output_path, profile, quality) if save_kwargs is None else save_kwargs
+    if kwargs.get("format") == "ICO":
+        return save_ico(image, output_path, kwargs.get("sizes", ICO_SIZES), profile)
+    if kwargs.get("format") == "JPEG":
+        image = flatten_for_jpeg(image)
+    with atomic_output(output_path) as tmp:
+        image.save(tmp, **kwargs)
+    return output_path
+
+
+# ============================================================================
+# ICO 파일 기록 (해상도별 프레임을 직접 만들어 256px은 PNG, 작은 크기는 BMP로 저장)
+# ============================================================================
+_ICO_FRAME_CACHE_SIZE = 8
+_ico_frame_cache = OrderedDict()
+_ico_frame_lock = threading.Lock()
+
+
+def _sharpen_rgba(img):
+    """축소로 흐려진 작은 아이콘을 선명하게 합니다. 투명한 가장자리에 색이 번지지 않도록
+    알파를 곱한 상태(RGBa)에서 보정하고, 알파 채널은 원래 값을 그대로 둡니다."""
+    premultiplied = img.convert("RGBa")
+    sharpened = premultiplied.filter(ImageFilter.UnsharpMask(radius=0.6, percent=60, threshold=1))
+    r, g, b, _a = sharpened.split()
+    return Image.merge("RGBa", (r, g, b, premultiplied.getchannel(3))).convert("RGBA")
+
+
+def build_ico_frames(master, sizes=ICO_SIZES):
+    """master(보통 256×256 RGBA)에서 sizes의 각 프레임을 만듭니다. 한 번에 크게 줄이지 않고
+    이미 만든 프레임 중 목표의 2배 이상인 가장 작은 것에서 줄여(256 → 128 → 64 → 32 → 16, 48은 128에서)
+    단계마다 충분한 원본 정보를 쓰고, ICO_SHARPEN_MAX_SIZE 이하는 선명하게 보정합니다.
+    반환값: {크기: RGBA 이미지} (sizes 순서)"""
+    master = master if master.mode == "RGBA" else master.convert("RGBA")
+    frames = {master.size: master}
+    for size in sorted(set(sizes), reverse=True):
+        if size in frames:
+            continue
+        sources = [s for s in frames if s[0] >= 2 * size[0] and s[1] >= 2 * size[1]]
+        source = frames[min(sources) if sources else max(frames)]
+        frame = source.resize(size, Image.Resampling.LANCZOS)
+        if max(size) <= ICO_SHARPEN_MAX_SIZE:
+            frame = _sharpen_rgba(frame)
+        frames[size] = frame
+    return {size: frames[size] for size in sizes}
+
+
+def ico_frames(master, sizes=ICO_SIZES):
+    """build_ico_frames의 결과를 master 픽셀 내용 기준으로 보관해 두고 다시 씁니다.
+    (미리보기에서 만든 프레임을 저장 시 그대로 쓰는 등) 반환된 이미지는 공유되므로 수정하면 안 됩니다."""
+    key = (hashlib.blake2b(master.tobytes(), digest_size=16).digest(), master.mode, master.size, tuple(sizes))
+    with _ico_frame_lock:
+        frames = _ico_frame_cache.get(key)
+        if frames is not None:
+            _ico_frame_cache.move_to_end(key)
+            return frames
+    frames = build_ico_frames(master, sizes)
+    with _ico_frame_lock:
+        _ico_frame_cache[key] = frames
+        while len(_ico_frame_cache) > _ICO_FRAME_CACHE_SIZE:
+            _ico_frame_cache.popitem(last=False)
+    return frames
+
+
+def _ico_bmp_frame(img):
+    """ICO 안에 넣는 BMP 프레임: BITMAPINFOHEADER + 아래에서 위로 쓴 32비트 BGRA + 1비트 AND 마스크."""
+    width, height = img.size
+    xor = img.transpose(Image.Transpose.FLIP_TOP_BOTTOM).tobytes("raw", "BGRA")
+    mask_stride = ((width + 31) // 32) * 4
+    # AND 마스크는 완전히 투명한 픽셀만 1로 표시합니다. (32비트 프레임을 모르는 오래된 프로그램용)
+    mask_bits = img.getchannel("A").point(lambda a: 0 if a else 255).convert("1")
+    mask_rows = mask_bits.transpose(Image.Transpose.FLIP_TOP_BOTTOM).tobytes("raw", "1", mask_stride)
+    header = struct.pack("<IiiHHIIiiII", 40, width, height * 2, 1, 32, 0,
+                         len(xor) + len(mask_rows), 0, 0, 0, 0)
+    return header + xor + mask_rows
+
+
+def encode_ico(frames, png_compress_level=9):
+    """{크기: RGBA 이미지}를 ICO 파일 바이트로 만듭니다. ICO_PNG_MIN_SIZE 이상은 PNG, 나머지는 BMP로 넣습니다."""
+    payloads = []
+    for (width, height), img in sorted(frames.items()):
+        if width >= ICO_PNG_MIN_SIZE or height >= ICO_PNG_MIN_SIZE:
+            buf = io.BytesIO()
+            img.save(buf, format="PNG", compress_level=png_compress_level)
+            data = buf.getvalue()
+        else:
+            data = _ico_bmp_frame(img)
+        payloads.append((width, height, data))
+
+    out = [struct.pack("<HHH", 0, 1, len(payloads))]
+    offset = 6 + 16 * len(payloads)
+    for width, height, data in payloads:
+        # 크기 256은 1바이트에 담을 수 없어 0으로 기록합니다.
+        out.append(struct.pack("<BBBBHHII", width % 256, height % 256, 0, 0, 1, 32, len(data), offset))
+        offset += len(data)
+    out.extend(data for _w, _h, data in payloads)
+    return b"".join(out)
+
+
+def save_ico(master, output_path, sizes=ICO_SIZES, profile=None):
+    """master로 ICO 파일을 만들어 output_path에 저장합니다. (임시 파일에 쓴 뒤 이름 바꾸기)"""
+    level = encoder_profile(profile or DEFAULT_ENCODER_PROFILE).png_compress_level
+    _write_atomic(output_path, encode_ico(ico_frames(master, sizes), level))
+    return output_path
+
+
+def ico_output_path(src_path):
+    """원본 경로 → 같은 폴더의 같은 이름 .ico 경로 (GUI/CLI의 기본 저장 이름과 동일)."""
+    return os.path.splitext(src_path)[0] + ".ico"
+
+
+@dataclass(frozen=True)
+class IcoBatchOp:
+    """폴더의 로고 여러 장을 각각 원본 옆의 .ico 파일로 한 번에 변환하는 작업 객체.
+    apply()에는 원본 경로 목록을 넘기며, 공유 스레드 풀에서 동시에 처리한 뒤
+    [(원본 경로, 저장 경로, 오류 메시지 또는 None), ...]을 입력 순서대로 돌려줍니다."""
+    profile: str = DEFAULT_ENCODER_PROFILE
+    size: Tuple[int, int] = ICO_LARGEST_SIZE
+
+    def apply(self, paths):
+        # logo.png와 logo.jpg처럼 결과 이름이 같은 원본은 동시에 저장하면 어느 쪽이 남을지 정해지지 않으므로,
+        # 입력 순서상 처음 것만 변환하고 나머지는 파일별 오류로 돌려줍니다.
+        owners = {}
+        for path in paths:
+            owners.setdefault(os.path.normcase(os.path.abspath(ico_output_path(path))), path)
+
+        def convert(path):
+            out = ico_output_path(path)
+            try:
+                owner = owners[os.path.normcase(os.path.abspath(out))]
+                if owner != path:
+                    raise EngineError(f"결과 파일 이름이 {os.path.basename(owner)}의 결과와 같아 건너뜁니다.")
+                if os.path.splitext(path)[1].lower() == ".ico":
+                    raise EngineError("이미 ICO 파일입니다.")
+                with Image.open(path) as img:
+                    master = fit_to_square(img, self.size)
+                save_ico(master, out, profile=self.profile)
+                return path, out, None
+            except (EngineError, OSError, ValueError) as e:
+                return path, out, str(e)
+        return parallel_map(convert, list(paths))
+
+
+# ============================================================================
+# 스트리밍 병합 (아주 큰 결과를 가로 띠 단위로 만들어 바로 파일에 기록)
+# ============================================================================
+# 행 단위 기록을 지원하는 저장 형식
+STREAM_FORMATS = {".png": "PNG", ".bmp": "BMP", ".tif": "TIFF", ".tiff": "TIFF"}
+# 결과가 이 픽셀 수 이상이면 GUI/CLI가 스트리밍 병합을 사용합니다.
+STREAM_MERGE_MIN_PIXELS = 64 * 1000 * 1000
+DEFAULT_STRIP_HEIGHT = 256
+
+
+class OperationCancelled(EngineError):
+    """작업이 사용자에 의해 취소되었을 때 발생하는 예외."""
+
+
+class _PngStripWriter:
+    """PNG를 위에서부터 한 줄씩 기록합니다. (필터 없음 + zlib 스트림 압축, 8비트 RGB/RGBA)"""
+
+    def __init__(self, fp, size, mode, compress_level=6):
+        self.fp = fp
+        self.mode = mode
+        self._zlib = zlib.compressobj(compress_level)
+        color_type = 6 if mode == "RGBA" else 2
+        fp.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", size[0], size[1], 8, color_type, 0, 0, 0))
+
+    def _chunk(self, tag, data):
+        self.fp.write(struct.pack(">I", len(data)) + tag + data)
+        self.fp.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    def write(self, strip):
+        data = strip.tobytes("raw", self.mode)
+        stride = strip.width * len(self.mode)
+        rows = b"".join(b"\x00" + data[i:i + stride] for i in range(0, len(data), stride))
+        compressed = self._zlib.compress(rows)
+        if compressed:
+            self._chunk(b"IDAT", compressed)
+
+    def close(self):
+        self._chunk(b"IDAT", self._zlib.flush())
+        self._chunk(b"IEND", b"")
+
+
+class _BmpStripWriter:
+    """BMP를 위에서부터 한 줄씩 기록합니다. (높이를 음수로 기록한 top-down 24/32비트 BMP)"""
+
+    def __init__(self, fp, size, mode):
+        self.fp = fp
+        self.rawmode, bits = ("BGRA", 32) if mode == "RGBA" else ("BGR", 24)
+        self.stride = size[0] * (bits // 8)
+        self.padding = b"\x00" * ((4 - self.stride % 4) % 4)
+        image_bytes = (self.stride + len(self.padding)) * size[1]
+        fp.write(struct.pack("<2sIHHI", b"BM", 14 + 40 + image_bytes, 0, 0, 14 + 40))
+        fp.write(struct.pack("<IiiHHIIiiII", 40, size[0], -size[1], 1, bits, 0, image_bytes,
+                             2835, 2835, 0, 0))
+
+    def write(self, strip):
+        data = strip.tobytes("raw", self.rawmode)
+        if self.padding:
+            data = b"".join(data[i:i + self.stride] + self.padding
+                            for i in range(0, len(data), self.stride))
+        self.fp.write(data)
+
+    def close(self):
+        pass
+
+
+class _TiffStripWriter:
+    """무압축 TIFF를 위에서부터 띠(스트립) 단위로 기록합니다. 띠의 픽셀을 그대로 쓰고, 띠 위치 표와
+    IFD는 close()에서 파일 끝에 붙인 뒤 헤더의 IFD 위치를 채웁니다. (클래식 TIFF라 4GB 미만만 가능)"""
+
+    def __init__(self, fp, size, mode, rows_per_strip):
+        if size[0] * size[1] * len(mode) >= 0xFFFFFFFF - (1 << 20):
+            raise EngineError("4GB가 넘는 결과는 TIFF로 기록할 수 없습니다. PNG나 BMP로 저장해주세요.")
+        self.fp = fp
+        self.size = size
+        self.mode = mode
+        self.rows_per_strip = rows_per_strip
+        self.offsets, self.counts = [], []
+        fp.write(b"II*\x00" + struct.pack("<I", 0))
+
+    def write(self, strip):
+        data = strip.tobytes("raw", self.mode)
+        self.offsets.append(self.fp.tell())
+        self.counts.append(len(data))
+        self.fp.write(data)
+
+    def close(self):
+        fp, bands = self.fp, len(self.mode)
+        tags = [(256, 4, [self.size[0]]), (257, 4, [self.size[1]]), (258, 3, [8] * bands), (259, 3, [1]),
+                (262, 3, [2]), (273, 4, self.offsets), (277, 3, [bands]), (278, 4, [self.rows_per_strip]),
+                (279, 4, self.counts), (284, 3, [1])]
+        if self.mode == "RGBA":
+            tags.append((338, 3, [2]))  # ExtraSamples: 곱하지 않은 알파
+        entries = []
+        for tag, typ, values in tags:
+            data = struct.pack("<%d%s" % (len(values), "H" if typ == 3 else "I"), *values)
+            if len(data) <= 4:
+                value = data.ljust(4, b"\x00")
+            else:  # 4바이트에 들어가지 않는 값은 IFD 앞에 따로 쓰고 위치만 기록합니다.
+                if fp.tell() % 2:
+                    fp.write(b"\x00")
+                value = struct.pack("<I", fp.tell())
+                fp.write(data)
+            entries.append(struct.pack("<HHI", tag, typ, len(values)) + value)
+        if fp.tell() % 2:
+            fp.write(b"\x00")
+        ifd = fp.tell()
+        fp.write(struct.pack("<H", len(entries)) + b"".join(entries) + struct.pack("<I", 0))
+        fp.seek(4)
+        fp.write(struct.pack("<I", ifd))
+        fp.seek(0, os.SEEK_END)
+
+
+class _RowSpill:
+    """배치 크기로 맞춘 원본 1장을 무압축 픽셀로 임시 파일에 써 두고, 띠에 필요한 행 범위만 다시 읽습니다.
+    가로 병합처럼 여러 원본이 같은 띠에 걸쳐 있어도 메모리에는 각 원본의 띠 높이만큼만 올라옵니다."""
+
+    def __init__(self, img, directory):
+        self.mode = img.mode
+        self.width = img.width
+        self.stride = img.width * len(img.getbands())
+        self.fp = tempfile.TemporaryFile(prefix=".aie-", dir=directory)
+        for y in range(0, img.height, DEFAULT_STRIP_HEIGHT):
+            self.fp.write(img.crop((0, y, img.width, min(img.height, y + DEFAULT_STRIP_HEIGHT))).tobytes())
+
+    def rows(self, y1, y2):
+        self.fp.seek(y1 * self.stride)
+        return Image.frombytes(self.mode, (self.width, y2 - y1), self.fp.read((y2 - y1) * self.stride))
+
+    def close(self):
+        self.fp.close()
+
+
+def _rows_overlap_others(placements):
+    """각 배치가 다른 배치와 같은 행(세로 범위)에 걸쳐 있는지 여부 목록."""
+    spans = [(y1, y2) for _x1, y1, _x2, y2 in placements]
+    return [any(i != j and a1 < b2 and b1 < a2 for j, (b1, b2) in enumerate(spans))
+            for i, (a1, a2) in enumerate(spans)]
+
+
+def _decode_for_placement(path, size, mode, quality="exact", resample=DEFAULT_RESAMPLE):
+    """스트리밍 병합용으로 원본 1장을 디코딩해 배치 크기로 맞춥니다. (공유 캐시를 거치지 않음)
+    quality='fast'이면 JPEG은 배치 크기의 FAST_REDUCING_GAP배까지 축소 디코딩합니다."""
+    with Image.open(path) as img:
+        if quality == "fast":
+            img.draft(None, (int(size[0] * FAST_REDUCING_GAP), int(size[1] * FAST_REDUCING_GAP)))
+        img = img.convert(mode)
+    if img.size != size:
+        img = resample_image(img, size, quality, resample)
+    return img
+
+
+def _file_has_transparency(path):
+    """원본 1장에 실제로 투명한 픽셀이 있는지 확인합니다. (merge_mode_for와 같은 판단)
+    헤더에 알파가 없으면 디코딩하지 않고, 알파가 있을 수 있을 때만 디코딩해 알파 최솟값을 봅니다."""
+    with Image.open(path) as img:
+        if not may_have_transparency(img):
+            return False
+        img.load()
+        return has_transparency(img)
+
+
+def stream_merge_to_file(op, paths, output_path, strip_height=DEFAULT_STRIP_HEIGHT, cancel_event=None,
+                         profile=DEFAULT_ENCODER_PROFILE):
+    """MergeOp 결과를 전체 캔버스를 만들지 않고 가로 띠(strip_height 줄) 단위로 합성해 PNG/BMP/TIFF로
+    바로 기록합니다. 다른 원본과 같은 행에 걸친 원본(가로 병합, 격자)은 먼저 한 장씩 디코딩해 배치 크기로
+    맞춘 뒤 출력 폴더의 임시 파일에 무압축으로 써 두고, 띠마다 필요한 행만 읽어 옵니다(_RowSpill).
+    혼자 행을 차지하는 원본(세로 병합)은 띠가 닿을 때 디코딩하고 지나가면 바로 놓아줍니다.
+    그래서 최대 메모리는 결과 크기나 원본 수와 관계없이 '띠 1개 + 가장 큰 원본 1장'으로 제한됩니다.
+    (PNG/JPEG 원본은 행 일부만 디코딩할 수 없으므로 원본 1장은 한 번 전체를 디코딩합니다.)
+    결과는 같은 폴더의 임시 파일에 기록한 뒤 이름을 바꿉니다. cancel_event가 설정되면 띠 사이에서
+    OperationCancelled를 발생시키고 쓰던 임시 파일을 지웁니다.
+    PNG 압축 수준은 저장 설정(profile)을 따릅니다. (optimize는 전체 이미지가 필요하므로 적용하지 않음)"""
+    ext = os.path.splitext(output_path)[1].lower()
+    compress_level = encoder_profile(profile).png_compress_level
+    if ext not in STREAM_FORMATS:
+        raise EngineError(f"스트리밍 병합은 {', '.join(STREAM_FORMATS)} 형식만 지원합니다.")
+    layout = op.compute_layout(read_image_sizes(paths))
+    width, height = layout.canvas_size
+    colors = {"border": op.border_color, "fill": op.fill_color}
+    # 파일 헤더에 모드를 먼저 써야 하므로, 알파가 있을 수 있는 원본만 한 장씩 미리 디코딩해 확인합니다.
+    # MergeOp.apply(merge_mode_for)와 같이 실제로 투명한 픽셀이 있을 때만 RGBA로 기록합니다.
+    mode = "RGBA" if any(_file_has_transparency(p) for p in paths) else "RGB"
+
+    active, spills = {}, {}
+    try:
+        with atomic_output(output_path) as tmp, open(tmp, "wb") as fp:
+            for kind, shared in enumerate(_rows_overlap_others(layout.placements)):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled("작업이 취소되었습니다.")
+                bx1, by1, bx2, by2 = layout.placements[kind]
+                if shared and bx2 > bx1 and by2 > by1:
+                    img = _decode_for_placement(paths[kind], (bx2 - bx1, by2 - by1), mode, op.quality, op.resample)
+                    spills[kind] = _RowSpill(img, os.path.dirname(tmp) or ".")
+                    del img
+            if STREAM_FORMATS[ext] == "PNG":
+                writer = _PngStripWriter(fp, (width, height), mode, compress_level)
+            elif STREAM_FORMATS[ext] == "TIFF":
+                writer = _TiffStripWriter(fp, (width, height), mode, strip_height)
+            else:
+                writer = _BmpStripWriter(fp, (width, height), mode)
+            for y1 in range(0, height, strip_height):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled("작업이 취소되었습니다.")
+                y2 = min(height, y1 + strip_height)
+                strip = Image.new(mode, (width, y2 - y1), op.gap_color)
+                for (bx1, by1, bx2, by2), kind in layout.rects_for_rows(y1, y2):
+                    top, bottom = max(by1, y1), min(by2, y2)
+                    if kind in colors:
+                        strip.paste(colors[kind], (bx1, top - y1, bx2, bottom - y1))
+                        continue
+                    if kind in spills:
+                        strip.paste(spills[kind].rows(top - by1, bottom - by1), (bx1, top - y1))
+                        continue
+                    if kind not in active:
+                        active[kind] = _decode_for_placement(paths[kind], (bx2 - bx1, by2 - by1), mode,
+                                                              op.quality, op.resample)
+                    part = active[kind].crop((0, top - by1, bx2 - bx1, bottom - by1))
+                    strip.paste(part, (bx1, top - y1))
+                    if by2 <= y2:
+                        del active[kind]  # 이 이미지는 더 이상 필요 없으므로 바로 메모리에서 놓아줍니다.
+                writer.write(strip)
+            writer.close()
+    finally:
+        active.clear()
+        for spill in spills.values():
+            spill.close()
+    return output_path
+
+
+@dataclass(frozen=True)
+class StreamedMergeOp:
+    """MergeOp 결과를 메모리에 만들지 않고 output_path에 바로 기록하는 작업 객체.
+    apply()에는 이미지 대신 원본 경로 목록을 넘기며, 기록한 파일 경로를 돌려줍니다."""
+    merge: MergeOp
+    output_path: str
+    strip_height: int = DEFAULT_STRIP_HEIGHT
+    cancel_event: Optional[threading.Event] = field(default=None, compare=False)
+    profile: str = DEFAULT_ENCODER_PROFILE
+
+    def apply(self, paths):
+        return stream_merge_to_file(self.merge, paths, self.output_path,
+                                    self.strip_height, self.cancel_event, self.profile)
+
+
+def should_stream_merge(op, paths, output_path):
+    """저장 형식이 행 단위 기록을 지원하고 결과가 STREAM_MERGE_MIN_PIXELS 이상이면 True."""
+    if os.path.splitext(output_path)[1].lower() not in STREAM_FORMATS:
+        return False
+    try:
+        w, h = op.compute_layout(read_image_sizes(paths)).canvas_size
+    except (OSError, EngineError):
+        return False
+    return w * h >= STREAM_MERGE_MIN_PIXELS
+
+
+# ============================================================================
+# 무손실 JPEG 회전/뒤집기 (DCT 계수를 그대로 옮기므로 화질 손실이 없음)
+# ============================================================================
+JPEG_EXTS = (".jpg", ".jpeg")
+# JPEG 회전/뒤집기 저장 방식
+#   'lossless': jpegtran으로 DCT 계수만 재배치 (jpegtran이 없거나 크기가 MCU 배수가 아니면 'reencode'로 대체)
+#   'exif'    : 픽셀은 그대로 두고 EXIF 방향 태그(0x0112)만 바꿈 (가장 빠름, 뷰어가 방향 태그를 따라야 함)
+#   'reencode': 디코딩 후 변환해 다시 인코딩
+JPEG_TRANSFORM_METHODS = ("lossless", "exif", "reencode")
+EXIF_ORIENTATION_TAG = 0x0112
+
+# EXIF 방향 값 → 저장된 픽셀을 바로 세우는 변환 (PIL.ImageOps.exif_transpose와 동일)
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT, 3: Image.Transpose.ROTATE_180, 4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE, 6: Image.Transpose.ROTATE_270, 7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+@lru_cache(maxsize=1)
+def find_jpegtran():
+    """PATH에서 jpegtran(libjpeg/libjpeg-turbo) 실행 파일을 찾습니다. 없으면 None."""
+    return shutil.which("jpegtran")
+
+
+def is_jpeg_file(path):
+    """파일 헤더로 JPEG인지 확인합니다. (확장자만 바뀐 파일도 올바르게 판단)"""
+    try:
+        with Image.open(path) as img:
+            return img.format == "JPEG"
+    except OSError:
+        return False
+
+
+def _jpegtran_args(op):
+    """FlipOp/RotateOp를 jpegtran 옵션으로 바꿉니다. (jpegtran의 -rotate는 시계 방향 기준)"""
+    if isinstance(op, RotateOp):
+        if op.degrees not in (90, 180, 270):
+            raise EngineError(f"지원하지 않는 회전 각도입니다: {op.degrees}")
+        return ["-rotate", str(op.degrees)]
+    if op.direction == "both":
+        return ["-rotate", "180"]
+    if op.direction in ("horizontal", "vertical"):
+        return ["-flip", op.direction]
+    raise EngineError(f"알 수 없는 뒤집기 방향입니다: {op.direction}")
+
+
+def _exif_orientation_entry(data):
+    """JPEG 바이트의 EXIF IFD0에서 방향 태그 값이 있는 위치를 찾습니다.
+    반환값: (값의 바이트 위치, 바이트 순서 '<' 또는 '>'), EXIF나 방향 태그가 없으면 None.
+    오프셋이 세그먼트 밖을 가리키는 등 EXIF가 깨져 있으면 방향 태그가 없는 것으로 봅니다."""
+    if data[:2] != b"\xff\xd8":
+        raise EngineError("JPEG 파일이 아닙니다.")
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # 채움 바이트
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # EOI/SOS - 헤더 끝
+            return None
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        body = pos + 4
+        if marker == 0xE1 and data[body:body + 6] == b"Exif\x00\x00":
+            end = min(len(data), body + length - 2)  # 이 세그먼트 안의 값만 읽습니다.
+            tiff = body + 6
+            endian = {b"II": "<", b"MM": ">"}.get(data[tiff:tiff + 2])
+            if endian is None or tiff + 8 > end:
+                return None
+            ifd0 = tiff + struct.unpack(endian + "I", data[tiff + 4:tiff + 8])[0]
+            if ifd0 + 2 > end:
+                return None
+            count = struct.unpack(endian + "H", data[ifd0:ifd0 + 2])[0]
+            for i in range(count):
+                entry = ifd0 + 2 + 12 * i
+                if entry + 12 > end:
+                    return None
+                tag, typ, n = struct.unpack(endian + "HHI", data[entry:entry + 8])
+                if tag == EXIF_ORIENTATION_TAG and typ == 3 and n == 1:  # SHORT 1개
+                    return entry + 8, endian
+            return None
+        pos = body + length - 2
+    return None
+
+
+def _read_exif(img):
+    """img의 EXIF. 깨진 EXIF는 Pillow가 예외를 낼 수 있으므로 빈 EXIF로 취급합니다."""
+    try:
+        return img.getexif()
+    except (struct.error, ValueError, OSError):
+        return Image.Exif()
+
+
+def read_jpeg_orientation(data):
+    """JPEG 바이트의 EXIF 방향 값(1~8). 태그가 없으면 1."""
+    found = _exif_orientation_entry(data)
+    if found is None:
+        return 1
+    offset, endian = found
+    value = struct.unpack(endian + "H", data[offset:offset + 2])[0]
+    return value if value in range(1, 9) else 1
+
+
+def set_jpeg_orientation(data, orientation):
+    """JPEG 바이트의 EXIF 방향 값을 바꾼 새 바이트를 돌려줍니다. 압축된 이미지 데이터는 건드리지 않습니다.
+    방향 태그가 이미 있으면 그 2바이트만 고치고, 없으면 EXIF(APP1) 세그먼트를 새로 만들어 끼워 넣습니다."""
+    found = _exif_orientation_entry(data)
+    if found is not None:
+        offset, endian = found
+        return data[:offset] + struct.pack(endian + "H", orientation) + data[offset + 2:]
+
+    with Image.open(io.BytesIO(data)) as img:
+        exif = _read_exif(img)
+    exif[EXIF_ORIENTATION_TAG] = orientation
+    payload = exif.tobytes()
+    if not payload.startswith(b"Exif\x00\x00"):
+        payload = b"Exif\x00\x00" + payload
+    app1 = b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+    # 기존 EXIF 세그먼트는 빼고, JFIF(APP0)가 있으면 그 뒤에, 없으면 SOI 바로 뒤에 넣습니다.
+    out, pos, inserted = [data[:2]], 2, False
+    while pos + 4 <= len(data) and data[pos] == 0xFF and data[pos + 1] not in (0xD9, 0xDA):
+        marker = data[pos + 1]
+        end = pos + 2 + struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        if not inserted and marker != 0xE0:
+            out.append(app1)
+            inserted = True
+        if not (marker == 0xE1 and data[pos + 4:pos + 10] == b"Exif\x00\x00"):
+            out.append(data[pos:end])
+        pos = end
+    if not inserted:
+        out.append(app1)
+    out.append(data[pos:])
+    return b"".join(out)
+
+
+def compose_orientation(orientation, op):
+    """EXIF 방향 값이 orientation인 이미지를 '보이는 모습 기준'으로 op만큼 회전/뒤집었을 때의 새 방향 값."""
+    probe = Image.frombytes("L", (3, 2), bytes(range(6)))  # 8가지 변환 결과가 모두 다른 작은 표본
+
+    def shown(value):
+        return probe.transpose(_ORIENTATION_TRANSPOSE[value]) if value != 1 else probe
+
+    target = op.apply(shown(orientation))
+    for value in range(1, 9):
+        candidate = shown(value)
+        if candidate.size == target.size and candidate.tobytes() == target.tobytes():
+            return value
+    raise EngineError("EXIF 방향 값을 계산할 수 없습니다.")
+
+
+def _write_atomic(path, data):
+    """같은 폴더의 임시 파일에 쓴 뒤 이름을 바꿔, 원본에 덮어쓸 때도 중간에 깨진 파일이 남지 않게 합니다."""
+    with atomic_output(path) as tmp, open(tmp, "wb") as fp:
+        fp.write(data)
+
+
+def _run_jpegtran(args, src_path):
+    """jpegtran을 실행해 결과 바이트를 돌려줍니다. jpegtran이 없거나 실패하면(-perfect 조건 불충족 등) None."""
+    jpegtran = find_jpegtran()
+    if jpegtran is None:
+        return None
+    try:
+        proc = subprocess.run([jpegtran, "-copy", "all", *args, src_path],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    except OSError:
+        return None
+    if proc.returncode != 0 or not proc.stdout:
+        return None
+    return proc.stdout
+
+
+def _reencode_jpeg(src_path, transform):
+    """디코딩 → transform(PIL 이미지) → 재인코딩. 원본의 양자화 표/크로마 서브샘플링/ICC/EXIF를 그대로 써서
+    다시 인코딩에 따른 화질 손실을 최소로 줄이며, EXIF 방향 값은 1(정상)로 맞춥니다."""
+    with Image.open(src_path) as img:
+        img.load()
+        options = {"qtables": img.quantization, "optimize": True,
+                   "progressive": bool(img.info.get("progressive"))}
+        sampling = JpegImagePlugin.get_sampling(img)
+        if sampling != -1:
+            options["subsampling"] = sampling
+        if img.info.get("icc_profile"):
+            options["icc_profile"] = img.info["icc_profile"]
+        exif = _read_exif(img)
+        if exif:
+            if EXIF_ORIENTATION_TAG in exif:
+                exif[EXIF_ORIENTATION_TAG] = 1
+            options["exif"] = exif.tobytes()
+        result = transform(img)
+    buf = io.BytesIO()
+    result.save(buf, format="JPEG", **options)
+    return buf.getvalue()
+
+
+def transform_jpeg_file(src_path, output_path, op, method="lossless"):
+    """JPEG 파일을 op(FlipOp/RotateOp)만큼 회전/뒤집어 output_path에 JPEG으로 저장합니다.
+    세 방식 모두 앱의 미리보기와 같이 '저장된 픽셀' 기준으로 op를 적용하며, 원본의 EXIF 방향 값은 무시합니다.
+    'lossless'는 그 결과를 DCT 계수 재배치로 만들고 EXIF 방향 값을 1로 맞춥니다. 'exif'는 픽셀은 그대로 두고
+    저장된 픽셀에 op를 적용한 모습으로 보이게 하는 방향 값(compose_orientation(1, op))을 기록하므로,
+    방향 태그가 있는 원본(휴대폰 사진 등)도 뷰어에서 'lossless'/'reencode'와 같은 모습으로 보입니다.
+    반환값: 실제로 사용한 방식 ('lossless' / 'exif' / 'reencode')."""
+    if method not in JPEG_TRANSFORM_METHODS:
+        raise EngineError(f"알 수 없는 JPEG 저장 방식입니다: {method}")
+    with open(src_path, "rb") as fp:
+        data = fp.read()
+
+    if method == "exif":
+        new_data = set_jpeg_orientation(data, compose_orientation(1, op))
+        _write_atomic(output_path, new_data)
+        return "exif"
+
+    if method == "lossless":
+        out = _run_jpegtran(["-perfect", *_jpegtran_args(op)], src_path)
+        if out is not None:
+            if read_jpeg_orientation(out) != 1:
+                out = set_jpeg_orientation(out, 1)
+            _write_atomic(output_path, out)
+            return "lossless"
+    _write_atomic(output_path, _reencode_jpeg(src_path, op.apply))
+    return "reencode"
+
+
+@dataclass(frozen=True)
+class JpegTransformOp:
+    """JPEG 회전/뒤집기를 파일 단위로 처리해 output_path에 바로 저장하는 작업 객체.
+    apply()에는 이미지 대신 원본 경로 목록(1개)을 넘기며, (저장 경로, 사용한 방식)을 돌려줍니다."""
+    transform: object  # FlipOp 또는 RotateOp
+    output_path: str
+    method: str = "lossless"
+
+    def apply(self, paths):
+        return self.output_path, transform_jpeg_file(paths[0], self.output_path, self.transform, self.method)
+
+
+def can_transform_jpeg_losslessly(src_path, output_path):
+    """원본과 저장 형식이 모두 JPEG이어서 파일 단위 JPEG 변환을 쓸 수 있으면 True."""
+    return os.path.splitext(output_path)[1].lower() in JPEG_EXTS and is_jpeg_file(src_path)
+
+
+# ============================================================================
+# 무손실 JPEG 자르기 (MCU 격자에 맞춘 영역의 DCT 계수만 복사)
+# ============================================================================
+def jpeg_mcu_size(path):
+    """JPEG의 MCU(최소 부호화 단위) 크기 (가로, 세로 px). 크로마 서브샘플링에 따라 8 또는 16이며,
+    헤더만 읽습니다. JPEG이 아니면 None."""
+    with Image.open(path) as img:
+        if img.format != "JPEG":
+            return None
+        layers = getattr(img, "layer", None) or [(None, 1, 1, None)]
+        return 8 * max(layer[1] for layer in layers), 8 * max(layer[2] for layer in layers)
+
+
+def snap_crop_to_mcu(box, mcu):
+    """잘라낼 영역의 왼쪽/위 경계를 MCU 격자에 맞춰 내립니다(영역이 넓어지는 방향).
+    jpegtran -crop과 같은 규칙이며, 오른쪽/아래 경계는 어느 위치든 무손실로 자를 수 있어 그대로 둡니다."""
+    x1, y1, x2, y2 = box
+    mcu_w, mcu_h = mcu
+    return x1 - x1 % mcu_w, y1 - y1 % mcu_h, x2, y2
+
+
+def crop_jpeg_file(src_path, output_path, box):
+    """JPEG 원본을 box(사용자가 지정한 영역)로 잘라 output_path에 JPEG으로 저장합니다.
+    jpegtran이 있으면 왼쪽/위 경계를 MCU 격자에 맞춘 영역의 DCT 계수만 복사합니다.
+    jpegtran이 없거나 실패하면 무손실로 얻는 것이 없으므로, 격자에 맞추지 않고 box 그대로
+    원본 압축 설정(양자화 표 등)으로 다시 인코딩합니다. EXIF 방향 값은 1로 맞춥니다.
+    반환값: 실제로 사용한 방식 ('lossless' / 'reencode')."""
+    mcu = jpeg_mcu_size(src_path)
+    if mcu is None:
+        raise EngineError("무손실 자르기는 JPEG 원본에만 사용할 수 있습니다.")
+    with Image.open(src_path) as img:
+        size = img.size
+    box = CropOp(box).clamped_box(size)
+    x1, y1, x2, y2 = snap_crop_to_mcu(box, mcu)
+
+    out = _run_jpegtran(["-crop", f"{x2 - x1}x{y2 - y1}+{x1}+{y1}"], src_path)
+    if out is not None:
+        if read_jpeg_orientation(out) != 1:
+            out = set_jpeg_orientation(out, 1)
+        _write_atomic(output_path, out)
+        return "lossless"
+    _write_atomic(output_path, _reencode_jpeg(src_path, lambda img: img.crop(box)))
+    return "reencode"
+
+
+@dataclass(frozen=True)
+class JpegCropOp:
+    """무손실 JPEG 자르기를 파일 단위로 처리해 output_path에 바로 저장하는 작업 객체.
+    apply()에는 원본 경로 목록(1개)을 넘기며, (저장 경로, 사용한 방식)을 돌려줍니다."""
+    box: Tuple[int, int, int, int]
+    output_path: str
+
+    def apply(self, paths):
+        return self.output_path, crop_jpeg_file(paths[0], self.output_path, self.box)